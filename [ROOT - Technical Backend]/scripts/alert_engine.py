@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# Alert evaluation for proposal_master_dashboard_skeleton.json.alerts.
+# Rules are compiled from the skeletons (key_metrics alert_threshold, the
+# parseable alert_rules triggers, active blockers, failed checks). Each rule
+# declares the skeleton keys it reads; a rule is re-evaluated only when the
+# fingerprint of those keys changes. Alerts are deduped by (rule, subject),
+# resolved automatically when their condition clears, and summarized in
+# alerts.index for cheap reads.
+#
+#   py alert_engine.py [--force]
+import hashlib, json, os, re, sys, threading
+from datetime import datetime
+
+import skeleton_store
+
+ROOT = skeleton_store.ROOT
+DASH = 'proposal_master_dashboard_skeleton.json'
+COMP = 'compliance_verification_skeleton_v2.json'
+DOCS = 'document_output_compliance_skeleton.json'
+CACHE_NAME = 'alerts.json'
+SOURCE = 'alert_engine'
+MAX_RESOLVED = 50
+
+TIME_UNITS = ('hours', 'days', 'minutes')  # remaining-time metrics alert when they fall below threshold
+METRIC_ALIASES = {'hours_until_deadline': 'hours_to_deadline'}
+# metric -> (alert_type, default severity); alert_type also matches hand-written alerts to adopt
+METRIC_ALERTS = {
+    'hours_to_deadline': ('deadline_critical', 'critical'),
+    'critical_blockers': ('blocker_active', 'critical'),
+}
+TRIGGER_RE = re.compile(r'^\s*(\w+)\s*(<=|>=|<|>|==)\s*(-?\d+(?:\.\d+)?)\s*$')
+OPS = {
+    '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b, '>=': lambda a, b: a >= b, '==': lambda a, b: a == b,
+}
+
+
+def get_path(doc, dotted):
+    node = doc
+    for k in dotted.split('.'):
+        node = node.get(k) if isinstance(node, dict) else None
+    return node
+
+
+class Rule:
+    """inputs: [(skeleton, dotted key)]; check(docs) -> {subject: alert fields}."""
+
+    def __init__(self, rule_id, name, severity, inputs, check):
+        self.rule_id, self.name, self.severity = rule_id, name, severity
+        self.inputs, self.check = inputs, check
+
+    def fingerprint(self, docs):
+        h = hashlib.sha1(self.rule_id.encode())
+        for fn, key in self.inputs:
+            h.update(json.dumps(get_path(docs.get(fn) or {}, key), sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+
+def _metric_rule(rule_id, name, metric, op, threshold, severity, alert_type):
+    key = f'metrics_tracking.key_metrics.{metric}'
+
+    def check(docs):
+        m = get_path(docs.get(DASH) or {}, key) or {}
+        v = m.get('current_value')
+        if not isinstance(v, (int, float)) or isinstance(v, bool) or not OPS[op](v, threshold):
+            return {}
+        unit = m.get('unit') or ''
+        return {metric: {'alert_type': alert_type, 'threshold': f'{op} {threshold:g} {unit}'.strip(),
+                         'message': f"{metric.replace('_', ' ')} is {v:g} {unit} ({op} {threshold:g})".replace('  ', ' '),
+                         'value': v}}
+    return Rule(rule_id, name, severity, [(DASH, key)], check)
+
+
+def compile_rules(dash):
+    """Rules for the current dashboard document (recompiled when key_metrics/alert_rules change)."""
+    rules, covered = [], set()
+    km = get_path(dash, 'metrics_tracking.key_metrics') or {}
+    for r in get_path(dash, 'alerts.alert_rules') or []:
+        m = TRIGGER_RE.match(str(r.get('trigger') or ''))
+        if not m:
+            continue
+        metric = METRIC_ALIASES.get(m.group(1), m.group(1))
+        if metric not in km:
+            continue
+        atype, _ = METRIC_ALERTS.get(metric, (f'{metric}_threshold', 'high'))
+        rules.append(_metric_rule(r.get('rule_id') or f'METRIC-{metric}', r.get('rule_name') or metric, metric,
+                                  m.group(2), float(m.group(3)), r.get('severity') or 'high', atype))
+        covered.add(metric)
+    for metric, m in km.items():
+        thr = m.get('alert_threshold') if isinstance(m, dict) else None
+        if metric in covered or not isinstance(thr, (int, float)) or isinstance(thr, bool):
+            continue
+        op = {'below': '<', 'above': '>', 'at_or_above': '>=', 'at_or_below': '<='}.get(
+            m.get('alert_when'), '<' if m.get('unit') in TIME_UNITS else '>=')
+        atype, sev = METRIC_ALERTS.get(metric, (f'{metric}_threshold', 'high'))
+        rules.append(_metric_rule(f'METRIC-{metric}', f'{metric} threshold', metric, op, float(thr),
+                                  m.get('alert_severity') or sev, atype))
+    rules += [blocker_rule(), failed_checks_rule()]
+    return rules
+
+
+def blocker_rule():
+    key = 'executive_dashboard.blocker_analysis.active_blockers'
+
+    def check(docs):
+        out = {}
+        for b in get_path(docs.get(DASH) or {}, key) or []:
+            if isinstance(b, dict) and b.get('severity') == 'critical' and b.get('status') not in ('resolved', 'closed'):
+                bid = b.get('blocker_id') or b.get('description')
+                out[bid] = {'alert_type': 'critical_blocker', 'message': f"{bid}: {b.get('description', '')}".strip(': '),
+                            'action_required': b.get('escalation_path') or f"Owner: {b.get('owner', 'unassigned')}"}
+        return out
+    return Rule('RULE-002', 'Critical Blocker Added', 'critical', [(DASH, key)], check)
+
+
+def failed_checks_rule():
+    def check(docs):
+        out = {}
+        for name, h in (get_path(docs.get(DASH) or {}, 'health_heartbeat') or {}).items():
+            if isinstance(h, dict) and h.get('ok') is False:
+                out[f'heartbeat:{name}'] = {'alert_type': 'check_failed', 'message': f'{name} check failed (last run {h.get("last_run", "n/a")})'}
+        comp = docs.get(COMP) or {}
+        for key in ('work_split_verification', 'fedramp_evidence_verification'):
+            if (comp.get(key) or {}).get('verification_status') == 'fail':
+                out[key] = {'alert_type': 'check_failed', 'message': f"{key.replace('_', ' ')} failed"}
+        for vol in (docs.get(DOCS) or {}).get('volumes') or []:
+            fv = vol.get('format_verification') or {}
+            for c in (fv.get('automated_checks') or []) + (fv.get('manual_checks') or []):
+                if isinstance(c, dict) and c.get('pass_fail') is False:
+                    out[c.get('check_id')] = {'alert_type': 'check_failed',
+                                              'message': f"{vol.get('volume_id', '')}: {c.get('check_name', c.get('check_id'))} failed"}
+        return out
+    return Rule('RULE-003', 'Compliance Check Failed', 'high',
+                [(DASH, 'health_heartbeat'), (COMP, 'work_split_verification.verification_status'),
+                 (COMP, 'fedramp_evidence_verification.verification_status'), (DOCS, 'volumes')], check)
+
+
+WATCHED = sorted({DASH, COMP, DOCS})
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _next_id(alerts):
+    nums = [int(m.group(1)) for a in alerts for m in [re.match(r'ALERT-(\d+)$', str(a.get('alert_id')))] if m]
+    return max(nums, default=0) + 1
+
+
+def apply(alerts_obj, results, now=None):
+    """Merge {rule: (rule_obj, {subject: fields})} into the alerts object; returns (new_obj, changes)."""
+    now = now or _now()
+    active = list(alerts_obj.get('active_alerts') or [])
+    resolved = list(alerts_obj.get('resolved_alerts') or [])
+    changes = {'raised': [], 'resolved': [], 'adopted': []}
+    nid = _next_id(active + resolved)
+    by_key = {a['dedupe_key']: a for a in active if a.get('source') == SOURCE and a.get('dedupe_key')}
+    manual = [a for a in active if a.get('source') != SOURCE]
+    for rule_id, (rule, found) in results.items():
+        for subject, fields in found.items():
+            key = f'{rule_id}:{subject}'
+            cur = by_key.get(key)
+            if cur is None:
+                # Adopt a hand-written alert of the same type instead of raising a duplicate.
+                twin = next((a for a in manual if a.get('alert_type') == fields.get('alert_type')), None)
+                if twin:
+                    manual.remove(twin)
+                    cur = dict(twin)
+                    changes['adopted'].append(cur.get('alert_id'))
+                else:
+                    cur = {'alert_id': f'ALERT-{nid:03d}', 'triggered_at': now, 'acknowledged': False}
+                    nid += 1
+                    changes['raised'].append(cur['alert_id'])
+            by_key[key] = dict(cur, **fields, severity=rule.severity, rule_id=rule_id, dedupe_key=key, source=SOURCE)
+        for key in [k for k in by_key if k.startswith(rule_id + ':') and k[len(rule_id) + 1:] not in found]:
+            a = by_key.pop(key)
+            resolved.insert(0, dict(a, resolved_at=now))
+            changes['resolved'].append(a['alert_id'])
+    engine = sorted(by_key.values(), key=lambda a: a['alert_id'])
+    out = dict(alerts_obj, active_alerts=manual + engine, resolved_alerts=resolved[:MAX_RESOLVED])
+    out['alert_config'] = dict(alerts_obj.get('alert_config') or {}, check_frequency='on_change')
+    sev = {}
+    for a in out['active_alerts']:
+        sev[a.get('severity', 'unknown')] = sev.get(a.get('severity', 'unknown'), 0) + 1
+    index = {'active_count': len(out['active_alerts']), 'by_severity': dict(sorted(sev.items())),
+             'alert_ids': [a.get('alert_id') for a in out['active_alerts']]}
+    old_index = {k: v for k, v in (alerts_obj.get('index') or {}).items() if k != 'updated_at'}
+    out['index'] = dict(index, updated_at=now if index != old_index or any(changes.values())
+                        else (alerts_obj.get('index') or {}).get('updated_at', now))
+    return out, changes
+
+
+class AlertEngine:
+    def __init__(self, root=ROOT):
+        self.root = root
+        self.lock = threading.Lock()
+        self.fingerprints = None  # rule_id -> fingerprint of its inputs at last evaluation
+
+    def _docs(self):
+        return {fn: skeleton_store.read_json(os.path.join(self.root, fn)) for fn in WATCHED}
+
+    def evaluate(self, changed=None, force=False):
+        """Re-evaluate rules whose inputs changed (optionally only if one of `changed` files is an input)."""
+        with self.lock:
+            if self.fingerprints is None:
+                self.fingerprints = skeleton_store.read_cache(CACHE_NAME, {}) or {}
+            docs = self._docs()
+            rules = compile_rules(docs[DASH])
+            results, fps = {}, {}
+            for r in rules:
+                if changed is not None and not force and not ({fn for fn, _ in r.inputs} & set(changed)):
+                    # Not checked: keep the old fingerprint, so the notification for its own file still sees a change.
+                    fps[r.rule_id] = self.fingerprints.get(r.rule_id)
+                    continue
+                fp = fps[r.rule_id] = r.fingerprint(docs)
+                if force or self.fingerprints.get(r.rule_id) != fp:
+                    results[r.rule_id] = (r, r.check(docs))
+            # Rules that disappeared (threshold removed) resolve their alerts.
+            gone = Rule('', '', '', [], lambda docs: {})
+            for rid in set(self.fingerprints) - set(fps):
+                results[rid] = (gone, {})
+            report = {'rules': len(rules), 'evaluated': sorted(results)}
+            if results:
+                path = os.path.join(self.root, DASH)
+                outcome = {}
+
+                def update(doc):
+                    doc['alerts'], outcome['changes'] = apply(doc.get('alerts') or {}, results)
+                with skeleton_store.batch() as b:
+                    b.mutate(path, update)
+                report.update(outcome.get('changes') or {})
+            if fps != self.fingerprints:
+                skeleton_store.write_cache(CACHE_NAME, fps)
+            self.fingerprints = fps
+            return report
+
+    def on_skeletons_changed(self, names):
+        """live_events listener: file names of skeletons that were just written."""
+        if set(names) & set(WATCHED):
+            self.evaluate(changed=names)
+
+
+ENGINE = AlertEngine()
+
+
+def active_alerts():
+    """Current alerts + index straight from the dashboard skeleton (no rule evaluation)."""
+    a = skeleton_store.read_json(os.path.join(ROOT, DASH)).get('alerts') or {}
+    return {'index': a.get('index') or {}, 'active_alerts': a.get('active_alerts') or []}
+
+
+def main(argv=None):
+    argv = list(argv or [])
+    rep = ENGINE.evaluate(force='--force' in argv)
+    rep.update(active_alerts()['index'])
+    print(json.dumps(rep, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
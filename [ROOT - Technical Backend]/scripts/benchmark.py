@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# Benchmark harness: builds a scaled synthetic workload in a temp dir (skeletons
+# with N× items, a working_drafts tree of PDFs, a Schedule B workbook) and times
+# the backend entry points against it, including dev_server endpoints under
+# concurrent load. Results are JSON so runs can be diffed.
+#
+#   py benchmark.py [--scales 1,10,100] [--repeat 5] [--clients 8] [--out FILE] [--keep]
+#   py benchmark.py --compare OLD.json NEW.json [--threshold 10] [--min-ms 1]
+import json, os, platform, shutil, statistics, subprocess, sys, tempfile, threading, time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+import check_page_counts, compute_work_split, evidence_engine, pricing_engine
+import query_engine, skeleton_store, update_status
+
+try:
+    import openpyxl
+except Exception:
+    openpyxl = None
+
+RESULTS_DIR = os.path.join(skeleton_store.ROOT, 'benchmarks')
+SCALED = ('requirements_skeleton_v2.json', 'qa_responses_skeleton_v2.json')
+PDFS_PER_SCALE = 10       # scale 100 -> 1,000 PDFs
+PDFS_PER_DIR = 100
+CLIN_ROWS_PER_SCALE = 100  # scale 100 -> 10,000 Schedule B rows
+MOVIUS = 'movius_dependencies_skeleton_v2.json'
+
+
+# --- workload generator -----------------------------------------------------
+
+
+def _scale_lists(node, factor):
+    """Repeat every list of id-bearing dicts `factor` times, suffixing the ids of the copies."""
+    if isinstance(node, dict):
+        return {k: _scale_lists(v, factor) for k, v in node.items()}
+    if not isinstance(node, list):
+        return node
+    items = [_scale_lists(v, factor) for v in node]
+    if not items or not all(isinstance(v, dict) and any(k in v for k in query_engine.ID_KEYS) for v in items):
+        return items
+    out = list(items)
+    for n in range(1, factor):
+        for v in items:
+            c = dict(v)
+            for k in query_engine.ID_KEYS:
+                if isinstance(c.get(k), str):
+                    c[k] = f'{c[k]}-x{n}'
+            out.append(c)
+    return out
+
+
+def minimal_pdf(pages):
+    """Valid single-revision PDF with `pages` blank pages and a correct xref table."""
+    kids = ' '.join(f'{3 + i} 0 R' for i in range(pages))
+    objs = [b'<< /Type /Catalog /Pages 2 0 R >>',
+            f'<< /Type /Pages /Kids [{kids}] /Count {pages} >>'.encode()]
+    objs += [b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>'] * pages
+    out, offsets = bytearray(b'%PDF-1.4\n'), []
+    for i, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % i + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objs) + 1)
+    out += b''.join(b'%010d 00000 n \n' % o for o in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+def write_schedule_b(path, rows):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Schedule B')
+    ws.append(['CLIN', 'Contractor', 'ExtendedPrice'])
+    for i in range(rows):
+        ws.append([f'{i // 2 + 1:04d}', 'RPR Tech' if i % 3 else 'Movius (sub)', 1000 + (i * 37) % 9000])
+    ws.append(['Total', None, None])
+    wb.save(path)
+
+
+def generate(root, scale):
+    """Populate `root` with a scale-`scale` copy of the project. Returns sizes of what was built."""
+    for fn in skeleton_store.SKELETON_FILENAMES:
+        doc = skeleton_store.read_json(os.path.join(skeleton_store.ROOT, fn))
+        if fn in SCALED:
+            doc = _scale_lists(doc, scale)
+        with open(os.path.join(root, fn), 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+    n_pdfs = PDFS_PER_SCALE * scale
+    drafts = os.path.join(root, 'working_drafts')
+    for i in range(n_pdfs):
+        d = os.path.join(drafts, f'batch_{i // PDFS_PER_DIR:03d}')
+        if i % PDFS_PER_DIR == 0:
+            os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, f'vol1_technical_{i:05d}.pdf'), 'wb') as f:
+            f.write(minimal_pdf(1 + i % 7))
+    xlsx = os.path.join(root, 'RPRTech_Schedule B.xlsx')
+    rows = CLIN_ROWS_PER_SCALE * scale
+    if openpyxl:
+        write_schedule_b(xlsx, rows)
+    return {
+        'skeleton_bytes': {fn: os.path.getsize(os.path.join(root, fn)) for fn in SCALED},
+        'pdfs': n_pdfs,
+        'clin_rows': rows if openpyxl else None,
+    }
+
+
+# --- timing -----------------------------------------------------------------
+
+
+def _summary(samples_ms):
+    s = sorted(samples_ms)
+    return {
+        'n': len(s),
+        'min_ms': round(s[0], 3),
+        'median_ms': round(statistics.median(s), 3),
+        'p95_ms': round(s[min(len(s) - 1, int(len(s) * 0.95))], 3),
+        'max_ms': round(s[-1], 3),
+    }
+
+
+def timeit(fn, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return _summary(samples)
+
+
+@contextmanager
+def redirect(module, **attrs):
+    """Point a module's path constants at the workload for the duration of a benchmark."""
+    old = {k: getattr(module, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(module, k, v)
+    try:
+        yield
+    finally:
+        for k, v in old.items():
+            setattr(module, k, v)
+
+
+def _clear_cache_dir():
+    shutil.rmtree(skeleton_store.CACHE_DIR, ignore_errors=True)
+    skeleton_store.invalidate()
+    pricing_engine._mem.clear()
+
+
+def load_test(base, paths, clients, per_client):
+    """`clients` threads each issue `per_client` GETs round-robin over `paths`."""
+    samples, errors, lock = [], [0], threading.Lock()
+
+    def worker(k):
+        mine = []
+        for i in range(per_client):
+            p = paths[(k + i) % len(paths)]
+            t0 = time.perf_counter()
+            try:
+                with urlopen(Request(base + p, headers={'Accept-Encoding': 'gzip'}), timeout=30) as r:
+                    r.read()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            samples.extend(mine)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    res = _summary(samples) if samples else {'n': 0}
+    res.update({'errors': errors[0], 'clients': clients, 'req_per_s': round(len(samples) / wall, 1)})
+    return res
+
+
+def run_scale(root, scale, repeat, clients):
+    built = generate(root, scale)
+    results = []
+
+    def add(name, res, **extra):
+        results.append(dict({'name': name, 'scale': scale}, **res, **extra))
+        print(f"  {name:<34} scale={scale:<5} median={res.get('median_ms', '-')} ms", file=sys.stderr)
+
+    drafts = os.path.join(root, 'working_drafts')
+    with redirect(skeleton_store, CACHE_DIR=os.path.join(root, '.cache')):
+        add('scan_counts.cold', timeit(lambda: check_page_counts.scan_counts(drafts), repeat, _clear_cache_dir),
+            files=built['pdfs'])
+        add('scan_counts.warm', timeit(lambda: check_page_counts.scan_counts(drafts), repeat), files=built['pdfs'])
+
+        xlsx = os.path.join(root, 'RPRTech_Schedule B.xlsx')
+        if openpyxl:
+            add('read_prices_from_excel.cold',
+                timeit(lambda: compute_work_split.read_prices_from_excel(xlsx), max(1, repeat // 2), _clear_cache_dir),
+                rows=built['clin_rows'])
+            add('read_prices_from_excel.warm', timeit(lambda: compute_work_split.read_prices_from_excel(xlsx), repeat),
+                rows=built['clin_rows'])
+        else:
+            results.append({'name': 'read_prices_from_excel', 'scale': scale, 'skipped': 'openpyxl_not_installed'})
+
+        # What check_fedramp_evidence.main runs: every dependency's rules, then the FedRAMP chain.
+        movius = skeleton_store.read_json(os.path.join(root, MOVIUS))
+        movius['dependencies'] = _scale_lists(movius.get('dependencies') or [], scale)
+
+        def evaluate(force):
+            results, _ = evidence_engine.evaluate_all(movius, force=force)
+            evidence_engine.chain(results.get('movius_003'))
+        add('evaluate_evidence.cold', timeit(lambda: evaluate(True), repeat), dependencies=len(movius['dependencies']))
+        add('evaluate_evidence.warm', timeit(lambda: evaluate(False), repeat), dependencies=len(movius['dependencies']))
+
+        html = os.path.join(root, 'dashboard.html')
+        with redirect(update_status, ROOT_DIR=root, DASHBOARD_HTML=html):
+            add('generate_dashboard.full', timeit(lambda: update_status.generate_dashboard(full=True), repeat))
+            add('generate_dashboard.incremental', timeit(lambda: update_status.generate_dashboard(), repeat))
+
+        import dev_server
+        engine = query_engine.QueryEngine(root=root)
+        with redirect(dev_server, ROOT=root), redirect(query_engine, ENGINE=engine):
+            quiet = type('QuietHandler', (dev_server.Handler,), {'log_message': lambda self, *a: None})
+            httpd = ThreadingHTTPServer(('127.0.0.1', 0), quiet)
+            httpd.daemon_threads = True
+            threading.Thread(target=httpd.serve_forever, daemon=True).start()
+            base = f'http://127.0.0.1:{httpd.server_address[1]}'
+            try:
+                per_client = max(5, repeat * 5)
+                add('dev_server.health', load_test(base, ['/health'], clients, per_client))
+                add('dev_server.static', load_test(base, ['/dashboard.html', f'/{SCALED[0]}', f'/{SCALED[1]}'],
+                                                   clients, per_client))
+                add('dev_server.query', load_test(base, ['/query?filter=' + quote("risk == 'critical'"),
+                                                         '/query?filter=' + quote("priority == 'high'")],
+                                                  clients, per_client))
+            finally:
+                httpd.shutdown()
+                httpd.server_close()
+    return built, results
+
+
+def _git_rev():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=skeleton_store.ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(scales, repeat, clients, keep=False):
+    report = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'git_rev': _git_rev(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'clients': clients,
+        },
+        'workloads': {},
+        'results': [],
+    }
+    for scale in scales:
+        root = tempfile.mkdtemp(prefix=f'bench_x{scale}_')
+        print(f'scale {scale}: {root}', file=sys.stderr)
+        try:
+            built, results = run_scale(root, scale, repeat, clients)
+            report['workloads'][str(scale)] = built
+            report['results'].extend(results)
+        finally:
+            if not keep:
+                shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def compare(old_path, new_path, threshold=10.0, min_ms=1.0):
+    """Median (or p95 for load tests) per (name, scale); flags changes beyond `threshold` percent
+    that are also at least `min_ms` in absolute terms (sub-millisecond timings are mostly noise)."""
+    def index(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return {(r['name'], r['scale']): r for r in json.load(f).get('results', [])}
+    old, new = index(old_path), index(new_path)
+    rows, regressions = [], 0
+    for key in sorted(set(old) & set(new), key=lambda k: (k[1], k[0])):
+        metric = 'p95_ms' if 'clients' in new[key] else 'median_ms'
+        a, b = old[key].get(metric), new[key].get(metric)
+        if not a or b is None:
+            continue
+        pct = (b - a) / a * 100.0
+        flag = ''
+        if abs(b - a) >= min_ms:
+            flag = 'REGRESSION' if pct > threshold else ('improved' if pct < -threshold else '')
+        regressions += flag == 'REGRESSION'
+        rows.append(f'{key[0]:<34} x{key[1]:<5} {metric:<9} {a:>10.2f} -> {b:>10.2f}  {pct:+7.1f}%  {flag}')
+    print('\n'.join(rows))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    argv = list(argv or [])
+
+    def opt(name, default):
+        return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else default
+    if '--compare' in argv:
+        i = argv.index('--compare')
+        return compare(argv[i + 1], argv[i + 2], float(opt('--threshold', 10)), float(opt('--min-ms', 1.0)))
+    scales = [int(s) for s in opt('--scales', '1,10,100').split(',')]
+    report = run(scales, int(opt('--repeat', 5)), int(opt('--clients', 8)), keep='--keep' in argv)
+    out = opt('--out', None) or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
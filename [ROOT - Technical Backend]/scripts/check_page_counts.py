@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
-import json, os, sys
+import hashlib, json, multiprocessing, os, re, sys, time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import skeleton_store
+
 try:
     import pypdf
 except Exception:
@@ -12,6 +15,16 @@ DRAFTS_DIR = os.path.join(ROOT, 'working_drafts')
 OUTPUT_JSON = os.path.join(ROOT, 'proposal_master_dashboard_skeleton.json')
 
 
+CACHE_NAME = 'page_counts.json'
+POOL_MIN_FILES = 4  # below this, counting inline beats process start-up
+# dev_server runs this on a worker thread; forking a multithreaded process can copy
+# held locks (skeleton_store, StaticCache) into the children, so never fork.
+POOL_START = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_PAGES_OBJ = re.compile(rb'/Type\s*/Pages(?![A-Za-z])')
+_COUNT = re.compile(rb'/Count\s+(\d+)')
+
+
 def pdf_page_count(path: str) -> int:
     if not pypdf:
         return -1
@@ -20,41 +33,111 @@ def pdf_page_count(path: str) -> int:
         return len(reader.pages)
 
 
-def scan_counts():
-    counts = []
-    if not os.path.isdir(DRAFTS_DIR):
-        return {'error': f'Missing drafts dir: {DRAFTS_DIR}', 'ok': False}
-    for name in sorted(os.listdir(DRAFTS_DIR)):
-        path = os.path.join(DRAFTS_DIR, name)
-        if os.path.isdir(path):
+def page_tree_count(data: bytes):
+    """Page count from the /Count of the root /Pages node, without building a reader.
+    Returns None when the tree is not readable as plain text (object streams,
+    incremental updates), in which case the caller falls back to pypdf."""
+    if data.count(b'%%EOF') > 1:
+        return None
+    best = None
+    for chunk in data.split(b'endobj'):
+        if not _PAGES_OBJ.search(chunk):
             continue
-        pages = None
-        status = 'unsupported'
-        if name.lower().endswith('.pdf'):
+        for m in _COUNT.finditer(chunk):
+            n = int(m.group(1))
+            best = n if best is None else max(best, n)
+    return best
+
+
+def count_pdf(path, known_sha1=None):
+    """Worker: (pages, status, method, sha1, elapsed_ms). Skips counting if the hash matches."""
+    t0 = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    sha1 = hashlib.sha1(data).hexdigest()
+    if known_sha1 == sha1:
+        return None, 'ok', 'cache', sha1, round((time.perf_counter() - t0) * 1000, 2)
+    pages, status, method = page_tree_count(data), 'ok', 'page_tree'
+    if pages is None:
+        method = 'pypdf'
+        try:
             c = pdf_page_count(path)
-            if c >= 0:
-                pages = c
-                status = 'ok'
-            else:
-                status = 'pypdf_missing'
-        counts.append({'file': name, 'pages': pages, 'status': status})
+        except Exception as e:
+            c, status = None, f'error: {e}'
+        if c is not None and c >= 0:
+            pages = c
+        elif c is not None:
+            status = 'pypdf_missing'
+    return pages, status, method, sha1, round((time.perf_counter() - t0) * 1000, 2)
+
+
+def walk_files(top):
+    """Recursive os.scandir walk yielding (relpath, DirEntry); hidden entries are skipped."""
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        try:
+            it = os.scandir(os.path.join(top, rel) if rel else top)
+        except OSError:
+            continue
+        with it:
+            entries = sorted(it, key=lambda e: e.name)
+        for e in entries:
+            if e.name.startswith('.'):
+                continue
+            r = f'{rel}/{e.name}' if rel else e.name
+            if e.is_dir(follow_symlinks=False):
+                stack.append(r)
+            elif e.is_file():
+                yield r, e
+
+
+def scan_counts(drafts_dir=DRAFTS_DIR, cache_name=CACHE_NAME):
+    t0 = time.perf_counter()
+    if not os.path.isdir(drafts_dir):
+        return {'error': f'Missing drafts dir: {drafts_dir}', 'ok': False}
+    cache = skeleton_store.read_cache(cache_name, {}) or {}
+    new_cache, counts, todo = {}, {}, []
+    for rel, e in walk_files(drafts_dir):
+        if not rel.lower().endswith('.pdf'):
+            counts[rel] = {'file': rel, 'pages': None, 'status': 'unsupported'}
+            continue
+        st = e.stat()
+        c = cache.get(rel)
+        if c and c.get('size') == st.st_size and c.get('mtime_ns') == st.st_mtime_ns:
+            counts[rel] = {'file': rel, 'pages': c['pages'], 'status': c['status'], 'method': 'cache', 'elapsed_ms': 0.0}
+            new_cache[rel] = c
+        else:
+            todo.append((rel, e.path, st, (c or {}).get('sha1')))
+    if todo:
+        jobs = [(p, sha) for _, p, _, sha in todo]
+        if len(todo) >= POOL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1),
+                                     mp_context=multiprocessing.get_context(POOL_START)) as pool:
+                results = list(pool.map(count_pdf, *zip(*jobs), chunksize=max(1, len(todo) // 32)))
+        else:
+            results = [count_pdf(p, sha) for p, sha in jobs]
+        for (rel, _, st, _), (pages, status, method, sha1, ms) in zip(todo, results):
+            if method == 'cache':
+                pages, status = cache[rel]['pages'], cache[rel]['status']
+            counts[rel] = {'file': rel, 'pages': pages, 'status': status, 'method': method, 'elapsed_ms': ms}
+            if status == 'ok':
+                new_cache[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': sha1,
+                                  'pages': pages, 'status': status}
+    if new_cache != cache:
+        skeleton_store.write_cache(cache_name, new_cache)
     return {
-        'page_counts': counts,
+        'page_counts': [counts[k] for k in sorted(counts)],
         'checked_at': datetime.now().isoformat(timespec='seconds'),
+        'files_opened': len(todo),
+        'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2),
         'ok': True,
     }
 
 
 def merge_into_dashboard(report):
-    try:
-        with open(OUTPUT_JSON, 'r', encoding='utf-8') as f:
-            doc = json.load(f)
-    except Exception:
-        doc = {}
-    doc['page_counts'] = report
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(doc, f, ensure_ascii=False, indent=2)
-        f.write('\n')
+    with skeleton_store.batch() as b:
+        b.set(OUTPUT_JSON, 'page_counts', report)
 
 
 def main():
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# Compact aggregate behind dev_server.py's GET /api/summary: heartbeats,
+# verification statuses, volume completion, blocker/alert counts and the
+# submission deadline, so dashboard pages don't download whole skeletons.
+# It is rebuilt only when a source skeleton's mtime/size changes; the ETag is a
+# hash of the encoded body, so a rebuild that changes nothing keeps its tag.
+# The deadline is sent as a timestamp and counted down by the page, which keeps
+# the body (and ETag) stable between writes.
+#
+#   py dashboard_summary.py
+import hashlib, json, os, sys, threading
+from datetime import datetime
+
+import skeleton_store
+
+DASH = 'proposal_master_dashboard_skeleton.json'
+COMP = 'compliance_verification_skeleton_v2.json'
+VOLS = 'volumes_completion_skeleton_v2.json'
+SOURCES = [DASH, COMP, VOLS]
+MAX_ALERTS = 5
+MAX_MESSAGE = 100
+
+
+def _get(doc, *keys):
+    for k in keys:
+        doc = doc.get(k) if isinstance(doc, dict) else None
+    return doc
+
+
+def _epoch(ts):
+    try:
+        return int(datetime.fromisoformat(str(ts).replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        return None
+
+
+def build(docs):
+    dash, comp, vols = (docs.get(fn) or {} for fn in SOURCES)
+    out = {
+        'heartbeats': {k: {'ok': bool(h.get('ok')), 'last_run': h.get('last_run')}
+                       for k, h in sorted((_get(dash, 'health_heartbeat') or {}).items()) if isinstance(h, dict)},
+        'verification': {k[:-len('_verification')]: _get(comp, k, 'verification_status')
+                         for k in ('work_split_verification', 'fedramp_evidence_verification')
+                         if isinstance(comp.get(k), dict)},
+    }
+    for key, name in (('filename_validation', 'filenames'), ('page_counts', 'page_counts')):
+        v = dash.get(key)
+        if isinstance(v, dict):
+            out['verification'][name] = 'pass' if v.get('ok') else 'fail'
+    ev = _get(comp, 'evidence_verification', 'summary')
+    if isinstance(ev, dict):
+        out['evidence'] = {'pass': ev.get('pass', 0), 'fail': ev.get('fail', 0)}
+    vs = comp.get('verification_status')
+    if isinstance(vs, dict):
+        out['checks'] = {k: vs.get(k) for k in ('total_checks', 'passed', 'failed', 'pending')}
+    out['volumes'] = {
+        'overall': _get(vols, 'overall_completion', 'percentage'),
+        'by_volume': [[v.get('volume_number'), v.get('overall_completion'), v.get('completion_status')]
+                      for v in vols.get('volumes') or [] if isinstance(v, dict)],
+    }
+    if isinstance(dash.get('status'), dict):
+        out['status'] = dash['status']
+    active = [b for b in _get(dash, 'executive_dashboard', 'blocker_analysis', 'active_blockers') or []
+              if isinstance(b, dict) and b.get('status') not in ('resolved', 'closed')]
+    out['blockers'] = {'critical': _get(dash, 'executive_dashboard', 'proposal_health', 'critical_blockers_count'),
+                       'active': len(active),
+                       'active_critical': sum(1 for b in active if b.get('severity') == 'critical')}
+    alerts = dash.get('alerts') or {}
+    listed = [a for a in alerts.get('active_alerts') or [] if isinstance(a, dict)]
+    index = alerts.get('index') or {}
+    out['alerts'] = {'active': index.get('active_count', len(listed)),
+                     'top': [[a.get('alert_id'), a.get('severity'), str(a.get('message') or '')[:MAX_MESSAGE]]
+                             for a in listed[:MAX_ALERTS]]}
+    deadline = _get(dash, 'proposal_metadata', 'submission_deadline') or comp.get('submission_deadline')
+    out['deadline'] = {'at': deadline, 'epoch': _epoch(deadline) if deadline else None}
+    return out
+
+
+class Summary:
+    def __init__(self, root=None):
+        self.root = root or skeleton_store.ROOT
+        self.lock = threading.Lock()
+        self.keys = None
+        self.cached = None  # (data, body bytes, etag)
+
+    def _current(self):
+        keys = tuple(skeleton_store._stat_key(os.path.join(self.root, fn)) for fn in SOURCES)
+        with self.lock:
+            if self.cached is not None and keys == self.keys:
+                return self.cached
+            # Stat before reading: a write racing this rebuild changes the key and triggers another.
+            data = build({fn: skeleton_store.read_json(os.path.join(self.root, fn)) for fn in SOURCES})
+            body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            tag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+            self.keys, self.cached = keys, (data, body, tag)
+            return self.cached
+
+    def get(self):
+        """(encoded body, etag), rebuilt only after a source skeleton changed."""
+        _, body, tag = self._current()
+        return body, tag
+
+    def data(self):
+        return self._current()[0]
+
+
+SUMMARY = Summary()
+
+
+def main(argv=None):
+    body, tag = SUMMARY.get()
+    print(json.dumps({'etag': tag, 'bytes': len(body), 'summary': SUMMARY.data()}, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
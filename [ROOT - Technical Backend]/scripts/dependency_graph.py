@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# Dependency graph across the planning skeletons: Movius dependencies,
+# deliverables, compliance checks, volume sections and user stories.
+#
+# An edge a -> b means b waits on a. Edges come from requirement id lists
+# (requirements_blocked/_met/_addressed: the item feeds those requirements),
+# from links_to (Movius items are upstream of what they link to, other ids are
+# treated like requirements), from free-text `dependencies` (resolved to an item
+# by id or by token overlap with item names, else kept as an `ext:` node), from
+# a check's evidence_required and from the "A → B → C" chains in dependencies_map. Nodes and references are cached per skeleton in
+# .cache/graph.json; when a rewrite only changes statuses or effort, the
+# adjacency and topological order are reused and only the critical-path pass
+# (remaining effort hours) and the blocker analysis are recomputed.
+#
+#   py dependency_graph.py                 # summary: order, critical path, critical blockers
+#   py dependency_graph.py --impact movius_003
+#   py dependency_graph.py --write         # also publish the summary to the dashboard
+import hashlib, json, os, re, sys, threading, time
+from collections import deque
+from datetime import datetime
+
+import skeleton_store
+from query_engine import iter_items, skeleton_name
+from search_index import tokenize
+
+MOVIUS = 'movius_dependencies_skeleton_v2.json'
+DELIV = 'deliverables_schedule_skeleton_v2.json'
+COMP = 'compliance_verification_skeleton_v2.json'
+VOLS = 'volumes_completion_skeleton_v2.json'
+DEV = 'development_timeline_user_stories_skeleton.json'
+DASH = 'proposal_master_dashboard_skeleton.json'
+FILES = [MOVIUS, DELIV, COMP, VOLS, DEV]
+
+CACHE_NAME = 'graph.json'
+VERSION = 1
+
+NODE_KEYS = {'dependency_id': 'movius', 'deliverable_id': 'deliverable', 'check_id': 'check',
+             'section_id': 'section', 'story_id': 'story'}
+LABEL_KEYS = ('item', 'deliverable_name', 'requirement', 'section_name', 'story_name')
+FEEDS_KEYS = ('requirements_blocked', 'requirements_met', 'requirements_addressed')
+BLOCKED_STATES = {'blocked'}
+DONE_STATES = {'received', 'not_needed', 'approved', 'delivered', 'accepted', 'pass', 'na', 'complete', 'completed', 'done'}
+MATCH_MIN = 0.6  # share of a dependency's tokens an item name must contain...
+MATCH_SHARED = 2  # ...and at least this many ("Award" alone names nothing)
+MAX_TIES = 4     # "Day 30 Plans" may stand for several equally good items
+FILLER = frozenset('all complete completed details final need obtain provide provides provided verify'.split())
+NEEDS_KINDS = ('movius', 'deliverable', 'section', 'story')  # checks verify work, they don't produce it
+CHAIN_SEP = re.compile(r'\s*→\s*')
+REF_RE = re.compile(r'[A-Za-z][\w\-]*')
+PAREN_RE = re.compile(r'\([^)]*\)')
+
+
+def _state(node):
+    s = node.get('status')
+    s = s.get('state') if isinstance(s, dict) else s
+    if node.get('blocked') is True and s not in DONE_STATES:
+        return 'blocked'
+    return s if isinstance(s, str) else None
+
+
+def _hours(node):
+    h = node.get('estimated_effort_hours')
+    return float(h) if isinstance(h, (int, float)) and not isinstance(h, bool) else 0.0
+
+
+def _ref(text):
+    # "requirements_skeleton_v2:rpr_016" / "US-007 (VAID complete)" -> bare id
+    return PAREN_RE.sub('', text).split(':')[-1].strip()
+
+
+def _canon(ref):
+    return re.sub(r'[\s_\-]', '', ref.lower()).replace('section', 'sec')
+
+
+def _slug(text):
+    return 'ext:' + '_'.join(tokenize(text))[:60]
+
+
+def build_segment(fn, key, doc):
+    """Nodes and unresolved references of one skeleton (refs are resolved across skeletons later)."""
+    nodes, refs = {}, []
+    for item_id, ptr, node in iter_items(doc):
+        kind = next((NODE_KEYS[k] for k in NODE_KEYS if k in node), None)
+        if kind is None or item_id in nodes:
+            continue
+        nodes[item_id] = {'kind': kind, 'skeleton': skeleton_name(fn), 'path': ptr,
+                          'label': next((node[k] for k in LABEL_KEYS if isinstance(node.get(k), str)), item_id),
+                          'status': _state(node), 'hours': _hours(node),
+                          'critical': node.get('severity') == 'critical' or node.get('blocking') is True}
+        for k in FEEDS_KEYS:
+            for ref in node.get(k) or []:
+                if isinstance(ref, str):
+                    refs.append(['feeds', item_id, ref])
+        for ref in node.get('links_to') or []:
+            if isinstance(ref, str):
+                refs.append(['link', item_id, ref])
+        for dep in node.get('dependencies') or []:
+            if isinstance(dep, str):
+                refs.append(['needs', item_id, dep])
+        if kind == 'check' and isinstance(node.get('evidence_required'), str):
+            refs.append(['evidence', item_id, node['evidence_required']])
+    if fn == DELIV:
+        dm = doc.get('dependencies_map') or {}
+        chains = list(dm.get('critical_path') or [])
+        for track in (dm.get('parallel_tracks') or {}).values():
+            chains += track if isinstance(track, list) else [track]
+        for c in chains:
+            if isinstance(c, str):
+                refs.append(['chain', None, c])
+    if fn == COMP:
+        for c in doc.get('critical_path_items') or []:
+            if isinstance(c, str):
+                refs.append(['critical', None, c.split(':', 1)[0].strip()])
+    return {'key': list(key), 'nodes': nodes, 'refs': refs}
+
+
+def _structure(seg):
+    """What edges depend on: node ids/names and references, not statuses or hours."""
+    shape = [[i, n['kind'], n['label']] for i, n in sorted(seg['nodes'].items())]
+    return hashlib.sha1(json.dumps([shape, seg['refs']], ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class Resolver:
+    """Free-text dependency -> item ids, by explicit id first, then by name-token overlap."""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.canon = {_canon(i): i for i in nodes}
+        self.postings = {}
+        for i, n in nodes.items():
+            text = n['label']
+            if n['kind'] == 'deliverable':
+                text += ' ' + re.sub(r'(?<=[a-z])(?=\d)', ' ', i)  # day30_001 -> "day 30", for "Day 30 Plans"
+            elif n['kind'] == 'movius':
+                text += ' movius'
+            for t in set(tokenize(text)):
+                self.postings.setdefault(t, set()).add(i)
+
+    def by_id(self, ref):
+        ref = _ref(ref)
+        return ref if ref in self.nodes else self.canon.get(_canon(ref))
+
+    def resolve(self, text, exclude=None, kinds=NEEDS_KINDS):
+        hits = [i for i in (self.by_id(w) for w in REF_RE.findall(text)) if i and i != exclude]
+        if hits:
+            return list(dict.fromkeys(hits))
+        terms = set(tokenize(PAREN_RE.sub('', text))) - FILLER
+        if not terms:
+            return []
+        score = {}
+        for t in terms:
+            for i in self.postings.get(t, ()):
+                if i != exclude and self.nodes[i]['kind'] in kinds:
+                    score[i] = score.get(i, 0) + 1
+        best = max(score.values(), default=0)
+        if best < MATCH_SHARED or best / len(terms) < MATCH_MIN:
+            return []
+        tied = sorted(i for i, s in score.items() if s == best)
+        return tied if len(tied) <= MAX_TIES else []
+
+
+def assemble(segments):
+    """Structure shared by all queries: nodes, adjacency, topological order, cycles."""
+    nodes = {}
+    for fn in FILES:
+        for i, n in (segments.get(fn) or {}).get('nodes', {}).items():
+            nodes.setdefault(i, n)
+    res = Resolver(nodes)
+    edges, unresolved, critical = set(), [], set()
+
+    def ext(text):
+        nid = _slug(text)
+        nodes.setdefault(nid, {'kind': 'external', 'skeleton': None, 'path': None, 'label': text,
+                               'status': None, 'hours': 0.0, 'critical': False})
+        return nid
+
+    def ref(text):
+        # Requirement/Q&A ids that are not items themselves still show up as impacted.
+        nid = _ref(text)
+        nodes.setdefault(nid, {'kind': 'reference', 'skeleton': None, 'path': None, 'label': nid,
+                               'status': None, 'hours': 0.0, 'critical': False})
+        return nid
+
+    for fn in FILES:
+        for mode, src, text in (segments.get(fn) or {}).get('refs', []):
+            if mode in ('feeds', 'link'):
+                dst = res.by_id(text)
+                if dst is None:
+                    edges.add((src, ref(text)))
+                elif mode == 'feeds' or nodes[src]['kind'] == 'movius':
+                    edges.add((src, dst))
+                elif nodes[dst]['kind'] == 'movius':
+                    edges.add((dst, src))
+                # other item-to-item links carry no direction; `dependencies` does
+            elif mode == 'needs':
+                found = res.resolve(text, exclude=src)
+                if not found:
+                    unresolved.append(text)
+                    found = [ext(text)]
+                edges.update((a, src) for a in found)
+            elif mode == 'evidence':
+                # A check waits on whatever produces its evidence; unmatched evidence is not a dependency.
+                edges.update((a, src) for a in res.resolve(text, exclude=src))
+            elif mode == 'chain':
+                steps = [res.resolve(s, kinds=('deliverable',)) or [ext(s)] for s in CHAIN_SEP.split(text) if s.strip()]
+                for prev, nxt in zip(steps, steps[1:]):
+                    edges.update((a, b) for a in prev for b in nxt if a != b)
+            elif mode == 'critical':
+                hit = res.by_id(text)
+                if hit:
+                    critical.add(hit)
+    succ = {i: [] for i in nodes}
+    pred = {i: [] for i in nodes}
+    for a, b in sorted(edges):
+        succ[a].append(b)
+        pred[b].append(a)
+    order, cycles = topological_order(succ, pred)
+    return {'nodes': nodes, 'succ': succ, 'pred': pred, 'order': order, 'cycles': cycles,
+            'critical_items': sorted(critical), 'unresolved': sorted(set(unresolved))}
+
+
+def topological_order(succ, pred):
+    """Kahn's algorithm; nodes left over sit on a cycle and are returned separately."""
+    indeg = {i: len(p) for i, p in pred.items()}
+    ready = deque(sorted(i for i, d in indeg.items() if d == 0))
+    order = []
+    while ready:
+        i = ready.popleft()
+        order.append(i)
+        for j in succ[i]:
+            indeg[j] -= 1
+            if indeg[j] == 0:
+                ready.append(j)
+    return order, sorted(i for i, d in indeg.items() if d > 0)
+
+
+def analyze(g):
+    """Status-dependent results: critical path over remaining effort, and critical blockers."""
+    nodes, pred, succ = g['nodes'], g['pred'], g['succ']
+    remaining = {i: 0.0 if n['status'] in DONE_STATES else n['hours'] for i, n in nodes.items()}
+    dist, back = {}, {}
+    for i in g['order']:
+        p = max((q for q in pred[i] if q in dist), key=lambda q: (dist[q], q), default=None)
+        dist[i] = remaining[i] + (dist[p] if p else 0.0)
+        back[i] = p
+    end = max(dist, key=lambda i: (dist[i], i), default=None)
+    path = []
+    while end is not None:
+        path.append(end)
+        end = back[end]
+    path.reverse()
+    # A critical blocker is a blocked item with no blocked item upstream whose
+    # impact reaches something critical (a critical_path_items check, a critical
+    # severity/blocking item, or the critical path itself).
+    critical = set(g['critical_items']) | set(path) | {i for i, n in nodes.items() if n['critical']}
+    blocked = {i for i, n in nodes.items() if n['status'] in BLOCKED_STATES}
+    blockers = []
+    for i in sorted(blocked):
+        if ancestors(pred, i) & blocked:
+            continue
+        hit = (descendants(succ, i) | {i}) & critical
+        if hit:
+            blockers.append({'id': i, 'label': nodes[i]['label'], 'critical_impact': len(hit)})
+    blockers.sort(key=lambda b: (-b['critical_impact'], b['id']))
+    return {'critical_path': path, 'critical_path_hours': round(dist[path[-1]], 2) if path else 0.0,
+            'critical_blockers': blockers}
+
+
+def descendants(succ, start):
+    return _reach(succ, start)
+
+
+def ancestors(pred, start):
+    return _reach(pred, start)
+
+
+def _reach(adj, start):
+    seen, todo = set(), [start]
+    while todo:
+        for j in adj.get(todo.pop(), ()):
+            if j not in seen:
+                seen.add(j)
+                todo.append(j)
+    seen.discard(start)
+    return seen
+
+
+class DependencyGraph:
+    def __init__(self, root=None, cache_name=CACHE_NAME):
+        self.root = root or skeleton_store.ROOT
+        self.cache_name = cache_name
+        self.lock = threading.Lock()
+        self.segments = None  # filename -> segment
+        self.structure = None  # filename -> structure hash the current graph was assembled from
+        self.graph = None
+        self.analysis = None
+
+    def refresh(self):
+        """Re-read changed skeletons; returns {'rebuilt': [...], 'mode': 'none' | 'status' | 'structure'}."""
+        with self.lock:
+            saved = None
+            if self.segments is None:
+                saved = skeleton_store.read_cache(self.cache_name, {}) or {}
+                if saved.get('version') != VERSION:
+                    saved = {}
+                self.segments = saved.get('segments', {})
+            rebuilt = []
+            for fn in FILES:
+                path = os.path.join(self.root, fn)
+                key = skeleton_store._stat_key(path)
+                seg = self.segments.get(fn)
+                if seg and key is not None and tuple(seg['key']) == key:
+                    continue
+                if key is None:
+                    if seg:
+                        del self.segments[fn]
+                        rebuilt.append(fn)
+                    continue
+                # An unreadable skeleton raises (SkeletonUnreadable) instead of dropping its nodes.
+                self.segments[fn] = build_segment(fn, key, skeleton_store.load(path))
+                rebuilt.append(fn)
+            structure = {fn: _structure(s) for fn, s in self.segments.items()}
+            if self.graph is None and saved and saved.get('structure') == structure:
+                self.graph, self.structure = saved['graph'], structure
+            if self.graph is None or structure != self.structure:
+                self.graph, mode = assemble(self.segments), 'structure'
+            elif rebuilt:
+                # Same shape: swap in the re-read nodes (statuses, hours), keep edges and order.
+                for fn in reversed(FILES):
+                    self.graph['nodes'].update((self.segments.get(fn) or {}).get('nodes', {}))
+                mode = 'status'
+            else:
+                mode = 'none'
+            if mode != 'none' or self.analysis is None:
+                self.analysis = analyze(self.graph)
+            if mode != 'none':
+                skeleton_store.write_cache(self.cache_name, {'version': VERSION, 'segments': self.segments,
+                                                             'structure': structure, 'graph': self.graph})
+            self.structure = structure
+            return {'rebuilt': [skeleton_name(f) for f in rebuilt], 'mode': mode}
+
+    def summary(self):
+        t0 = time.perf_counter()
+        self.refresh()
+        with self.lock:
+            g, a = self.graph, self.analysis
+            return {'ok': True, 'nodes': len(g['nodes']), 'edges': sum(len(s) for s in g['succ'].values()),
+                    'topological_order': g['order'], 'cycles': g['cycles'],
+                    'critical_path': [self._brief(i) for i in a['critical_path']],
+                    'critical_path_hours': a['critical_path_hours'],
+                    'critical_blockers': a['critical_blockers'], 'critical_blockers_count': len(a['critical_blockers']),
+                    'unresolved_dependencies': g['unresolved'],
+                    'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2)}
+
+    def impact(self, node_id):
+        """Everything that transitively waits on `node_id` (breadth-first, with depth and the item it comes through)."""
+        t0 = time.perf_counter()
+        self.refresh()
+        with self.lock:
+            g, a = self.graph, self.analysis
+            if node_id not in g['nodes']:
+                raise KeyError(node_id)
+            succ, nodes = g['succ'], g['nodes']
+            depth, via, todo = {node_id: 0}, {}, deque([node_id])
+            while todo:
+                i = todo.popleft()
+                for j in succ[i]:
+                    if j not in depth:
+                        depth[j], via[j] = depth[i] + 1, i
+                        todo.append(j)
+            on_path = set(a['critical_path'])
+            critical = set(g['critical_items']) | {i for i, n in nodes.items() if n['critical']}
+            impacted = [dict(self._brief(j), depth=depth[j], via=via[j],
+                             critical=j in critical or j in on_path)
+                        for j in sorted(depth, key=lambda j: (depth[j], j)) if j != node_id]
+            upstream = ancestors(g['pred'], node_id)
+            return {'ok': True, 'node': dict(self._brief(node_id), path=nodes[node_id]['path'],
+                                             on_critical_path=node_id in on_path),
+                    'blocked_by': sorted(i for i in upstream if nodes[i]['status'] in BLOCKED_STATES),
+                    'depends_on': sorted(g['pred'][node_id]), 'impacted_count': len(impacted),
+                    'critical_impacted': sum(1 for x in impacted if x['critical']), 'impacted': impacted,
+                    'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2)}
+
+    def _brief(self, i):
+        n = self.graph['nodes'][i]
+        return {'id': i, 'kind': n['kind'], 'skeleton': n['skeleton'], 'label': n['label'], 'status': n['status']}
+
+    def publish(self):
+        """Write the computed blocker count and critical path to the dashboard (only when they changed)."""
+        s = self.summary()
+        out = {'critical_path': [x['id'] for x in s['critical_path']], 'critical_path_hours': s['critical_path_hours'],
+               'critical_blockers': [b['id'] for b in s['critical_blockers']],
+               'nodes': s['nodes'], 'edges': s['edges'], 'cycles': s['cycles']}
+        dash = os.path.join(self.root, DASH)
+        cur = skeleton_store.read_json(dash)
+        prev = ((cur.get('executive_dashboard') or {}).get('dependency_graph') or {})
+        km = ((cur.get('metrics_tracking') or {}).get('key_metrics') or {}).get('critical_blockers')
+        count = s['critical_blockers_count']
+        if {k: prev.get(k) for k in out} == out and (not isinstance(km, dict) or km.get('current_value') == count):
+            return False
+        with skeleton_store.batch() as b:
+            b.set(dash, ('executive_dashboard', 'dependency_graph'),
+                  dict(out, computed_at=datetime.now().isoformat(timespec='seconds')))
+            b.set(dash, ('executive_dashboard', 'proposal_health', 'critical_blockers_count'), count)
+            if isinstance(km, dict):
+                b.set(dash, ('metrics_tracking', 'key_metrics', 'critical_blockers', 'current_value'), count)
+        return True
+
+    def on_skeletons_changed(self, names):
+        """live_events listener: republish when a graph skeleton was written."""
+        if set(names) & set(FILES):
+            self.publish()
+
+
+GRAPH = DependencyGraph()
+
+
+def main(argv=None):
+    argv = list(argv or [])
+    if '--impact' in argv:
+        i = argv.index('--impact') + 1
+        if i >= len(argv):
+            print('usage: dependency_graph.py --impact <item id>', file=sys.stderr)
+            return 2
+        try:
+            print(json.dumps(GRAPH.impact(argv[i]), indent=2, ensure_ascii=False))
+        except KeyError:
+            print(json.dumps({'ok': False, 'error': 'unknown_node', 'id': argv[i]}), file=sys.stderr)
+            return 1
+        return 0
+    res = GRAPH.summary()
+    if '--write' in argv:
+        res['published'] = GRAPH.publish()
+    print(json.dumps(res, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
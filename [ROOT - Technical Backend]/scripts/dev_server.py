@@ -1,30 +1,82 @@
 #!/usr/bin/env python3
-import json, os, subprocess, sys
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import urlparse, parse_qs
+import json, os, queue, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+import alert_engine, dashboard_summary, dependency_graph, item_store, live_events, metrics, query_engine, search_index, skeleton_store, static_cache, task_runner, timeseries, view_engine
+from task_runner import TaskRunner
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 SCRIPTS = os.path.join(ROOT, 'scripts')
 
+# task -> (module, function, *args); modules are imported once by the runner
 TASKS = {
-    'validate_filenames': [sys.executable, os.path.join(SCRIPTS, 'validate_filenames.py')],
-    'check_page_counts': [sys.executable, os.path.join(SCRIPTS, 'check_page_counts.py')],
-    'compute_work_split': [sys.executable, os.path.join(SCRIPTS, 'compute_work_split.py')],
-    'check_fedramp_evidence': [sys.executable, os.path.join(SCRIPTS, 'check_fedramp_evidence.py')],
-    'regen_dashboards': [sys.executable, os.path.join(SCRIPTS, 'update_status.py'), '--regen'],
+    'validate_filenames': ('validate_filenames', 'main'),
+    'check_page_counts': ('check_page_counts', 'main'),
+    'compute_work_split': ('compute_work_split', 'main'),
+    'check_fedramp_evidence': ('check_fedramp_evidence', 'main'),
+    'regen_dashboards': ('update_status', 'cli', ['--regen']),
+    'run_all': ('pipeline', 'main'),  # stale stages only, in parallel, then one regen
+    'evaluate_alerts': ('alert_engine', 'main'),
+    'validate_schemas': ('skeleton_schema', 'main'),
+    'build_dependency_graph': ('dependency_graph', 'main', ['--write']),
 }
 
+TASK_RUNS = metrics.Counter('devserver_task_runs_total', 'Finished task runs.', ('task',))
+TASK_FAILURES = metrics.Counter('devserver_task_failures_total', 'Task runs with a non-zero return code.', ('task',))
+TASK_SECONDS = metrics.Histogram('devserver_task_duration_seconds', 'Task run time (in-process, excludes queueing).', ('task',))
+IMPORT_SECONDS = metrics.Gauge('devserver_task_module_import_seconds', 'One-time import cost of each task module.', ('module',))
+SKEL_READS = metrics.Counter('skeleton_reads_total', 'JSON files parsed by skeleton_store.', ('file',))
+SKEL_READ_BYTES = metrics.Counter('skeleton_read_bytes_total', 'Bytes parsed by skeleton_store.', ('file',))
+SKEL_WRITES = metrics.Counter('skeleton_writes_total', 'Atomic rewrites by skeleton_store.', ('file',))
+SKEL_WRITTEN_BYTES = metrics.Counter('skeleton_written_bytes_total', 'Bytes written by skeleton_store.', ('file',))
+PATCH_REQUESTS = metrics.Counter('devserver_item_patches_total', 'PATCH /items requests by skeleton and status code.',
+                                 ('skeleton', 'code'))
+STATIC_SECONDS = metrics.Histogram('devserver_static_request_duration_seconds', 'Static file responses by status code.',
+                                   ('code',), metrics.HTTP_BUCKETS)
+
+
+def _task_finished(job):
+    TASK_RUNS.inc(job['task'])
+    if not job['ok']:
+        TASK_FAILURES.inc(job['task'])
+    TASK_SECONDS.observe(job['task'], value=(job['duration_ms'] or 0) / 1000.0)
+
+
+def metrics_text():
+    # Import times and skeleton I/O are tracked by their owners; mirror them at scrape time.
+    for mod, sec in list(task_runner.IMPORT_SECONDS.items()):
+        IMPORT_SECONDS.set(mod, value=round(sec, 6))
+    for fn, st in list(skeleton_store.IO_STATS.items()):
+        SKEL_READS.set(fn, value=st['reads'])
+        SKEL_READ_BYTES.set(fn, value=st['read_bytes'])
+        SKEL_WRITES.set(fn, value=st['writes'])
+        SKEL_WRITTEN_BYTES.set(fn, value=st['written_bytes'])
+    return metrics.render()
+
+
+RUNNER = TaskRunner(TASKS, max_workers=int(os.environ.get('DEV_SERVER_WORKERS', '4')), on_finish=_task_finished)
+STATIC = static_cache.StaticCache()
+SSE_KEEPALIVE = 15  # seconds between comment pings on idle /events streams
+
 class Handler(BaseHTTPRequestHandler):
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
     def _set_cors(self):
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PATCH, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-Match, If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
 
-    def _json(self, code, obj):
+    def _json(self, code, obj, etag=None):
         body = json.dumps(obj).encode('utf-8')
         self.send_response(code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
         self._set_cors()
         self.end_headers()
         self.wfile.write(body)
@@ -35,54 +87,302 @@ class Handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def do_GET(self):
-        url = urlparse(self.path)
+        try:
+            return self._get(urlparse(self.path))
+        except skeleton_store.SkeletonUnreadable as e:
+            # Answering from an empty document would look like "nothing to do"; say what is broken instead.
+            return self._json(503, {'ok': False, 'error': 'skeleton_unreadable', 'skeleton': os.path.basename(e.path),
+                                    'detail': str(e.reason)})
+
+    def _get(self, url):
         if url.path == '/health':
             return self._json(200, {'ok': True})
+        if url.path == '/metrics':
+            return self._text(200, metrics_text(), 'text/plain; version=0.0.4; charset=utf-8')
         if url.path == '/run':
             q = parse_qs(url.query)
             task = (q.get('task') or [''])[0]
-            cmd = TASKS.get(task)
-            if not cmd:
+            if task not in TASKS:
                 return self._json(400, {'ok': False, 'error': 'unknown_task', 'task': task})
             try:
-                proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
-                return self._json(200, {
-                    'ok': proc.returncode == 0,
-                    'returncode': proc.returncode,
-                    'stdout': proc.stdout,
-                    'stderr': proc.stderr,
-                    'task': task,
-                })
+                job, coalesced = RUNNER.submit(task, profile=(q.get('profile') or ['0'])[0] == '1')
             except Exception as e:
                 return self._json(500, {'ok': False, 'error': str(e), 'task': task})
+            if (q.get('wait') or ['0'])[0] == '1':
+                # Blocking mode keeps the old synchronous response shape for scripts/curl.
+                job = RUNNER.wait(job['job_id'])
+                return self._json(200, dict(job, coalesced=coalesced))
+            res = {'ok': True, 'job_id': job['job_id'], 'task': task,
+                   'state': job['state'], 'coalesced': coalesced,
+                   'status_url': f"/jobs/{job['job_id']}"}
+            if job['profile']:
+                res['profile_url'] = f"/jobs/{job['job_id']}/profile"
+            return self._json(202, res)
+        if url.path == '/events':
+            return self._events(url)
+        if url.path == '/api/summary':
+            return self._summary()
+        if url.path == '/jobs':
+            return self._json(200, {'ok': True, 'jobs': RUNNER.list()})
+        if url.path.startswith('/jobs/') and url.path.endswith('/profile'):
+            return self._profile(url)
+        if url.path.startswith('/jobs/'):
+            job = RUNNER.get(url.path[len('/jobs/'):])
+            if not job:
+                return self._json(404, {'ok': False, 'error': 'unknown_job'})
+            return self._json(200, job)
+        if url.path == '/query' or url.path.startswith('/query/'):
+            return self._query(url)
+        if url.path.startswith('/items/'):
+            return self._item(url)
+        if url.path == '/search':
+            q = parse_qs(url.query)
+            text = (q.get('q') or [''])[0]
+            if not text.strip():
+                return self._json(400, {'ok': False, 'error': 'missing_q'})
+            skels = (q.get('skeletons') or [''])[0]
+            try:
+                limit = max(1, min(int((q.get('limit') or ['20'])[0]), 200))
+            except ValueError:
+                return self._json(400, {'ok': False, 'error': 'bad_limit'})
+            return self._json(200, search_index.INDEX.search(text, limit, skels.split(',') if skels else None))
+        if url.path == '/graph':
+            return self._json(200, dependency_graph.GRAPH.summary())
+        if url.path == '/graph/impact':
+            node_id = (parse_qs(url.query).get('id') or [''])[0]
+            if not node_id:
+                return self._json(400, {'ok': False, 'error': 'missing_id'})
+            try:
+                return self._json(200, dependency_graph.GRAPH.impact(node_id))
+            except KeyError:
+                return self._json(404, {'ok': False, 'error': 'unknown_node', 'id': node_id})
+        if url.path == '/alerts':
+            return self._json(200, dict(alert_engine.active_alerts(), ok=True))
+        if url.path == '/timeseries':
+            return self._timeseries(url)
+        if url.path == '/views':
+            defs = view_engine.ENGINE.definitions()
+            return self._json(200, {'ok': True, 'views': {k: v.get('query') for k, v in defs.items()}})
+        if url.path.startswith('/views/'):
+            vid = url.path[len('/views/'):]
+            try:
+                return self._json(200, view_engine.ENGINE.get(vid))
+            except KeyError:
+                return self._json(404, {'ok': False, 'error': 'unknown_view', 'view': vid})
         # Serve static files under ROOT (dashboards, JSON, etc.)
-        path = url.path.lstrip('/') or 'dashboard.html'
-        fs_path = os.path.join(ROOT, path)
+        t0 = time.perf_counter()
+        try:
+            return self._static(url.path.lstrip('/') or 'dashboard.html')
+        finally:
+            STATIC_SECONDS.observe(str(getattr(self, '_status', 0)), value=time.perf_counter() - t0)
+
+    def _item_target(self, url):
+        parts = url.path[len('/items/'):].split('/', 1)
+        if len(parts) != 2 or not parts[1]:
+            raise item_store.PatchError(404, 'not_found', path=url.path)
+        return parts[0], unquote(parts[1])
+
+    def _item(self, url):
+        try:
+            skel, item_id = self._item_target(url)
+            item, ptr, tag = item_store.get_item(skel, item_id)
+        except item_store.PatchError as e:
+            return self._json(e.status, e.as_dict())
+        if self.headers.get('If-None-Match') == tag:
+            return self._not_modified(tag)
+        return self._json(200, {'ok': True, 'id': item_id, 'path': ptr, 'item': item}, etag=tag)
+
+    def _not_modified(self, tag):
+        self.send_response(304)
+        self.send_header('ETag', tag)
+        self._set_cors()
+        self.end_headers()
+
+    def _summary(self):
+        # Small precomputed aggregate for the dashboards; rebuilt only when a source skeleton changes.
+        body, tag = dashboard_summary.SUMMARY.get()
+        if self.headers.get('If-None-Match') == tag:
+            return self._not_modified(tag)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', tag)
+        self.send_header('Cache-Control', 'no-cache')
+        self._set_cors()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PATCH(self):
+        # RFC 6902 JSON Patch against one item; paths are relative to the item.
+        url = urlparse(self.path)
+        skel = '-'
+        try:
+            if not url.path.startswith('/items/'):
+                raise item_store.PatchError(404, 'not_found', path=url.path)
+            skel, item_id = self._item_target(url)
+            n = int(self.headers.get('Content-Length') or 0)
+            try:
+                ops = json.loads(self.rfile.read(n).decode('utf-8') or 'null')
+            except ValueError:
+                raise item_store.PatchError(400, 'invalid_json')
+            res = item_store.patch_item(skel, item_id, ops, self.headers.get('If-Match'))
+        except item_store.PatchError as e:
+            PATCH_REQUESTS.inc(skel, str(e.status))
+            return self._json(e.status, e.as_dict())
+        except skeleton_store.WriteRejected as e:
+            PATCH_REQUESTS.inc(skel, '422')
+            return self._json(422, {'ok': False, 'error': 'write_rejected', 'errors': e.errors})
+        except Exception as e:
+            PATCH_REQUESTS.inc(skel, '500')
+            return self._json(500, {'ok': False, 'error': str(e)})
+        PATCH_REQUESTS.inc(skel, '200')
+        return self._json(200, dict(res, ok=True, id=item_id), etag=res['etag'])
+
+    def _text(self, code, text, ctype, filename=None):
+        body = text if isinstance(text, bytes) else text.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        if filename:
+            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        self._set_cors()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _profile(self, url):
+        # Text report by default; ?format=pstats downloads the raw stats (snakeviz, flameprof, pstats).
+        jid = url.path[len('/jobs/'):-len('/profile')]
+        job, prof = RUNNER.get(jid), RUNNER.profile(jid)
+        if not job or not prof:
+            return self._json(404, {'ok': False, 'error': 'no_profile', 'job_id': jid,
+                                    'state': job and job['state'], 'profiled': bool(job and job['profile'])})
+        text, raw = prof
+        if (parse_qs(url.query).get('format') or [''])[0] == 'pstats':
+            return self._text(200, raw, 'application/octet-stream', f"{job['task']}-{jid}.prof")
+        return self._text(200, text, 'text/plain; charset=utf-8')
+
+    def _query(self, url):
+        qid = url.path[len('/query/'):]
+        if not qid:
+            q = parse_qs(url.query)
+            if 'filter' not in q:
+                defs = query_engine.ENGINE.definitions()
+                return self._json(200, {'ok': True, 'queries': {k: v.get('filter') for k, v in defs.items()}})
+            try:
+                skels = q['skeletons'][0].split(',') if q.get('skeletons') else None
+                items = query_engine.ENGINE.run_filter(q['filter'][0], skels)
+            except query_engine.QueryError as e:
+                return self._json(400, {'ok': False, 'error': str(e)})
+            return self._json(200, {'ok': True, 'count': len(items), 'items': items})
+        try:
+            return self._json(200, query_engine.ENGINE.run(qid))
+        except KeyError:
+            return self._json(404, {'ok': False, 'error': 'unknown_query', 'query': qid})
+        except query_engine.QueryError as e:
+            return self._json(400, {'ok': False, 'error': str(e), 'query': qid})
+
+    def _timeseries(self, url):
+        # /timeseries -> series names; ?series=a,b[&since=7d][&step=1h] -> points for trend charts
+        q = parse_qs(url.query)
+        if not q.get('series'):
+            return self._json(200, {'ok': True, 'series': timeseries.list_series()})
+        try:
+            start = time.time() - timeseries.parse_duration(q['since'][0]) if q.get('since') else None
+            step = timeseries.parse_duration(q['step'][0]) if q.get('step') else None
+        except (ValueError, KeyError):
+            return self._json(400, {'ok': False, 'error': 'bad_duration'})
+        return self._json(200, {'ok': True, 'series': {
+            n: [[ts, v] for ts, v in timeseries.query(n, start, None, step)] for n in q['series'][0].split(',')}})
+
+    def _events(self, url):
+        # Server-sent events: one snapshot of the watched fragments, then changes as they are written.
+        # ?keys=summary,status limits the stream (and snapshot) to those fragment keys.
+        keys = (parse_qs(url.query).get('keys') or [''])[0]
+        sub, snapshot = live_events.BUS.subscribe([k for k in keys.split(',') if k] or None)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('X-Accel-Buffering', 'no')
+            self._set_cors()
+            self.end_headers()
+            self.wfile.write(b'retry: 2000\n\n' + b''.join(live_events.encode(ev) for ev in snapshot))
+            self.wfile.flush()
+            while True:
+                try:
+                    ev = sub.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                    self.wfile.flush()
+                    continue
+                if ev is None:
+                    break
+                self.wfile.write(live_events.encode(ev))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            live_events.BUS.unsubscribe(sub)
+
+    def _static(self, path):
+        fs_path = os.path.normpath(os.path.join(ROOT, path))
+        if fs_path != ROOT and not fs_path.startswith(ROOT + os.sep):
+            return self._json(404, {'ok': False, 'error': 'not_found', 'path': path})
         if os.path.isdir(fs_path):
             fs_path = os.path.join(fs_path, 'index.html')
-        if os.path.exists(fs_path):
-            try:
-                with open(fs_path, 'rb') as f:
-                    data = f.read()
-                self.send_response(200)
-                ctype = 'text/html; charset=utf-8'
-                if fs_path.endswith('.json'): ctype = 'application/json; charset=utf-8'
-                if fs_path.endswith('.css'): ctype = 'text/css; charset=utf-8'
-                if fs_path.endswith('.js'): ctype = 'application/javascript; charset=utf-8'
-                self.send_header('Content-Type', ctype)
-                self.send_header('Content-Length', str(len(data)))
+        if not os.path.isfile(fs_path):
+            return self._json(404, {'ok': False, 'error': 'not_found', 'path': path})
+        try:
+            entry = STATIC.get(fs_path)
+            if entry.not_modified(self.headers):
+                self.send_response(304)
+                self._validators(entry)
                 self._set_cors()
                 self.end_headers()
-                self.wfile.write(data)
                 return
-            except Exception as e:
-                return self._json(500, {'ok': False, 'error': str(e)})
-        return self._json(404, {'ok': False, 'error': 'not_found', 'path': path})
+            gz = entry.gzip_data is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+            body = entry.gzip_data if gz else entry.data
+            self.send_response(200)
+            self.send_header('Content-Type', static_cache.content_type(fs_path))
+            self.send_header('Content-Length', str(len(body) if body is not None else entry.size))
+            if gz:
+                self.send_header('Content-Encoding', 'gzip')
+            if entry.gzip_data is not None:
+                self.send_header('Vary', 'Accept-Encoding')
+            self._validators(entry)
+            self._set_cors()
+            self.end_headers()
+            if body is not None:
+                self.wfile.write(body)
+            else:
+                with open(fs_path, 'rb') as f:
+                    self.connection.sendfile(f, count=entry.size)
+        except Exception as e:
+            return self._json(500, {'ok': False, 'error': str(e)})
+
+    def _validators(self, entry):
+        self.send_header('ETag', entry.etag)
+        self.send_header('Last-Modified', entry.last_modified)
+        self.send_header('Cache-Control', 'no-cache')
+
+def publish_summary(names=None):
+    # The `summary` fragment carries only the ETag; pages refetch /api/summary when it changes.
+    if names is None or set(names) & set(dashboard_summary.SOURCES):
+        live_events.BUS.publish('api/summary', 'summary', dashboard_summary.SUMMARY.get()[1])
 
 def main():
     host = '0.0.0.0'
     port = int(os.environ.get('DEV_SERVER_PORT', '8765'))
-    httpd = HTTPServer((host, port), Handler)
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    # The graph and alerts are recomputed whenever a watched skeleton is written, not on a schedule.
+    dependency_graph.GRAPH.publish()  # critical_blockers_count feeds the blocker alert
+    alert_engine.ENGINE.evaluate()
+    search_index.INDEX.refresh()  # loads the persisted index; re-indexes only changed skeletons
+    live_events.BUS.add_listener(dependency_graph.GRAPH.on_skeletons_changed)
+    live_events.BUS.add_listener(alert_engine.ENGINE.on_skeletons_changed)
+    live_events.BUS.add_listener(publish_summary)  # after the writers above, so it sees their output
+    live_events.BUS.start()
+    publish_summary()
     print(f"Dev server running on http://{host}:{port}")
     try:
         httpd.serve_forever()
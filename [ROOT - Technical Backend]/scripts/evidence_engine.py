@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# Declarative evidence rules for every dependency in movius_dependencies_skeleton_v2.json.
+#
+# EVIDENCE_RULES lists requirements per tier (tiers come from the skeleton's
+# tier_definitions), per category and per dependency id; a dependency must meet
+# all that apply. Rules are compiled once into predicates, dependencies are
+# looked up through an id index built in one pass, and a dependency is only
+# re-evaluated when its JSON or the rules changed (fingerprints in
+# .cache/evidence.json). check_fedramp_evidence.py runs this and writes the results.
+import hashlib, json, re
+from datetime import datetime
+
+import skeleton_store
+
+CACHE_NAME = 'evidence.json'
+PLACEHOLDER_RE = re.compile(r'^\s*(tbd|todo|pending)\b', re.I)
+
+# A requirement is met when an evidence entry matches `type` (if given) and any
+# `ref_any` keyword (if given, case-insensitive). `received: True` additionally
+# needs every matching entry not marked `required: false` to be received: a
+# received/verified date and a ref that is not a "TBD - ..." placeholder.
+EVIDENCE_RULES = {
+    'tier': {
+        'tier_1_critical_blocking': [
+            {'key': 'evidence_declared'},
+            {'key': 'required_evidence_received', 'received': True},
+        ],
+        'tier_2_major_impact': [{'key': 'evidence_declared'}],
+        'tier_3_moderate_impact': [],
+        'tier_4_nice_to_have': [],
+    },
+    'category': {
+        'Legal/Contractual': [{'key': 'signed_document', 'type': 'doc'}],
+        'Pricing': [{'key': 'pricing_breakdown', 'type': 'doc', 'ref_any': ['pricing', '.xlsx']}],
+    },
+    'dependency': {
+        # FedRAMP Moderate proof chain (PWS B.4.5.10); also reported as fedramp_evidence_verification.
+        'movius_003': [
+            {'key': 'ato_letter', 'type': 'doc', 'ref_any': ['ato']},
+            {'key': 'ssp_summary', 'type': 'doc', 'ref_any': ['ssp']},
+            {'key': 'marketplace_url', 'type': 'url', 'ref_any': ['marketplace']},
+            {'key': 'marketplace_screenshot', 'type': 'screenshot', 'ref_any': ['marketplace']},
+            {'key': 'sar_3pao', 'type': 'doc', 'ref_any': ['3pao', 'sar']},
+        ],
+    },
+}
+# Tiers listed in tier_definitions without an entry above.
+DEFAULT_TIER_RULES = [{'key': 'evidence_declared'}]
+
+
+def is_received(e):
+    return bool(e.get('received_date') or e.get('verified_date')) and not PLACEHOLDER_RE.match(str(e.get('ref') or ''))
+
+
+def compile_requirement(spec):
+    """spec -> predicate(evidence list) -> bool."""
+    etype, words, received = spec.get('type'), [w.lower() for w in spec.get('ref_any') or []], spec.get('received')
+
+    def matches(e):
+        ref = str(e.get('ref') or '').lower()
+        return (etype is None or e.get('type') == etype) and (not words or any(w in ref for w in words))
+
+    def check(evidence):
+        hits = [e for e in evidence if isinstance(e, dict) and matches(e)]
+        if not hits:
+            return False
+        return not received or all(is_received(e) for e in hits if e.get('required') is not False)
+    return check
+
+
+class RuleSet:
+    def __init__(self, tier_definitions, rules=EVIDENCE_RULES):
+        self.tiers = list(tier_definitions or {})
+        self.fingerprint = hashlib.sha1(json.dumps([self.tiers, rules], sort_keys=True).encode()).hexdigest()
+        compiled = lambda specs: [(s['key'], compile_requirement(s)) for s in specs]
+        self.by_tier = {t: compiled(rules['tier'].get(t, DEFAULT_TIER_RULES)) for t in self.tiers}
+        self.by_category = {c: compiled(s) for c, s in rules['category'].items()}
+        self.by_dependency = {d: compiled(s) for d, s in rules['dependency'].items()}
+
+    def requirements(self, dep):
+        tier = dep.get('tier')
+        if tier not in self.by_tier:
+            return None
+        return self.by_tier[tier] + self.by_category.get(dep.get('category'), []) \
+            + self.by_dependency.get(dep.get('dependency_id'), [])
+
+    def evaluate(self, dep):
+        reqs = self.requirements(dep)
+        res = {'tier': dep.get('tier'), 'category': dep.get('category'),
+               'checked_at': datetime.now().isoformat(timespec='seconds')}
+        if reqs is None:
+            return dict(res, required=[], present=[], missing=[], verification_status='fail', error='unknown_tier')
+        evidence = dep.get('evidence') or []
+        found = {k: check(evidence) for k, check in reqs}
+        return dict(res, required=list(found), present=[k for k, v in found.items() if v],
+                    missing=[k for k, v in found.items() if not v],
+                    verification_status='pass' if all(found.values()) else 'fail')
+
+
+def dep_fingerprint(dep, rules_fp):
+    return hashlib.sha1((rules_fp + json.dumps(dep, sort_keys=True, default=str)).encode()).hexdigest()
+
+
+def evaluate_all(doc, force=False):
+    """({dependency_id: result}, [re-evaluated ids]); unchanged dependencies reuse their cached result."""
+    rules = RuleSet(doc.get('tier_definitions'))
+    index = {d['dependency_id']: d for d in doc.get('dependencies') or [] if isinstance(d, dict) and d.get('dependency_id')}
+    cache = skeleton_store.read_cache(CACHE_NAME, {}) or {}
+    prev = cache.get('deps', {}) if cache.get('rules') == rules.fingerprint and not force else {}
+    out, fresh, evaluated = {}, {}, []
+    for dep_id, dep in index.items():
+        fp = dep_fingerprint(dep, rules.fingerprint)
+        hit = prev.get(dep_id)
+        if hit and hit['fp'] == fp:
+            out[dep_id] = hit['result']
+        else:
+            out[dep_id] = rules.evaluate(dep)
+            evaluated.append(dep_id)
+        fresh[dep_id] = {'fp': fp, 'result': out[dep_id]}
+    if evaluated or set(fresh) != set(prev):
+        skeleton_store.write_cache(CACHE_NAME, {'rules': rules.fingerprint, 'deps': fresh})
+    return out, evaluated
+
+
+def summarize(results):
+    by_tier = {}
+    for r in results.values():
+        t = by_tier.setdefault(r.get('tier') or 'unknown', {'pass': 0, 'fail': 0})
+        t[r['verification_status']] += 1
+    return {'total': len(results), 'pass': sum(t['pass'] for t in by_tier.values()),
+            'fail': sum(t['fail'] for t in by_tier.values()), 'by_tier': dict(sorted(by_tier.items())),
+            'failing': sorted(k for k, r in results.items() if r['verification_status'] == 'fail')}
+
+
+def chain(result, dep_id='movius_003'):
+    """Subset of one dependency's result covering only its dependency-specific rules."""
+    keys = [s['key'] for s in EVIDENCE_RULES['dependency'].get(dep_id, [])]
+    present = set((result or {}).get('present') or [])
+    found = {k: k in present for k in keys}
+    return all(found.values()) and bool(found), found
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# Per-item reads and RFC 6902 JSON Patch writes for the skeletons, behind
+# dev_server.py's GET/PATCH /items/<skeleton>/<item id>.
+#
+# Items are the id-carrying objects query_engine finds (dependency_id, qa_number,
+# req_id, check_id, ...). An id -> JSON pointer index per skeleton makes lookups
+# O(1); it is rebuilt when the file changes underneath it and carried forward
+# across our own writes. Each item has an ETag (hash of its JSON) for
+# If-Match optimistic concurrency. Patches to the same skeleton that arrive
+# within COALESCE_WINDOW are applied together in one locked, atomic write.
+#
+#   py item_store.py movius_dependencies_skeleton_v2 MOV-001
+#   py item_store.py movius_dependencies_skeleton_v2 MOV-001 '[{"op": "replace", "path": "/status/state", "value": "received"}]'
+import copy, hashlib, json, os, sys, threading, time
+from concurrent.futures import Future
+
+import skeleton_schema, skeleton_store
+from query_engine import _item_id, iter_items, skeleton_name
+
+COALESCE_WINDOW = 0.05  # seconds a flush waits for more patches to the same file
+
+
+class PatchError(ValueError):
+    """Patch rejected; `status` is the HTTP code dev_server answers with."""
+
+    def __init__(self, status, error, **detail):
+        super().__init__(error)
+        self.status, self.error, self.detail = status, error, detail
+
+    def as_dict(self):
+        return dict(self.detail, ok=False, error=self.error)
+
+
+def etag(node):
+    return '"%s"' % hashlib.sha1(json.dumps(node, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:20]
+
+
+def id_at(node, ptr):
+    """Item id of `node` found at `ptr` (positional ids depend on the pointer)."""
+    if not isinstance(node, dict) or not ptr:
+        return None
+    return _item_id(node, [int(p) if p.isdigit() else p for p in parse_pointer(ptr)])
+
+
+def etag_matches(if_match, node):
+    """If-Match check; None or '*' always match, weak tags compare by value."""
+    if if_match is None or if_match.strip() == '*':
+        return True
+    tags = [t.strip() for t in if_match.split(',')]
+    return etag(node) in [t[2:] if t.startswith('W/') else t for t in tags]
+
+
+def skeleton_path(name):
+    fn = name if name.endswith('.json') else name + '.json'
+    if fn not in skeleton_store.SKELETON_FILENAMES:
+        raise PatchError(404, 'unknown_skeleton', skeleton=skeleton_name(fn))
+    return os.path.join(skeleton_store.ROOT, fn)
+
+
+# ---- JSON pointer / JSON Patch (RFC 6901 / 6902) ------------------------------
+
+
+def parse_pointer(ptr):
+    if ptr == '':
+        return []
+    if not isinstance(ptr, str) or not ptr.startswith('/'):
+        raise PatchError(400, 'bad_pointer', path=ptr)
+    return [p.replace('~1', '/').replace('~0', '~') for p in ptr[1:].split('/')]
+
+
+def _index(container, token, ptr, append=False):
+    if token == '-' and append:
+        return len(container)
+    if not token.isdigit() or (token != '0' and token.startswith('0')):
+        raise PatchError(409, 'path_not_found', path=ptr)
+    i = int(token)
+    if i > len(container) or (i == len(container) and not append):
+        raise PatchError(409, 'path_not_found', path=ptr)
+    return i
+
+
+def resolve(doc, ptr):
+    node = doc
+    for t in parse_pointer(ptr):
+        if isinstance(node, dict) and t in node:
+            node = node[t]
+        elif isinstance(node, list):
+            node = node[_index(node, t, ptr)]
+        else:
+            raise PatchError(409, 'path_not_found', path=ptr)
+    return node
+
+
+def _parent(doc, ptr):
+    parts = parse_pointer(ptr)
+    if not parts:
+        raise PatchError(400, 'cannot_patch_item_root', path=ptr)
+    parent = resolve(doc, '' if len(parts) == 1 else '/' + '/'.join(
+        p.replace('~', '~0').replace('/', '~1') for p in parts[:-1]))
+    if not isinstance(parent, (dict, list)):
+        raise PatchError(409, 'path_not_found', path=ptr)
+    return parent, parts[-1]
+
+
+def _add(doc, ptr, value):
+    parent, t = _parent(doc, ptr)
+    if isinstance(parent, list):
+        parent.insert(_index(parent, t, ptr, append=True), value)
+    else:
+        parent[t] = value
+
+
+def _remove(doc, ptr):
+    parent, t = _parent(doc, ptr)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, t, ptr))
+    if t not in parent:
+        raise PatchError(409, 'path_not_found', path=ptr)
+    return parent.pop(t)
+
+
+def apply_patch(doc, ops):
+    """Apply RFC 6902 operations to `doc` in place; raises PatchError (doc may be partly modified)."""
+    if not isinstance(ops, list):
+        raise PatchError(400, 'patch_must_be_array')
+    for n, op in enumerate(ops):
+        if not isinstance(op, dict) or op.get('op') not in ('add', 'remove', 'replace', 'move', 'copy', 'test') \
+                or not isinstance(op.get('path'), str):
+            raise PatchError(400, 'bad_operation', index=n)
+        kind, ptr = op['op'], op['path']
+        if kind in ('add', 'replace', 'test') and 'value' not in op:
+            raise PatchError(400, 'missing_value', index=n)
+        if kind in ('move', 'copy') and 'from' not in op:
+            raise PatchError(400, 'missing_from', index=n)
+        if kind in ('move', 'copy') and not isinstance(op['from'], str):
+            raise PatchError(400, 'bad_operation', index=n)
+        if kind == 'add':
+            _add(doc, ptr, copy.deepcopy(op['value']))
+        elif kind == 'remove':
+            _remove(doc, ptr)
+        elif kind == 'replace':
+            parent, t = _parent(doc, ptr)
+            if isinstance(parent, list):
+                parent[_index(parent, t, ptr)] = copy.deepcopy(op['value'])
+            elif t in parent:
+                parent[t] = copy.deepcopy(op['value'])  # in place, keeps key order in the file
+            else:
+                raise PatchError(409, 'path_not_found', path=ptr)
+        elif kind == 'move':
+            if ptr.startswith(op['from'] + '/'):
+                raise PatchError(400, 'move_into_child', index=n)
+            _add(doc, ptr, _remove(doc, op['from']))
+        elif kind == 'copy':
+            _add(doc, ptr, copy.deepcopy(resolve(doc, op['from'])))
+        elif json.dumps(resolve(doc, ptr), sort_keys=True) != json.dumps(op['value'], sort_keys=True):
+            raise PatchError(409, 'test_failed', index=n, path=ptr)
+
+
+# ---- id -> pointer index ------------------------------------------------------
+
+
+class ItemIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}  # path -> (stat key, {item id: [pointer, ...]})
+
+    @staticmethod
+    def build(doc):
+        table = {}
+        for item_id, ptr, _ in iter_items(doc):
+            table.setdefault(item_id, []).append(ptr)
+        return table
+
+    def _rebuild(self, path, doc, key):
+        table = self.build(doc)
+        with self.lock:
+            self.tables[path] = (key, table)
+        return table
+
+    def locate(self, path, doc, item_id, key=None):
+        """Pointer of `item_id` in `doc` (the current contents of `path`)."""
+        key = key or skeleton_store._stat_key(path)
+        with self.lock:
+            hit = self.tables.get(path)
+        if not hit or hit[0] != key:
+            ptrs = self._rebuild(path, doc, key).get(item_id)
+        else:
+            ptrs = hit[1].get(item_id)
+            if not ptrs or not all(self._points_at(doc, p, item_id) for p in ptrs):
+                # New item, or an earlier patch moved things: rebuild from this document.
+                ptrs = self._rebuild(path, doc, key).get(item_id)
+        if not ptrs:
+            raise PatchError(404, 'unknown_item', skeleton=skeleton_name(os.path.basename(path)), id=item_id)
+        if len(ptrs) > 1:
+            raise PatchError(409, 'ambiguous_id', id=item_id, paths=ptrs)
+        return ptrs[0]
+
+    @staticmethod
+    def _points_at(doc, ptr, item_id):
+        try:
+            return id_at(resolve(doc, ptr), ptr) == item_id
+        except PatchError:
+            return False
+
+    def carry_forward(self, path, table_key):
+        """After our own write, keep the (still valid) table under the file's new stat key."""
+        with self.lock:
+            hit = self.tables.get(path)
+            if hit:
+                self.tables[path] = (table_key, hit[1])
+
+
+INDEX = ItemIndex()
+
+
+def get_item(skeleton, item_id):
+    """(item, pointer, etag) for one item."""
+    path = skeleton_path(skeleton)
+    try:
+        doc = skeleton_store.load(path)
+    except FileNotFoundError:
+        raise PatchError(404, 'unknown_skeleton', skeleton=skeleton)
+    ptr = INDEX.locate(path, doc, str(item_id))
+    node = resolve(doc, ptr)
+    return node, ptr, etag(node)
+
+
+# ---- coalescing writer --------------------------------------------------------
+
+
+class PatchQueue:
+    """Patches for one file that arrive within `window` share one skeleton_store batch."""
+
+    def __init__(self, window=COALESCE_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.pending = {}  # path -> [(item id, ops, if_match, future)]
+
+    def submit(self, skeleton, item_id, ops, if_match=None):
+        """Blocks until the write containing this patch is done; returns {'item', 'etag', 'path', 'coalesced'}."""
+        path = skeleton_path(skeleton)
+        fut = Future()
+        with self.lock:
+            reqs = self.pending.get(path)
+            leader = reqs is None
+            if leader:
+                reqs = self.pending[path] = []
+            reqs.append((str(item_id), ops, if_match, fut))
+        if leader:
+            time.sleep(self.window)
+            with self.lock:
+                reqs = self.pending.pop(path)
+            self._flush(path, reqs)
+        return fut.result()
+
+    def _flush(self, path, reqs):
+        results = [None] * len(reqs)
+
+        def update(doc):
+            key = skeleton_store._stat_key(path)
+            applied = []  # (request no, item node, item before the patch)
+            for n, (item_id, ops, if_match, _) in enumerate(reqs):
+                try:
+                    ptr = INDEX.locate(path, doc, item_id, key)
+                    node = resolve(doc, ptr)
+                    if not etag_matches(if_match, node):
+                        raise PatchError(412, 'etag_mismatch', id=item_id, etag=etag(node))
+                    # Patch a copy so a failing patch leaves the item untouched.
+                    new = copy.deepcopy(node)
+                    apply_patch(new, ops)
+                    if id_at(new, ptr) != item_id:
+                        raise PatchError(409, 'id_changed', id=item_id)
+                    applied.append((n, node, copy.deepcopy(node)))
+                    node.clear()
+                    node.update(new)
+                    results[n] = {'item': new, 'etag': etag(new), 'path': ptr}
+                except Exception as e:  # one bad patch fails its own request, not the whole batch
+                    results[n] = e
+            if applied and skeleton_schema.validate(path, doc):
+                # Some patch breaks the schema: replay one at a time and drop only the offenders,
+                # instead of letting skeleton_store reject the whole coalesced write.
+                for n, node, old in reversed(applied):
+                    node.clear()
+                    node.update(old)
+                for n, node, old in applied:
+                    node.clear()
+                    node.update(results[n]['item'])
+                    errors = skeleton_schema.validate(path, doc)
+                    if errors:
+                        node.clear()
+                        node.update(old)
+                        results[n] = PatchError(422, 'schema_violation', id=reqs[n][0], errors=errors)
+        try:
+            with skeleton_store.batch() as b:
+                b.mutate(path, update)
+        except Exception as e:
+            for *_, fut in reqs:
+                fut.set_exception(e)
+            return
+        INDEX.carry_forward(path, skeleton_store._stat_key(path))
+        for (*_, fut), res in zip(reqs, results):
+            if isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(dict(res, coalesced=len(reqs)))
+
+
+QUEUE = PatchQueue()
+
+
+def patch_item(skeleton, item_id, ops, if_match=None):
+    return QUEUE.submit(skeleton, item_id, ops, if_match)
+
+
+def main(argv=None):
+    argv = list(argv or [])
+    if len(argv) < 2:
+        print('usage: item_store.py <skeleton> <item id> [json patch]', file=sys.stderr)
+        return 2
+    try:
+        if len(argv) > 2:
+            res = patch_item(argv[0], argv[1], json.loads(argv[2]))
+        else:
+            item, ptr, tag = get_item(argv[0], argv[1])
+            res = {'item': item, 'etag': tag, 'path': ptr}
+    except PatchError as e:
+        print(json.dumps(e.as_dict()), file=sys.stderr)
+        return 1
+    print(json.dumps(res, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
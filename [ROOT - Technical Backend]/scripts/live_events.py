@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# Change feed behind dev_server.py's /events (server-sent events).
+# A watcher thread follows the skeleton files (inotify on Linux, mtime polling
+# elsewhere); when one is rewritten, only the watched fragments whose value
+# changed (heartbeats, verification status, page counts) are pushed to subscribers.
+# In-process producers can push derived values the same way with publish()
+# (dev_server publishes the /api/summary ETag as the `summary` fragment).
+import ctypes, ctypes.util, json, os, queue, select, struct, sys, threading, time
+
+import skeleton_store
+
+POLL_INTERVAL = 0.5   # seconds, fallback watcher
+DEBOUNCE = 0.05       # coalesce bursts of writes to the same file
+QUEUE_SIZE = 1000     # a subscriber this far behind is dropped (EventSource reconnects)
+
+DASH = 'proposal_master_dashboard_skeleton.json'
+COMP = 'compliance_verification_skeleton_v2.json'
+
+# (skeleton, top-level key, expand): expand=True pushes each child key separately.
+FRAGMENTS = [
+    (DASH, 'health_heartbeat', True),
+    (DASH, 'page_counts', False),
+    (DASH, 'filename_validation', False),
+    (DASH, 'status', False),
+    (DASH, 'alerts', False),
+    (COMP, 'verification_status', False),
+    (COMP, 'work_split_verification', False),
+    (COMP, 'fedramp_evidence_verification', False),
+]
+# Also watched without pushing fragments, so listeners (alert_engine, dependency_graph) see their writes.
+EXTRA_WATCHED = ['document_output_compliance_skeleton.json', 'movius_dependencies_skeleton_v2.json',
+                 'deliverables_schedule_skeleton_v2.json', 'volumes_completion_skeleton_v2.json',
+                 'development_timeline_user_stories_skeleton.json']
+WATCHED = sorted({f for f, _, _ in FRAGMENTS} | set(EXTRA_WATCHED))
+
+
+def fragments_of(name, doc):
+    """{dotted key: value} for the watched fragments of one skeleton."""
+    out = {}
+    for fn, key, expand in FRAGMENTS:
+        if fn != name or not isinstance(doc, dict) or key not in doc:
+            continue
+        val = doc[key]
+        if expand and isinstance(val, dict):
+            for k, v in val.items():
+                out[f'{key}.{k}'] = v
+        else:
+            out[key] = val
+    return out
+
+
+class Subscriber:
+    def __init__(self, keys=None):
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.closed = False
+        self.keys = set(keys) if keys else None  # only these fragment keys; None = all
+
+    def wants(self, key):
+        return self.keys is None or key in self.keys
+
+    def get(self, timeout):
+        """Next event, None if the subscriber was dropped; raises queue.Empty on timeout."""
+        if self.closed:
+            return None
+        return self.queue.get(timeout=timeout)
+
+
+class EventBus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.values = {}   # (skeleton, key) -> json text of last pushed value
+        self.seq = 0
+        self.watcher = None
+        self.listeners = []  # fn(names) called after each change, outside the lock
+
+    def add_listener(self, fn):
+        self.listeners.append(fn)
+
+    def start(self):
+        with self.lock:
+            self._ensure_started()
+
+    def _ensure_started(self):
+        if self.watcher is None:
+            for n in WATCHED:
+                self._scan(n, publish=False)
+            self.watcher = threading.Thread(target=watch, args=(self.changed,), name='skeleton-watch', daemon=True)
+            self.watcher.start()
+
+    def subscribe(self, keys=None):
+        """(subscriber, snapshot events) taken atomically, so no change falls in between."""
+        with self.lock:
+            self._ensure_started()
+            sub = Subscriber(keys)
+            self.subscribers.add(sub)
+            snap = [self._event(fn, key, text) for (fn, key), text in sorted(self.values.items()) if sub.wants(key)]
+        return sub, snap
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            self.subscribers.discard(sub)
+
+    def _event(self, fn, key, text):
+        return {'id': self.seq, 'skeleton': fn, 'key': key, 'value': text}
+
+    def _scan(self, name, publish=True):
+        try:
+            doc = skeleton_store.read_json(os.path.join(skeleton_store.ROOT, name))
+        except skeleton_store.SkeletonUnreadable:
+            return  # keep the last good fragments; the write that fixes the file rescans it
+        cur = {(name, k): json.dumps(v, sort_keys=True) for k, v in fragments_of(name, doc).items()}
+        old = {k: v for k, v in self.values.items() if k[0] == name}
+        changed = [(k, cur.get(k, 'null')) for k in sorted(set(cur) | set(old)) if cur.get(k) != old.get(k)]
+        for k, text in changed:
+            if k in cur:
+                self.values[k] = text
+            else:
+                self.values.pop(k, None)
+            if publish:
+                self._broadcast(k, text)
+
+    def _broadcast(self, k, text):
+        self.seq += 1
+        ev = self._event(k[0], k[1], text)
+        for sub in list(self.subscribers):
+            if not sub.wants(k[1]):
+                continue
+            try:
+                sub.queue.put_nowait(ev)
+            except queue.Full:
+                sub.closed = True
+                self.subscribers.discard(sub)
+
+    def publish(self, source, key, value):
+        """Push a value computed in-process as fragment `key`; a no-op when it is unchanged."""
+        text = json.dumps(value, sort_keys=True)
+        with self.lock:
+            if self.values.get((source, key)) == text:
+                return
+            self.values[(source, key)] = text
+            self._broadcast((source, key), text)
+
+    def changed(self, names):
+        with self.lock:
+            for n in names:
+                self._scan(n)
+        for fn in list(self.listeners):
+            try:
+                fn(names)
+            except Exception as e:
+                print(f'live_events listener failed: {e}', file=sys.stderr)
+
+
+def encode(ev):
+    """SSE wire format; `value` is already JSON text."""
+    data = '{"skeleton":%s,"key":%s,"value":%s}' % (json.dumps(ev['skeleton']), json.dumps(ev['key']), ev['value'])
+    return f"id: {ev['id']}\nevent: fragment\ndata: {data}\n\n".encode('utf-8')
+
+
+# --- watchers ---------------------------------------------------------------
+
+IN_CLOSE_WRITE, IN_MOVED_TO = 0x08, 0x80
+
+
+def _inotify_fd(path):
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+
+def _watch_inotify(fd, callback):
+    # Atomic writes (temp file + os.replace) arrive as IN_MOVED_TO, in-place edits as IN_CLOSE_WRITE.
+    names = set()
+    while True:
+        r, _, _ = select.select([fd], [], [], DEBOUNCE if names else None)
+        if not r:
+            callback(sorted(names))
+            names.clear()
+            continue
+        buf = os.read(fd, 64 * 1024)
+        i = 0
+        while i + 16 <= len(buf):
+            _, _, _, ln = struct.unpack_from('iIII', buf, i)
+            n = buf[i + 16:i + 16 + ln].rstrip(b'\0').decode('utf-8', 'replace')
+            if n in WATCHED:
+                names.add(n)
+            i += 16 + ln
+
+
+def _watch_poll(callback):
+    def stats():
+        out = {}
+        for n in WATCHED:
+            try:
+                st = os.stat(os.path.join(skeleton_store.ROOT, n))
+                out[n] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                out[n] = None
+        return out
+    last = stats()
+    while True:
+        time.sleep(POLL_INTERVAL)
+        cur = stats()
+        changed = [n for n in WATCHED if cur[n] != last[n]]
+        last = cur
+        if changed:
+            callback(changed)
+
+
+def watch(callback):
+    """Block forever, calling callback(list_of_skeleton_names) after they change."""
+    fd = None if os.environ.get('LIVE_EVENTS_POLL') == '1' else _inotify_fd(skeleton_store.ROOT)
+    if fd is not None:
+        _watch_inotify(fd, callback)
+    else:
+        _watch_poll(callback)
+
+
+BUS = EventBus()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Minimal in-process metrics for dev_server.py's /metrics (Prometheus text format 0.0.4).
+# Counters and histograms keyed by label values; no external client library.
+import bisect, threading
+
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+HTTP_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+_lock = threading.Lock()
+REGISTRY = []
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    esc = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for v in values)
+    return '{' + ','.join(f'{n}="{v}"' for n, v in zip(names, esc)) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.values = {}
+        REGISTRY.append(self)
+
+    def inc(self, *label_values, amount=1):
+        with _lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def set(self, *label_values, value):
+        # For totals tracked elsewhere (e.g. skeleton_store.IO_STATS), mirrored at scrape time.
+        with _lock:
+            self.values[label_values] = value
+
+    def samples(self):
+        with _lock:
+            return [(self.name, _labels(self.labels, k), v) for k, v in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=TASK_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        REGISTRY.append(self)
+
+    def observe(self, *label_values, value):
+        with _lock:
+            v = self.values.get(label_values)
+            if v is None:
+                v = self.values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            v[bisect.bisect_left(self.buckets, value)] += 1
+            v[-1] += value
+
+    def samples(self):
+        out = []
+        with _lock:
+            items = sorted((k, list(v)) for k, v in self.values.items())
+        for k, v in items:
+            acc = 0
+            for le, n in zip(self.buckets + ('+Inf',), v[:-1]):
+                acc += n
+                out.append((self.name + '_bucket', _labels(self.labels + ('le',), k + (le,)), acc))
+            out.append((self.name + '_sum', _labels(self.labels, k), round(v[-1], 6)))
+            out.append((self.name + '_count', _labels(self.labels, k), acc))
+        return out
+
+
+def render():
+    """Exposition text for every registered metric."""
+    lines = []
+    for m in list(REGISTRY):
+        lines.append(f'# HELP {m.name} {m.help}')
+        lines.append(f'# TYPE {m.name} {m.kind}')
+        lines.extend(f'{name}{labels} {value}' for name, labels, value in m.samples())
+    return '\n'.join(lines) + '\n'
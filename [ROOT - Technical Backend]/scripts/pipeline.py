@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# Make-style runner for the check scripts (the "Suggested run order").
+# Each stage declares its inputs and the skeleton keys it writes; a stage runs
+# after the stages producing its inputs, independent stages run in parallel,
+# and a stage is skipped when its input fingerprint matches its last
+# completed run. A check that runs and reports "fail" (exit code 1) has
+# completed: only a crash (exception, unexpected code) blocks its dependents.
+# Ends with one dashboard regen.
+#
+#   py pipeline.py [--force] [--dry-run] [stage ...]
+import hashlib, json, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import skeleton_store
+from task_runner import CRASHED, call_task
+
+ROOT = skeleton_store.ROOT
+SCRIPTS = os.path.join(ROOT, 'scripts')
+DRAFTS_DIR = os.path.join(ROOT, 'working_drafts')
+PRICE_XLSX = os.path.join(ROOT, 'RPRTech_Schedule B.xlsx')
+STATE_NAME = 'pipeline.json'
+CHECK_FAILED = 1  # exit code of a check script that ran and reported a failing verdict
+
+MOVIUS = 'movius_dependencies_skeleton_v2.json'
+COMP = 'compliance_verification_skeleton_v2.json'
+REQS = 'requirements_skeleton_v2.json'
+VOLS = 'volumes_completion_skeleton_v2.json'
+DOCS = 'document_output_compliance_skeleton.json'
+DASH = 'proposal_master_dashboard_skeleton.json'
+DELIV = 'deliverables_schedule_skeleton_v2.json'
+DEV = 'development_timeline_user_stories_skeleton.json'
+
+# Inputs: a path (file or directory tree, relative to ROOT) or a (skeleton, key)
+# pair, which fingerprints only that key so unrelated writes (heartbeats) to the
+# same skeleton don't invalidate the stage. The stage's own script is always an input.
+# 'order_only': the stage runs after the stages it reads from but is never blocked by them.
+STAGES = {
+    'validate_filenames': {
+        'spec': ('validate_filenames', 'main'),
+        'inputs': ['working_drafts', (DOCS, 'required_filenames')],
+        'outputs': [(DASH, 'filename_validation')],
+    },
+    'check_page_counts': {
+        'spec': ('check_page_counts', 'main'),
+        'inputs': ['working_drafts'],
+        'outputs': [(DASH, 'page_counts')],
+    },
+    'compute_work_split': {
+        'spec': ('compute_work_split', 'main'),
+        'inputs': ['RPRTech_Schedule B.xlsx', 'scripts/pricing_engine.py'],
+        'outputs': [(REQS, 'work_split_calculation'), (COMP, 'work_split_verification'),
+                    (VOLS, 'work_split_cross_reference'), (DASH, 'health_heartbeat.work_split')],
+    },
+    'check_fedramp_evidence': {
+        'spec': ('check_fedramp_evidence', 'main'),
+        'inputs': [(MOVIUS, 'dependencies'), (MOVIUS, 'tier_definitions'), 'scripts/evidence_engine.py'],
+        'outputs': [(COMP, 'fedramp_evidence_verification'), (COMP, 'evidence_verification'),
+                    (DASH, 'health_heartbeat.fedramp_evidence')],
+    },
+    'build_dependency_graph': {
+        'spec': ('dependency_graph', 'main', ['--write']),
+        'inputs': [(MOVIUS, 'dependencies'), (DELIV, 'deliverables_by_timeline'), (DELIV, 'dependencies_map'),
+                   (COMP, 'verification_categories'), (COMP, 'critical_path_items'), (VOLS, 'volumes'),
+                   (DEV, 'user_stories_backlog')],
+        'outputs': [(DASH, 'executive_dashboard.dependency_graph'),
+                    (DASH, 'executive_dashboard.proposal_health.critical_blockers_count'),
+                    (DASH, 'metrics_tracking.key_metrics.critical_blockers')],
+    },
+    'evaluate_alerts': {
+        'spec': ('alert_engine', 'main'),
+        'inputs': [(DASH, 'metrics_tracking.key_metrics'), (DASH, 'alerts.alert_rules'),
+                   (DASH, 'executive_dashboard.blocker_analysis.active_blockers'), (DASH, 'health_heartbeat'),
+                   (COMP, 'work_split_verification'), (COMP, 'fedramp_evidence_verification'), (DOCS, 'volumes')],
+        'outputs': [(DASH, 'alerts.active_alerts')],
+        'order_only': True,  # failed producers are what it alerts on
+    },
+}
+REGEN = ('update_status', 'cli', ['--regen'])
+
+
+def _overlaps(a, b):
+    # Same skeleton, and one dotted key is the other or one of its parents.
+    return a[0] == b[0] and (a[1] == b[1] or a[1].startswith(b[1] + '.') or b[1].startswith(a[1] + '.'))
+
+
+def dependencies(stages=STAGES):
+    """stage -> set of stages whose outputs it reads."""
+    return {name: {other for other, o in stages.items() if other != name
+                   and any(_overlaps(tuple(i), tuple(out)) for i in st['inputs'] if not isinstance(i, str) for out in o['outputs'])}
+            for name, st in stages.items()}
+
+
+def _tree_sig(path, h):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        h.update(b'missing\0')
+        return
+    if not os.path.isdir(path):
+        h.update(f'{st.st_size}:{st.st_mtime_ns}\0'.encode())
+        return
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        with os.scandir(os.path.join(path, rel)) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for e in entries:
+            r = f'{rel}/{e.name}' if rel else e.name
+            if e.is_dir(follow_symlinks=False):
+                stack.append(r)
+            elif e.is_file():
+                s = e.stat()
+                h.update(f'{r}:{s.st_size}:{s.st_mtime_ns}\0'.encode())
+
+
+def _key_value(doc, dotted):
+    node = doc
+    for k in dotted.split('.'):
+        node = node.get(k) if isinstance(node, dict) else None
+    return node
+
+
+def fingerprint(stage, st):
+    h = hashlib.sha1()
+    for i in [f"scripts/{st['spec'][0]}.py"] + list(st['inputs']):
+        if isinstance(i, str):
+            h.update(f'path:{i}\0'.encode())
+            _tree_sig(os.path.join(ROOT, i), h)
+        else:
+            fn, key = i
+            try:
+                val = _key_value(skeleton_store.read_json(os.path.join(ROOT, fn)), key)
+            except skeleton_store.SkeletonUnreadable:
+                val = {'unreadable': True}  # re-run the stage, so it fails visibly
+            h.update(f'key:{fn}:{key}\0'.encode())
+            h.update(json.dumps(val, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def run(only=None, force=False, dry_run=False, regen=True, max_workers=4):
+    t0 = time.perf_counter()
+    deps = dependencies()
+    selected = set(only or STAGES)
+    unknown = selected - set(STAGES)
+    if unknown:
+        return {'ok': False, 'error': f"unknown_stage:{','.join(sorted(unknown))}"}
+    state = skeleton_store.read_cache(STATE_NAME, {}) or {}
+    results, pending = {}, {s for s in STAGES if s in selected}
+
+    def run_stage(name):
+        st = STAGES[name]
+        fp = fingerprint(name, st)
+        prev = state.get(name) or {}
+        if not force and prev.get('completed') and prev.get('fingerprint') == fp:
+            return {'state': 'skipped', 'reason': 'up_to_date', 'verdict': prev.get('verdict'),
+                    'last_run': prev.get('finished_at')}
+        if dry_run:
+            return {'state': 'stale', 'reason': 'forced' if force else ('changed' if prev else 'never_run')}
+        s0 = time.perf_counter()
+        rc, out, err = call_task(st['spec'])
+        completed = rc in (0, CHECK_FAILED)
+        res = {'state': 'done' if completed else 'failed', 'returncode': rc,
+               'elapsed_ms': round((time.perf_counter() - s0) * 1000, 2)}
+        if completed:
+            res['verdict'] = 'pass' if rc == 0 else 'fail'
+        else:
+            res['reason'] = 'crashed' if rc == CRASHED else 'unexpected_returncode'
+        if rc != 0:
+            res['stderr'] = err[-2000:] or out[-2000:]
+        # The fingerprint taken before the run is recorded, so inputs that change
+        # mid-run make the stage stale again. A crash records no fingerprint and reruns.
+        state[name] = {'fingerprint': fp if completed else None, 'completed': completed, 'verdict': res.get('verdict'),
+                       'finished_at': datetime.now().isoformat(timespec='seconds')}
+        return res
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stage') as pool:
+        while pending:
+            ready = [s for s in sorted(pending) if not (deps[s] & pending)]
+            blocked = [s for s in ready if not STAGES[s].get('order_only')
+                       and any(results.get(d, {}).get('state') in ('failed', 'blocked') for d in deps[s])]
+            for s in blocked:
+                results[s] = {'state': 'blocked', 'reason': 'dependency_failed'}
+            ready = [s for s in ready if s not in blocked]
+            for s, res in zip(ready, pool.map(run_stage, ready)):
+                results[s] = res
+            pending -= set(ready) | set(blocked)
+    if not dry_run:
+        skeleton_store.write_cache(STATE_NAME, state)
+    report = {'stages': results, 'checks_failed': sorted(s for s, r in results.items() if r.get('verdict') == 'fail')}
+    if regen and not dry_run:
+        rc, out, err = call_task(REGEN)
+        report['regen'] = {'state': 'done' if rc == 0 else 'failed', 'returncode': rc, 'message': (out or err).strip()}
+    # ok: nothing crashed and every check passes (a skipped stage keeps its last verdict).
+    report['crashed'] = sorted(s for s, r in results.items() if r['state'] in ('failed', 'blocked'))
+    report['ok'] = not report['crashed'] and not report['checks_failed'] \
+        and report.get('regen', {}).get('returncode', 0) == 0
+    report['elapsed_ms'] = round((time.perf_counter() - t0) * 1000, 2)
+    return report
+
+
+def main(argv=None):
+    argv = list(argv or [])
+    rep = run(only=[a for a in argv if not a.startswith('--')] or None,
+              force='--force' in argv, dry_run='--dry-run' in argv)
+    print(json.dumps(rep, indent=2))
+    return 0 if rep.get('ok') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Schedule B pricing: one streaming pass over every sheet of the workbook,
+# aggregated per (CLIN, contractor) into a columnar table that is cached by
+# workbook hash. Work-split totals and "what-if" edits are computed from the
+# table without reopening the workbook.
+#
+#   py pricing_engine.py ["RPRTech_Schedule B.xlsx"] [--what-if 0001=12500] [--what-if 0003@movius=0]
+import hashlib, json, os, sys, threading
+from array import array
+
+import skeleton_store
+
+try:
+    import openpyxl  # for reading Schedule B.xlsx
+except Exception:
+    openpyxl = None
+
+PRICE_XLSX = os.path.join(skeleton_store.ROOT, 'RPRTech_Schedule B.xlsx')
+CACHE_NAME = 'pricing.json'
+RPR_THRESHOLD = 50.01  # VAAR 852.219-75: prime must perform > 50%
+
+
+def classify(contractor):
+    c = (contractor or '').strip().lower() if isinstance(contractor, str) else ''
+    if 'rpr' in c:
+        return 'rpr'
+    if 'movius' in c or 'sub' in c:
+        return 'movius'
+    return 'other'
+
+
+class PriceTable:
+    """Columnar (clin, contractor) -> price/row-count aggregates."""
+
+    def __init__(self, clins=None, contractors=None, prices=None, rows=None, sheets=None):
+        self.clins = list(clins or [])
+        self.contractors = list(contractors or [])
+        self.prices = array('d', prices or [])
+        self.rows = array('I', rows or [])
+        self.sheets = list(sheets or [])
+        self._pos = {(c, k): i for i, (c, k) in enumerate(zip(self.clins, self.contractors))}
+
+    def add(self, clin, contractor, price):
+        i = self._pos.get((clin, contractor))
+        if i is None:
+            i = self._pos[(clin, contractor)] = len(self.clins)
+            self.clins.append(clin)
+            self.contractors.append(contractor)
+            self.prices.append(0.0)
+            self.rows.append(0)
+        self.prices[i] += price
+        self.rows[i] += 1
+
+    def to_json(self):
+        return {'clins': self.clins, 'contractors': self.contractors, 'prices': list(self.prices),
+                'rows': list(self.rows), 'sheets': self.sheets}
+
+    @classmethod
+    def from_json(cls, d):
+        return cls(d.get('clins'), d.get('contractors'), d.get('prices'), d.get('rows'), d.get('sheets'))
+
+
+def _sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_table(xlsx_path):
+    """Stream all sheets (read-only mode). Expected columns per sheet: CLIN, Contractor, ExtendedPrice,
+    header in row 1. Rows with neither CLIN nor contractor, and CLIN cells starting with 'total', are skipped."""
+    wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        t = PriceTable()
+        for ws in wb.worksheets:
+            used = False
+            for row in ws.iter_rows(min_row=2, max_col=3, values_only=True):
+                if not row:
+                    continue
+                row = tuple(row) + (None,) * (3 - len(row))
+                clin = (row[0] or '').strip() if isinstance(row[0], str) else str(row[0] or '')
+                if (not clin and not row[1]) or clin.lower().startswith('total'):
+                    continue
+                try:
+                    price = float(row[2] or 0)
+                except Exception:
+                    price = 0.0
+                t.add(clin, classify(row[1]), price)
+                used = True
+            if used:
+                t.sheets.append(ws.title)
+        return t
+    finally:
+        wb.close()
+
+
+_mem = {}
+_mem_lock = threading.Lock()
+
+
+def load(xlsx_path=PRICE_XLSX):
+    """(table, sha1, cached). Same size/mtime or same content hash -> no workbook parse."""
+    st = os.stat(xlsx_path)
+    stat = [st.st_size, st.st_mtime_ns]
+    with _mem_lock:
+        hit = _mem.get(xlsx_path)
+    if hit and hit['stat'] == stat:
+        return hit['table'], hit['sha1'], True
+    disk = skeleton_store.read_cache(CACHE_NAME, {}) or {}
+    entry = disk.get(os.path.basename(xlsx_path)) or {}
+    if entry.get('stat') == stat:
+        sha1, cached = entry['sha1'], True
+    else:
+        sha1 = _sha1(xlsx_path)
+        cached = entry.get('sha1') == sha1
+    if cached and entry.get('table'):
+        table = PriceTable.from_json(entry['table'])
+    else:
+        table, cached = read_table(xlsx_path), False
+    if not cached or entry.get('stat') != stat:
+        disk[os.path.basename(xlsx_path)] = {'stat': stat, 'sha1': sha1, 'table': table.to_json()}
+        skeleton_store.write_cache(CACHE_NAME, disk)
+    with _mem_lock:
+        _mem[xlsx_path] = {'stat': stat, 'sha1': sha1, 'table': table}
+    return table, sha1, cached
+
+
+def parse_overrides(items):
+    """['0001=12500', '0003@movius=0'] -> {('0001', None): 12500.0, ('0003', 'movius'): 0.0}"""
+    out = {}
+    for it in items:
+        key, _, val = it.partition('=')
+        clin, _, who = key.partition('@')
+        out[(clin.strip(), who.strip().lower() or None)] = float(val)
+    return out
+
+
+def totals(table, overrides=None, threshold=RPR_THRESHOLD):
+    """Work-split totals from the table; `overrides` replaces the extended price of a CLIN
+    ((clin, None) if it has a single contractor, else (clin, contractor))."""
+    prices = array('d', table.prices)
+    for (clin, who), val in (overrides or {}).items():
+        idx = [i for i, c in enumerate(table.clins) if c == clin and (who is None or table.contractors[i] == who)]
+        if not idx:
+            raise KeyError(f'unknown_clin:{clin}@{who}' if who else f'unknown_clin:{clin}')
+        if len(idx) > 1:
+            raise KeyError(f'ambiguous_clin:{clin} (use {clin}@<contractor>)')
+        prices[idx[0]] = val
+    by_contractor, by_clin = {}, {}
+    for clin, who, p in zip(table.clins, table.contractors, prices):
+        by_contractor[who] = by_contractor.get(who, 0.0) + p
+        by_clin.setdefault(clin, {})[who] = round(p, 2)
+    overall = sum(by_contractor.values())
+    rpr, mov = by_contractor.get('rpr', 0.0), by_contractor.get('movius', 0.0)
+    pct_rpr = (rpr / overall * 100.0) if overall > 0 else 0.0
+    pct_mov = (mov / overall * 100.0) if overall > 0 else 0.0
+    return {
+        'ok': True,
+        'rpr_total': round(rpr, 2),
+        'movius_total': round(mov, 2),
+        'overall_total': round(overall, 2),
+        'rpr_percentage': round(pct_rpr, 2),
+        'movius_percentage': round(pct_mov, 2),
+        'threshold': threshold,
+        'meets_threshold': pct_rpr >= threshold,
+        # Dollars RPR could shed (negative: must add) before falling below the threshold.
+        'rpr_margin_to_threshold': round(rpr - overall * threshold / 100.0, 2),
+        'by_contractor': {k: round(v, 2) for k, v in sorted(by_contractor.items())},
+        'by_clin': dict(sorted(by_clin.items())),
+    }
+
+
+def compute(xlsx_path=PRICE_XLSX, overrides=None):
+    if not openpyxl:
+        return {'ok': False, 'error': 'openpyxl_not_installed'}
+    if not os.path.exists(xlsx_path):
+        return {'ok': False, 'error': f'missing_xlsx:{xlsx_path}'}
+    try:
+        table, sha1, cached = load(xlsx_path)
+        res = totals(table, overrides)
+    except KeyError as e:
+        return {'ok': False, 'error': e.args[0]}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+    res.update({'sheets': table.sheets, 'workbook_sha1': sha1, 'cached': cached})
+    if overrides:
+        res['what_if'] = {f'{c}@{w}' if w else c: v for (c, w), v in overrides.items()}
+    return res
+
+
+def main(argv=None):
+    argv = list(argv or [])
+    what_if = [argv[i + 1] for i, a in enumerate(argv[:-1]) if a == '--what-if']
+    paths = [a for i, a in enumerate(argv) if not a.startswith('--') and (i == 0 or argv[i - 1] != '--what-if')]
+    try:
+        overrides = parse_overrides(what_if)
+    except ValueError as e:
+        print(json.dumps({'ok': False, 'error': f'bad_what_if:{e}'}))
+        return 2
+    res = compute(paths[0] if paths else PRICE_XLSX, overrides)
+    print(json.dumps(res, indent=2))
+    return 0 if res.get('ok') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# Executes the `queries` section of proposal_master_dashboard_skeleton.json.
+#
+# Filters such as "risk == 'critical'" or "status.state == 'not_started' OR
+# status == 'not_started'" are parsed once into predicates. Each skeleton is
+# flattened into items (dicts carrying an id or a status/risk/priority/owner
+# field) with secondary indexes on those fields; a skeleton's items and indexes
+# are rebuilt only when its file changes.
+#
+#   py query_engine.py --list
+#   py query_engine.py query_001_show_all_critical      (or Q-001)
+#   py query_engine.py --filter "priority == 'critical'" [--skeletons a,b]
+import json, os, re, sys, threading, time
+
+import skeleton_store
+
+DASH_JSON = os.path.join(skeleton_store.ROOT, 'proposal_master_dashboard_skeleton.json')
+
+ID_KEYS = (
+    'dependency_id', 'check_id', 'qa_number', 'section_id', 'deliverable_id', 'story_id',
+    'sprint_id', 'epic_id', 'req_id', 'tag_id', 'file_id', 'action_id', 'blocker_id',
+    'risk_id', 'alert_id', 'volume_id', 'volume_number', 'skeleton_id', 'id',
+)
+OWNER_KEYS = ('owner', 'assigned_to', 'assigned_to_rpr', 'owner_team', 'team')
+INDEXED = ('status', 'risk', 'priority', 'owner', 'id')
+# Fields answered from another field's index.
+INDEX_ALIASES = {'status.state': 'status'}
+
+
+class QueryError(ValueError):
+    pass
+
+
+def skeleton_name(filename):
+    return filename[:-5] if filename.endswith('.json') else filename
+
+
+def _pointer(parts):
+    return '/' + '/'.join(str(p).replace('~', '~0').replace('/', '~1') for p in parts) if parts else ''
+
+
+def _item_id(node, parts):
+    for k in ID_KEYS:
+        if node.get(k) not in (None, ''):
+            return str(node[k])
+    for k, v in node.items():
+        if k.endswith('_id') and isinstance(v, (str, int)):
+            return str(v)
+    if isinstance(parts[-1], int):
+        return f'{parts[-2] if len(parts) > 1 else ""}[{parts[-1]}]'
+    return str(parts[-1])
+
+
+def iter_items(doc):
+    """Yield (item_id, json_pointer, dict) for every trackable item below the document root."""
+    stack = [((), doc)]
+    while stack:
+        parts, node = stack.pop()
+        if isinstance(node, dict):
+            if parts and (any(k in node for k in ID_KEYS) or any(k in node for k in ('status', 'risk', 'priority'))
+                          or any(k in node for k in OWNER_KEYS) or any(k.endswith('_id') for k in node)):
+                yield _item_id(node, parts), _pointer(parts), node
+            children = list(node.items())
+        elif isinstance(node, list):
+            children = list(enumerate(node))
+        else:
+            continue
+        for k, v in reversed(children):
+            if isinstance(v, (dict, list)):
+                stack.append((parts + (k,), v))
+
+
+def _norm(v):
+    # Movius-style statuses are {"state": ..., "last_changed": ...}
+    if isinstance(v, dict) and 'state' in v:
+        return v['state']
+    return v
+
+
+def field_value(item_id, node, field):
+    f = field.lower()
+    if f == 'id':
+        return item_id
+    if f == 'owner':
+        for k in OWNER_KEYS:
+            if node.get(k) not in (None, ''):
+                return node[k]
+        return None
+    cur = node
+    for part in field.split('.'):
+        if not isinstance(cur, dict) or part not in cur:
+            return None
+        cur = cur[part]
+    return _norm(cur)
+
+
+def _keys(v):
+    """Index keys for a field value (lists index every element)."""
+    vals = v if isinstance(v, list) else [v]
+    out = set()
+    for x in vals:
+        x = _norm(x)
+        if x is None or isinstance(x, (dict, list)):
+            continue
+        if isinstance(x, float) and x.is_integer():
+            x = int(x)  # 1.0 == 1 in match(), so both must share an index key
+        out.add(json.dumps(x) if isinstance(x, bool) else str(x).lower())
+    return out
+
+
+# ---- filter expression parsing ------------------------------------------------
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<str>'[^']*'|"[^"]*")
+  | (?P<num>-?\d+(?:\.\d+)?)
+  | (?P<op>==|!=|>=|<=|>|<|\(|\))
+  | (?P<word>[A-Za-z_][\w.]*)
+)""", re.X)
+_KEYWORDS = {'and', 'or', 'not', 'contains', 'true', 'false', 'null'}
+
+
+def _tokenize(text):
+    pos, out = 0, []
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise QueryError(f'bad filter near {text[pos:pos + 20]!r}')
+        pos = m.end()
+        if m.group('str') is not None:
+            out.append(('lit', m.group('str')[1:-1]))
+        elif m.group('num') is not None:
+            n = m.group('num')
+            out.append(('lit', float(n) if '.' in n else int(n)))
+        elif m.group('op') is not None:
+            out.append(('op', m.group('op')))
+        else:
+            w = m.group('word')
+            lw = w.lower()
+            if lw in ('true', 'false'):
+                out.append(('lit', lw == 'true'))
+            elif lw == 'null':
+                out.append(('lit', None))
+            elif lw in _KEYWORDS:
+                out.append(('op', lw))
+            else:
+                out.append(('field', w))
+    return out
+
+
+def _eq(a, b):
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    return a == b
+
+
+class _Cmp:
+    def __init__(self, field, op, value):
+        self.field, self.op, self.value = field, op, value
+        self.lfield = field.lower()
+        self.index = INDEX_ALIASES.get(self.lfield, self.lfield if self.lfield in INDEXED else None)
+
+    def match(self, item_id, node):
+        v = field_value(item_id, node, self.field)
+        vals = v if isinstance(v, list) else [v]
+        return any(self._one(_norm(x)) for x in vals)
+
+    def _one(self, v):
+        lit = self.value
+        if self.op == 'contains':
+            return isinstance(v, str) and isinstance(lit, str) and lit.lower() in v.lower()
+        if isinstance(v, str) and isinstance(lit, str):
+            v, lit = v.lower(), lit.lower()
+        if self.op == '==':
+            return _eq(v, lit)
+        if self.op == '!=':
+            return not _eq(v, lit)
+        try:
+            return {'>': v > lit, '<': v < lit, '>=': v >= lit, '<=': v <= lit}[self.op]
+        except TypeError:
+            return False
+
+    def candidates(self, ix):
+        if self.index is None or self.op not in ('==', 'contains'):
+            return None
+        table = ix.indexes[self.index]
+        if self.op == '==':
+            return set().union(*[table.get(k, ()) for k in _keys(self.value)])
+        needle = str(self.value).lower()
+        # Scan distinct index keys (small) rather than every item.
+        return set().union(*[rows for k, rows in table.items() if needle in k])
+
+
+class _And:
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+
+    def match(self, item_id, node):
+        return self.a.match(item_id, node) and self.b.match(item_id, node)
+
+    def candidates(self, ix):
+        ca, cb = self.a.candidates(ix), self.b.candidates(ix)
+        if ca is None:
+            return cb
+        return ca if cb is None else ca & cb
+
+
+class _Or:
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+
+    def match(self, item_id, node):
+        return self.a.match(item_id, node) or self.b.match(item_id, node)
+
+    def candidates(self, ix):
+        ca = self.a.candidates(ix)
+        if ca is None:
+            return None
+        cb = self.b.candidates(ix)
+        return None if cb is None else ca | cb
+
+
+class _Not:
+    def __init__(self, a):
+        self.a = a
+
+    def match(self, item_id, node):
+        return not self.a.match(item_id, node)
+
+    def candidates(self, ix):
+        return None
+
+
+class _Parser:
+    def __init__(self, text):
+        self.toks = _tokenize(text)
+        self.i = 0
+
+    def peek(self):
+        return self.toks[self.i] if self.i < len(self.toks) else (None, None)
+
+    def take(self, kind=None, val=None):
+        t = self.peek()
+        if t[0] is None or (kind and t[0] != kind) or (val and t[1] != val):
+            raise QueryError(f'expected {val or kind}, got {t[1]!r}')
+        self.i += 1
+        return t
+
+    def parse(self):
+        node = self.or_()
+        if self.i != len(self.toks):
+            raise QueryError(f'unexpected {self.peek()[1]!r}')
+        return node
+
+    def or_(self):
+        node = self.and_()
+        while self.peek() == ('op', 'or'):
+            self.i += 1
+            node = _Or(node, self.and_())
+        return node
+
+    def and_(self):
+        node = self.not_()
+        while self.peek() == ('op', 'and'):
+            self.i += 1
+            node = _And(node, self.not_())
+        return node
+
+    def not_(self):
+        if self.peek() == ('op', 'not'):
+            self.i += 1
+            return _Not(self.not_())
+        if self.peek() == ('op', '('):
+            self.i += 1
+            node = self.or_()
+            self.take('op', ')')
+            return node
+        field = self.take('field')[1]
+        op = self.take('op')[1]
+        if op not in ('==', '!=', '>', '<', '>=', '<=', 'contains'):
+            raise QueryError(f'unknown operator {op!r}')
+        return _Cmp(field, op, self.take('lit')[1])
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_filter(text):
+    with _compiled_lock:
+        pred = _compiled.get(text)
+    if pred is None:
+        pred = _Parser(text).parse()
+        with _compiled_lock:
+            _compiled[text] = pred
+    return pred
+
+
+# ---- per-skeleton item store + indexes -----------------------------------------
+
+
+class SkeletonIndex:
+    def __init__(self, filename, path, key, doc):
+        self.filename = filename
+        self.name = skeleton_name(filename)
+        self.path = path
+        self.key = key
+        self.items = list(iter_items(doc))
+        self.indexes = {f: {} for f in INDEXED}
+        for n, (item_id, _, node) in enumerate(self.items):
+            for f in INDEXED:
+                for k in _keys(field_value(item_id, node, f)):
+                    self.indexes[f].setdefault(k, set()).add(n)
+
+
+class QueryEngine:
+    def __init__(self, filenames=None, root=None):
+        self.filenames = list(filenames or skeleton_store.SKELETON_FILENAMES)
+        self.root = root or skeleton_store.ROOT
+        self.skeletons = {}
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Rebuild items/indexes for skeletons whose file changed; returns names rebuilt."""
+        rebuilt = []
+        with self.lock:
+            for fn in self.filenames:
+                path = os.path.join(self.root, fn)
+                key = skeleton_store._stat_key(path)
+                cur = self.skeletons.get(fn)
+                if cur and cur.key == key:
+                    continue
+                if key is None:
+                    self.skeletons.pop(fn, None)
+                    continue
+                try:
+                    doc = skeleton_store.load(path)
+                except Exception:
+                    doc = {}
+                self.skeletons[fn] = SkeletonIndex(fn, path, key, doc)
+                rebuilt.append(skeleton_name(fn))
+        return rebuilt
+
+    def _targets(self, skeletons):
+        names = [skeleton_name(s) for s in (skeletons or [])]
+        if not names or 'all_skeletons' in names:
+            return list(self.skeletons.values())
+        return [ix for ix in self.skeletons.values() if ix.name in names]
+
+    def run_filter(self, text, skeletons=None):
+        pred = compile_filter(text)
+        self.refresh()
+        out = []
+        for ix in self._targets(skeletons):
+            cand = pred.candidates(ix)
+            rows = sorted(cand) if cand is not None else range(len(ix.items))
+            for n in rows:
+                item_id, ptr, node = ix.items[n]
+                if pred.match(item_id, node):
+                    out.append(item_summary(ix.name, item_id, ptr, node))
+        return out
+
+    def definitions(self):
+        try:
+            return skeleton_store.load(DASH_JSON).get('queries', {}) or {}
+        except Exception:
+            return {}
+
+    def find(self, query_id):
+        defs = self.definitions()
+        if query_id in defs:
+            return query_id, defs[query_id]
+        for k, q in defs.items():
+            if isinstance(q, dict) and str(q.get('query_id', '')).lower() == query_id.lower():
+                return k, q
+        return None, None
+
+    def run(self, query_id):
+        key, q = self.find(query_id)
+        if not q:
+            raise KeyError(query_id)
+        t0 = time.perf_counter()
+        items = self.run_filter(q.get('filter', ''), q.get('skeletons_searched'))
+        by_skel = {}
+        for it in items:
+            by_skel[it['skeleton']] = by_skel.get(it['skeleton'], 0) + 1
+        return {
+            'ok': True,
+            'query': key,
+            'query_id': q.get('query_id'),
+            'query_name': q.get('query_name'),
+            'filter': q.get('filter'),
+            'output_format': q.get('output_format'),
+            'count': len(items),
+            'by_skeleton': by_skel,
+            'items': items,
+            'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2),
+        }
+
+
+def item_summary(skel, item_id, ptr, node):
+    status = _norm(node.get('status'))
+    label = next((node[k] for k in ('item', 'check', 'name', 'title', 'question', 'action', 'description',
+                                    'requirement', 'check_name', 'section_name', 'story', 'deliverable')
+                  if isinstance(node.get(k), str)), None)
+    return {
+        'skeleton': skel,
+        'id': item_id,
+        'path': ptr,
+        'label': label,
+        'status': status if not isinstance(status, (dict, list)) else None,
+        'risk': node.get('risk'),
+        'priority': node.get('priority'),
+        'owner': field_value(item_id, node, 'owner'),
+    }
+
+
+ENGINE = QueryEngine()
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] == '--list':
+        for k, q in ENGINE.definitions().items():
+            print(f"{k}\t{q.get('query_id', '')}\t{q.get('filter', '')}")
+        return 0
+    if argv[0] == '--filter':
+        if len(argv) < 2:
+            print('Usage: query_engine.py --filter EXPR [--skeletons a,b]')
+            return 2
+        skels = argv[argv.index('--skeletons') + 1].split(',') if '--skeletons' in argv else None
+        try:
+            items = ENGINE.run_filter(argv[1], skels)
+        except QueryError as e:
+            print(json.dumps({'ok': False, 'error': str(e)}))
+            return 2
+        print(json.dumps({'ok': True, 'count': len(items), 'items': items}, indent=2))
+        return 0
+    try:
+        print(json.dumps(ENGINE.run(argv[0]), indent=2))
+    except KeyError:
+        print(json.dumps({'ok': False, 'error': 'unknown_query', 'query': argv[0]}))
+        return 1
+    except QueryError as e:
+        print(json.dumps({'ok': False, 'error': str(e), 'query': argv[0]}))
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
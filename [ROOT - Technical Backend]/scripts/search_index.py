@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# Full-text search over every skeleton (RFP sections, Q&A, requirements, ...).
+#
+# Each item query_engine knows about (section_id, qa_number, req_id, ...) is one
+# document made of its own string fields (nested items are documents of their
+# own; text outside any item belongs to a per-skeleton root document). Documents
+# go into an inverted index ranked with BM25. The index is kept per skeleton in
+# .cache/search_index.json and only a skeleton whose file changed is re-indexed.
+#
+#   py search_index.py FedRAMP
+#   py search_index.py "VAAR 852" [--limit 5] [--skeletons qa_responses_skeleton_v2,rfp_document_skeleton_v2]
+import json, math, os, re, sys, threading, time
+
+import skeleton_store
+from query_engine import _pointer, iter_items, skeleton_name
+
+CACHE_NAME = 'search_index.json'
+VERSION = 1
+K1, B = 1.2, 0.75
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset('a an and are as at be by for from has in is it of on or that the this to was with'.split())
+SNIPPET = 160
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _walk_strings(node, parts, skip):
+    """(field pointer parts, text) for string leaves under node, not descending into `skip` pointers."""
+    stack = [(parts, node)]
+    while stack:
+        parts, node = stack.pop()
+        if isinstance(node, str):
+            yield parts, node
+        elif isinstance(node, (dict, list)):
+            children = node.items() if isinstance(node, dict) else enumerate(node)
+            for k, v in reversed(list(children)):
+                p = parts + (k,)
+                if not (isinstance(v, dict) and _pointer(p) in skip):
+                    stack.append((p, v))
+
+
+def _resolve(doc, ptr):
+    node = doc
+    for t in ptr[1:].split('/') if ptr else []:
+        t = t.replace('~1', '/').replace('~0', '~')
+        node = node[int(t)] if isinstance(node, list) else node[t]
+    return node
+
+
+def documents(name, doc):
+    """[(item id, item pointer, [(field pointer relative to the item, text)])] for one skeleton."""
+    items = [(i, p) for i, p, _ in iter_items(doc)]
+    skip = {p for _, p in items}
+    out = []
+    for item_id, ptr in [(name, '')] + items:
+        node = _resolve(doc, ptr)
+        fields = [(_pointer(parts), text) for parts, text in _walk_strings(node, (), skip)]
+        if fields:
+            out.append((item_id, ptr, fields))
+    return out
+
+
+def build_segment(fn, key, doc):
+    """Postings for one skeleton: {'key', 'docs': [[id, pointer, length]], 'postings': {term: [[doc, tf], ...]}}."""
+    docs, postings = [], {}
+    for n, (item_id, ptr, fields) in enumerate(documents(skeleton_name(fn), doc)):
+        tf = {}
+        for _, text in fields:
+            for t in tokenize(text):
+                tf[t] = tf.get(t, 0) + 1
+        docs.append([item_id, ptr, sum(tf.values())])
+        for t, c in tf.items():
+            postings.setdefault(t, []).append([n, c])
+    return {'key': list(key), 'docs': docs, 'postings': postings}
+
+
+class SearchIndex:
+    def __init__(self, filenames=None, root=None, cache_name=CACHE_NAME):
+        self.filenames = list(filenames or skeleton_store.SKELETON_FILENAMES)
+        self.root = root or skeleton_store.ROOT
+        self.cache_name = cache_name
+        self.lock = threading.Lock()
+        self.segments = None  # filename -> segment
+
+    def refresh(self):
+        """Re-index skeletons whose mtime/size changed; returns names re-indexed."""
+        with self.lock:
+            if self.segments is None:
+                saved = skeleton_store.read_cache(self.cache_name, {}) or {}
+                self.segments = saved.get('segments', {}) if saved.get('version') == VERSION else {}
+            rebuilt = []
+            for fn in self.filenames:
+                path = os.path.join(self.root, fn)
+                key = skeleton_store._stat_key(path)
+                seg = self.segments.get(fn)
+                if key is None:
+                    if seg:
+                        del self.segments[fn]
+                        rebuilt.append(skeleton_name(fn))
+                    continue
+                if seg and tuple(seg['key']) == key:
+                    continue
+                try:
+                    doc = skeleton_store.load(path)
+                except Exception:
+                    doc = {}
+                self.segments[fn] = build_segment(fn, key, doc)
+                rebuilt.append(skeleton_name(fn))
+            for fn in set(self.segments) - set(self.filenames):
+                del self.segments[fn]
+            if rebuilt:
+                skeleton_store.write_cache(self.cache_name, {'version': VERSION, 'segments': self.segments})
+            return rebuilt
+
+    def search(self, q, limit=20, skeletons=None):
+        t0 = time.perf_counter()
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(q)))
+        with self.lock:
+            segs = {fn: s for fn, s in self.segments.items()
+                    if not skeletons or skeleton_name(fn) in {skeleton_name(x) for x in skeletons}}
+        # Collection statistics span the searched skeletons.
+        n_docs = sum(len(s['docs']) for s in segs.values()) or 1
+        avgdl = (sum(d[2] for s in segs.values() for d in s['docs']) / n_docs) or 1
+        df = {t: sum(len(s['postings'].get(t, ())) for s in segs.values()) for t in terms}
+        scores = {}
+        for t in terms:
+            if not df[t]:
+                continue
+            idf = math.log(1 + (n_docs - df[t] + 0.5) / (df[t] + 0.5))
+            for fn, s in segs.items():
+                docs = s['docs']
+                for n, tf in s['postings'].get(t, ()):
+                    dl = docs[n][2]
+                    scores[(fn, n)] = scores.get((fn, n), 0.0) + idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        hits = [self._hit(fn, segs[fn]['docs'][n], score, terms) for (fn, n), score in ranked[:limit]]
+        return {'ok': True, 'query': q, 'terms': terms, 'count': len(ranked), 'hits': hits,
+                'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2)}
+
+    def _hit(self, fn, d, score, terms):
+        item_id, ptr, _ = d
+        hit = {'skeleton': skeleton_name(fn), 'id': item_id, 'path': ptr, 'score': round(score, 4)}
+        try:
+            node = _resolve(skeleton_store.load(os.path.join(self.root, fn)), ptr)
+        except Exception:
+            return hit
+        # Matching fields are found on the (cached) document, only for returned hits.
+        want = set(terms)
+        skip = {p for _, p, _ in iter_items(node)} if isinstance(node, (dict, list)) else set()
+        fields = [(_pointer(parts), text) for parts, text in _walk_strings(node, (), skip)]
+        matched = [(p, text) for p, text in fields if want & set(tokenize(text))]
+        hit['fields'] = [ptr + p for p, _ in matched[:5]]
+        if matched:
+            text = matched[0][1]
+            m = re.search('|'.join(re.escape(t) for t in terms), text, re.I)
+            start = max(0, (m.start() if m else 0) - SNIPPET // 3)
+            hit['snippet'] = ('…' if start else '') + text[start:start + SNIPPET] + ('…' if start + SNIPPET < len(text) else '')
+        return hit
+
+
+INDEX = SearchIndex()
+
+
+def main(argv=None):
+    argv = list(argv or [])
+
+    def opt(name):
+        return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else None
+    q = ' '.join(a for i, a in enumerate(argv) if not a.startswith('--') and (i == 0 or argv[i - 1] not in ('--limit', '--skeletons')))
+    if not q:
+        print('usage: search_index.py <query> [--limit N] [--skeletons a,b]', file=sys.stderr)
+        return 2
+    skels = opt('--skeletons')
+    print(json.dumps(INDEX.search(q, int(opt('--limit') or 10), skels.split(',') if skels else None), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# Structural validation of the *_skeleton*.json files.
+#
+# Schemas live in ../schemas/<skeleton>@<version>.json, where <version> is the
+# document's `schema_version` (or skeleton_metadata.version). They use a small
+# JSON Schema subset (type, enum, required, properties, additionalProperties,
+# items, minItems) compiled once into closures and cached by file mtime.
+# skeleton_store validates every write against them, so a bad mutation is
+# rejected before the file is touched.
+#
+#   py skeleton_schema.py                 # validate all skeletons
+#   py skeleton_schema.py --infer NAME    # print a starting schema inferred from the current file
+import json, os, sys, threading, time
+
+import skeleton_store
+
+SCHEMA_DIR = os.path.join(skeleton_store.ROOT, 'schemas')
+MAX_ERRORS = 20
+INFER_DEPTH = 3
+
+_TYPES = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+def _type_name(v):
+    return next(t for t in ('null', 'boolean', 'integer', 'number', 'string', 'array', 'object') if _TYPES[t](v))
+
+
+def compile_schema(schema):
+    """schema -> check(value, path, errors); errors is a list of 'path: message'."""
+    checks = []
+    types = schema.get('type')
+    if types:
+        types = [types] if isinstance(types, str) else list(types)
+        preds = [_TYPES[t] for t in types]
+        want = '|'.join(types)
+
+        def check_type(v, path, errs):
+            if not any(p(v) for p in preds):
+                errs.append(f'{path}: expected {want}, got {_type_name(v)}')
+                return False
+            return True
+        checks.append(check_type)
+    if 'enum' in schema:
+        allowed = schema['enum']
+
+        def check_enum(v, path, errs):
+            if v not in allowed:
+                errs.append(f'{path}: {v!r} not one of {allowed}')
+        checks.append(check_enum)
+    required = schema.get('required') or []
+    props = {k: compile_schema(s) for k, s in (schema.get('properties') or {}).items()}
+    extra = schema.get('additionalProperties', True)
+    extra_check = compile_schema(extra) if isinstance(extra, dict) else None
+    if required or props or extra is not True:
+        def check_object(v, path, errs):
+            if not isinstance(v, dict):
+                return
+            for k in required:
+                if k not in v:
+                    errs.append(f'{path}: missing required key {k!r}')
+            for k, val in v.items():
+                sub = props.get(k)
+                if sub is not None:
+                    sub(val, f'{path}.{k}', errs)
+                elif extra is False:
+                    errs.append(f'{path}: unexpected key {k!r}')
+                elif extra_check is not None:
+                    extra_check(val, f'{path}.{k}', errs)
+        checks.append(check_object)
+    items = compile_schema(schema['items']) if isinstance(schema.get('items'), dict) else None
+    min_items = schema.get('minItems')
+    if items is not None or min_items:
+        def check_array(v, path, errs):
+            if not isinstance(v, list):
+                return
+            if min_items and len(v) < min_items:
+                errs.append(f'{path}: expected at least {min_items} items, got {len(v)}')
+            if items is not None:
+                for i, x in enumerate(v):
+                    if len(errs) >= MAX_ERRORS:
+                        return
+                    items(x, f'{path}[{i}]', errs)
+        checks.append(check_array)
+
+    def check(v, path, errs):
+        for c in checks:
+            if c(v, path, errs) is False:  # wrong type: nested checks would only add noise
+                return
+    return check
+
+
+def version_of(doc):
+    if not isinstance(doc, dict):
+        return None
+    meta = doc.get('skeleton_metadata')
+    return doc.get('schema_version') or (meta.get('version') if isinstance(meta, dict) else None)
+
+
+def schema_path(filename, version):
+    name = filename[:-5] if filename.endswith('.json') else filename
+    return os.path.join(SCHEMA_DIR, f'{name}@{version}.json')
+
+
+_compiled = {}  # schema path -> (stat key, check)
+_compiled_lock = threading.Lock()
+
+
+def validator(filename, version):
+    """Compiled check for a skeleton version, or None when no schemas exist for that skeleton."""
+    path = schema_path(filename, version)
+    key = skeleton_store._stat_key(path)
+    if key is None:
+        name = os.path.basename(path).split('@', 1)[0]
+        has_any = os.path.isdir(SCHEMA_DIR) and any(f.startswith(name + '@') for f in os.listdir(SCHEMA_DIR))
+        if not has_any:
+            return None
+
+        def unknown(v, p, errs):
+            errs.append(f'$: no schema for {name} version {version!r} (expected {os.path.basename(path)})')
+        return unknown
+    with _compiled_lock:
+        hit = _compiled.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        check = compile_schema(json.load(f))
+    with _compiled_lock:
+        _compiled[path] = (key, check)
+    return check
+
+
+def validate(filename, doc):
+    """List of problems with `doc` as the contents of skeleton `filename` ([] when valid or unschema'd)."""
+    check = validator(os.path.basename(filename), version_of(doc))
+    if check is None:
+        return []
+    errs = []
+    check(doc, '$', errs)
+    return errs[:MAX_ERRORS]
+
+
+def validate_file(path):
+    t0 = time.perf_counter()
+    res = {'skeleton': os.path.basename(path)}
+    try:
+        doc = skeleton_store.load(path)
+        res['version'] = version_of(doc)
+        res['errors'] = validate(path, doc)
+    except Exception as e:
+        res['errors'] = [f'$: unreadable ({e})']
+    res['ok'] = not res['errors']
+    res['elapsed_ms'] = round((time.perf_counter() - t0) * 1000, 2)
+    return res
+
+
+def validate_all(paths=None):
+    # Serial on purpose: the checks are pure Python (GIL-bound), so threads only added overhead to a few ms per file.
+    return [validate_file(p) for p in paths or skeleton_store.skeleton_paths()]
+
+
+def infer(value, depth=0):
+    """Starting schema for a document: containers keep their shape, scalars may also be null."""
+    if isinstance(value, dict):
+        out = {'type': 'object'}
+        if depth == 0:
+            out['required'] = list(value)
+        if depth < INFER_DEPTH:
+            out['properties'] = {k: infer(v, depth + 1) for k, v in value.items()}
+        return out
+    if isinstance(value, list):
+        out = {'type': 'array'}
+        dicts = [v for v in value if isinstance(v, dict)]
+        if dicts and len(dicts) == len(value) and depth < INFER_DEPTH:
+            common = [k for k in dicts[0] if all(k in d for d in dicts)]
+            props = {}
+            for k in common:
+                kinds = {'object' if isinstance(d[k], dict) else 'array' if isinstance(d[k], list) else 'scalar' for d in dicts}
+                if kinds == {'object'}:
+                    props[k] = {'type': 'object'}
+                elif kinds == {'array'}:
+                    props[k] = {'type': 'array'}
+            ids = [k for k in common if k.endswith('_id') or k in ('qa_number', 'volume_number')]
+            out['items'] = dict({'type': 'object', 'required': ids} if ids else {'type': 'object'}, **({'properties': props} if props else {}))
+        return out
+    if value is None:
+        return {}  # unknown until filled in
+    t = _type_name(value)
+    return {'type': ['number' if t == 'integer' else t, 'null']}
+
+
+def main(argv=None):
+    argv = list(argv or [])
+    if '--infer' in argv:
+        name = argv[argv.index('--infer') + 1]
+        fn = name if name.endswith('.json') else name + '.json'
+        doc = skeleton_store.load(os.path.join(skeleton_store.ROOT, fn))
+        schema = dict({'$comment': f'{fn} version {version_of(doc)}'}, **infer(doc))
+        print(json.dumps(schema, indent=2))
+        return 0
+    t0 = time.perf_counter()
+    results = validate_all()
+    print(json.dumps({'ok': all(r['ok'] for r in results), 'skeletons': results,
+                      'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2)}, indent=2))
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# Shared read cache + batched, atomic, locked writes for the *_skeleton*.json files.
+#
+#   doc = skeleton_store.load(path)            # cached parse, shared: treat as read-only
+#   with skeleton_store.batch() as b:          # one locked write per file on exit
+#       b.merge(path, 'work_split_calculation', {...})
+#       b.set(path, ('health_heartbeat', 'work_split'), {...})
+#       b.mutate(path, fn)                     # fn(doc) edits doc in place
+#
+# Mutations are recorded and replayed on exit against a fresh copy of each file
+# taken while holding its lock, so two tasks writing different keys of the same
+# skeleton (e.g. heartbeats) never drop each other's changes. Every resulting
+# document is checked against its schema (skeleton_schema.py) before any file
+# of the batch is written; a file that exists but does not parse is never
+# overwritten.
+import json, os, sys, tempfile, threading
+from contextlib import ExitStack, contextmanager
+
+if os.name == 'nt':
+    import msvcrt
+    fcntl = None
+else:
+    import fcntl
+    msvcrt = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+CACHE_DIR = os.path.join(ROOT, '.cache')  # derived state (indexes, manifests); safe to delete
+
+SKELETON_FILENAMES = [
+    'qa_responses_skeleton_v2.json',
+    'requirements_skeleton_v2.json',
+    'movius_dependencies_skeleton_v2.json',
+    'compliance_verification_skeleton_v2.json',
+    'volumes_completion_skeleton_v2.json',
+    'deliverables_schedule_skeleton_v2.json',
+    'rfp_document_skeleton_v2.json',
+    'document_output_compliance_skeleton.json',
+    'development_timeline_user_stories_skeleton.json',
+    'proposal_master_dashboard_skeleton.json',
+]
+
+_cache = {}  # abspath -> (mtime_ns, size, doc)
+_cache_lock = threading.Lock()
+_path_locks = {}
+IO_STATS = {}  # basename -> {'reads', 'read_bytes', 'writes', 'written_bytes'} (dev_server /metrics)
+
+
+class WriteRejected(ValueError):
+    """A batch was not written: schema errors, or the file on disk is unreadable."""
+
+    def __init__(self, path, errors):
+        super().__init__(f'{os.path.basename(path)}: ' + '; '.join(errors[:3]) + (' …' if len(errors) > 3 else ''))
+        self.path, self.errors = path, errors
+
+
+class SkeletonUnreadable(ValueError):
+    """A skeleton exists but does not parse (mid-edit or corrupt); never to be read as an empty document."""
+
+    def __init__(self, path, reason):
+        super().__init__(f'{os.path.basename(path)}: not valid JSON ({reason})')
+        self.path, self.reason = path, reason
+
+
+def skeleton_paths():
+    return [os.path.join(ROOT, n) for n in SKELETON_FILENAMES]
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _count_io(path, op, nbytes):
+    with _cache_lock:
+        st = IO_STATS.setdefault(os.path.basename(path), {'reads': 0, 'read_bytes': 0, 'writes': 0, 'written_bytes': 0})
+        st[op + 's'] += 1
+        st['read_bytes' if op == 'read' else 'written_bytes'] += nbytes
+
+
+def _parse(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    _count_io(path, 'read', len(data))
+    try:
+        return json.loads(data.decode('utf-8').strip() or '{}')
+    except ValueError as e:
+        raise SkeletonUnreadable(path, e) from None
+
+
+def load(path):
+    """Parsed document, re-read only when mtime/size change; FileNotFoundError / SkeletonUnreadable otherwise.
+
+    The same dict is handed to every caller until the file changes: copy it before editing.
+    """
+    path = os.path.abspath(path)
+    key = _stat_key(path)
+    if key is None:
+        raise FileNotFoundError(path)
+    with _cache_lock:
+        hit = _cache.get(path)
+    if hit and hit[:2] == key:
+        return hit[2]
+    doc = _parse(path)
+    with _cache_lock:
+        _cache[path] = (key[0], key[1], doc)
+    return doc
+
+
+def read_json(path):
+    """load() for optional files: {} when missing. An unparseable file still raises SkeletonUnreadable."""
+    try:
+        return load(path)
+    except FileNotFoundError:
+        return {}
+
+
+def invalidate(path=None):
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
+
+
+def _thread_lock(path):
+    with _cache_lock:
+        return _path_locks.setdefault(path, threading.RLock())
+
+
+@contextmanager
+def locked(path):
+    """Exclusive lock on `path` across threads and processes (sidecar .lock file)."""
+    path = os.path.abspath(path)
+    d, n = os.path.split(path)
+    with _thread_lock(path):
+        with open(os.path.join(d, f'.{n}.lock'), 'a+b') as lf:
+            if fcntl:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            else:
+                lf.seek(0)
+                msvcrt.locking(lf.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+                else:
+                    lf.seek(0)
+                    msvcrt.locking(lf.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# os.umask can only be read by setting it, which races other threads; read it once at import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path):
+    """Mode for the replacement of `path`: the existing file's, else what open() would create."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _atomic_write(path, obj, compact=False):
+    def dump(f):
+        if compact:
+            json.dump(obj, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    _replace(path, dump)
+
+
+def write_text(path, text):
+    """Replace `path` with `text` atomically: readers see the old file or the new one, never a partial write."""
+    _replace(path, lambda f: f.write(text))
+
+
+def _replace(path, write):
+    d, n = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{n}.', suffix='.tmp', dir=d)
+    try:
+        os.chmod(tmp, _file_mode(path))  # mkstemp creates 0600, which os.replace would carry over
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+        os.replace(tmp, path)
+        _count_io(path, 'write', size)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_cache(name, default=None):
+    try:
+        with open(os.path.join(CACHE_DIR, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+
+def write_cache(name, obj):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _atomic_write(os.path.join(CACHE_DIR, name), obj, compact=True)
+
+
+class Batch:
+    def __init__(self):
+        self._ops = {}  # abspath -> [fn(doc)]
+        self.written = []
+
+    def mutate(self, path, fn):
+        self._ops.setdefault(os.path.abspath(path), []).append(fn)
+
+    def merge(self, path, key, values):
+        def op(doc):
+            doc.setdefault(key, {})
+            doc[key].update(values)
+        self.mutate(path, op)
+
+    def set(self, path, keys, value):
+        if isinstance(keys, str):
+            keys = (keys,)
+        def op(doc):
+            node = doc
+            for k in keys[:-1]:
+                node = node.setdefault(k, {})
+            node[keys[-1]] = value
+        self.mutate(path, op)
+
+    def commit(self):
+        import skeleton_schema  # imports this module
+        # All files of the batch stay locked until every one has been validated, so
+        # a rejected batch writes nothing. Sorted lock order keeps concurrent
+        # multi-file batches deadlock-free.
+        with ExitStack() as stack:
+            pending = []
+            for path in sorted(self._ops):
+                stack.enter_context(locked(path))
+                try:
+                    cur = load(path)
+                except FileNotFoundError:
+                    cur = {}
+                except SkeletonUnreadable as e:
+                    # Replaying onto {} would wipe the file; leave it for a human.
+                    raise WriteRejected(path, [f'existing file is not valid JSON ({e.reason})'])
+                doc = json.loads(json.dumps(cur))
+                for fn in self._ops[path]:
+                    fn(doc)
+                if doc == cur and os.path.exists(path):
+                    continue
+                errors = skeleton_schema.validate(path, doc)
+                if errors:
+                    raise WriteRejected(path, errors)
+                pending.append((path, doc))
+            for path, doc in pending:
+                _atomic_write(path, doc)
+                key = _stat_key(path)
+                with _cache_lock:
+                    _cache[path] = (key[0], key[1], doc)
+                self.written.append(path)
+        self._ops.clear()
+        return self.written
+
+
+@contextmanager
+def batch():
+    b = Batch()
+    yield b
+    b.commit()
+
+
+if __name__ == '__main__':
+    for p in skeleton_paths():
+        try:
+            d = load(p)
+            print(f'{os.path.basename(p)}: ok ({len(d)} keys)')
+        except Exception as e:
+            print(f'{os.path.basename(p)}: error {e}')
+    sys.exit(0)
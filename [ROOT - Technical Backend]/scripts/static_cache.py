@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# In-memory cache of static files served by dev_server.py: content, precomputed
+# gzip variant and validators (ETag / Last-Modified), refreshed when mtime/size change.
+# Bounded by a byte budget and an entry count; least recently served files are evicted first.
+import gzip, hashlib, os, threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+MAX_CACHED_BYTES = 4 * 1024 * 1024   # larger files are streamed with sendfile
+MAX_TOTAL_BYTES = 64 * 1024 * 1024   # bodies + gzip copies held across all entries
+MAX_ENTRIES = 1024
+MIN_GZIP_BYTES = 1024
+COMPRESSIBLE = ('.html', '.json', '.css', '.js', '.md', '.txt', '.svg')
+
+
+def content_type(path):
+    ctype = 'text/html; charset=utf-8'
+    if path.endswith('.json'): ctype = 'application/json; charset=utf-8'
+    if path.endswith('.css'): ctype = 'text/css; charset=utf-8'
+    if path.endswith('.js'): ctype = 'application/javascript; charset=utf-8'
+    return ctype
+
+
+class Entry:
+    __slots__ = ('mtime_ns', 'size', 'etag', 'last_modified', 'data', 'gzip_data')
+
+    def __init__(self, path, st):
+        self.mtime_ns = st.st_mtime_ns
+        self.size = st.st_size
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.data = None
+        self.gzip_data = None
+        if st.st_size <= MAX_CACHED_BYTES:
+            with open(path, 'rb') as f:
+                self.data = f.read()
+            self.etag = '"%s"' % hashlib.sha1(self.data).hexdigest()[:20]
+            if len(self.data) >= MIN_GZIP_BYTES and path.endswith(COMPRESSIBLE):
+                z = gzip.compress(self.data, compresslevel=6, mtime=0)
+                if len(z) < len(self.data):
+                    self.gzip_data = z
+        else:
+            # Too big to hold: validators come from stat, body is streamed from disk.
+            self.etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+
+    @property
+    def cost(self):
+        return len(self.data or b'') + len(self.gzip_data or b'')
+
+    def not_modified(self, headers):
+        inm = headers.get('If-None-Match')
+        if inm:
+            return self.etag in [t.strip() for t in inm.split(',')] or inm.strip() == '*'
+        ims = headers.get('If-Modified-Since')
+        if ims:
+            try:
+                return parsedate_to_datetime(ims).timestamp() >= int(self.mtime_ns // 1_000_000_000)
+            except Exception:
+                return False
+        return False
+
+
+class StaticCache:
+    def __init__(self, max_bytes=MAX_TOTAL_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes, self.max_entries = max_bytes, max_entries
+        self.entries = OrderedDict()  # path -> Entry, least recently served first
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        st = os.stat(path)
+        with self.lock:
+            e = self.entries.get(path)
+            if e and e.mtime_ns == st.st_mtime_ns and e.size == st.st_size:
+                self.entries.move_to_end(path)
+                return e
+        e = Entry(path, st)
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old:
+                self.bytes -= old.cost
+            self.entries[path] = e
+            self.bytes += e.cost
+            while len(self.entries) > 1 and (self.bytes > self.max_bytes or len(self.entries) > self.max_entries):
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= evicted.cost
+        return e
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# In-process task execution for dev_server.py: task modules are imported once and
+# their entry points run on a bounded thread pool, with per-thread stdout/stderr
+# capture and coalescing of duplicate submissions.
+import cProfile, importlib, io, marshal, os, pstats, sys, threading, time, traceback, uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+MAX_FINISHED_JOBS = 100
+CRASHED = 70  # returncode for an uncaught exception (EX_SOFTWARE); task scripts use 1 for a failed check
+
+
+class _ThreadStream(io.TextIOBase):
+    """Routes writes to the current thread's capture buffer, else to the real stream."""
+
+    def __init__(self, name, fallback):
+        self.name = name
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        buf = getattr(self.local, 'buf', None)
+        return (buf or self.fallback).write(s)
+
+    def flush(self):
+        buf = getattr(self.local, 'buf', None)
+        (buf or self.fallback).flush()
+
+
+_install_lock = threading.Lock()
+
+
+def _install_streams():
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadStream):
+            sys.stdout = _ThreadStream('stdout', sys.stdout)
+        if not isinstance(sys.stderr, _ThreadStream):
+            sys.stderr = _ThreadStream('stderr', sys.stderr)
+
+
+@contextmanager
+def capture_output():
+    """Capture print()/tracebacks of the current thread only; yields (out, err) buffers."""
+    _install_streams()
+    out, err = io.StringIO(), io.StringIO()
+    prev = (getattr(sys.stdout.local, 'buf', None), getattr(sys.stderr.local, 'buf', None))
+    sys.stdout.local.buf, sys.stderr.local.buf = out, err
+    try:
+        yield out, err
+    finally:
+        sys.stdout.local.buf, sys.stderr.local.buf = prev
+
+
+_modules = {}
+_modules_lock = threading.Lock()
+IMPORT_SECONDS = {}  # module -> wall time of its (single) import
+
+
+def resolve(spec):
+    """spec = (module, function, *args) -> (callable, args). Modules are imported once."""
+    mod_name, fn_name, *args = spec
+    with _modules_lock:
+        mod = _modules.get(mod_name)
+        if mod is None:
+            t0 = time.perf_counter()
+            mod = _modules[mod_name] = importlib.import_module(mod_name)
+            IMPORT_SECONDS[mod_name] = time.perf_counter() - t0
+    fn = getattr(mod, fn_name, None)
+    if not callable(fn):
+        raise AttributeError(f'{mod_name}.{fn_name} is not defined')
+    return fn, args
+
+
+def call_task(spec, profiler=None):
+    """Run one task spec in the calling thread; returns (returncode, stdout, stderr).
+    With a cProfile.Profile, only the task function itself is profiled (not its import)."""
+    with capture_output() as (out, err):
+        try:
+            fn, args = resolve(spec)
+            if profiler:
+                try:
+                    profiler.enable()
+                except ValueError:  # 3.12+: one profiler per interpreter
+                    print('profiling skipped: another profiled run is in progress', file=sys.stderr)
+                    profiler = None
+            try:
+                rc = fn(*args)
+            finally:
+                if profiler:
+                    profiler.disable()
+        except SystemExit as e:
+            rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            rc = CRASHED
+    return (rc or 0), out.getvalue(), err.getvalue()
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def profile_report(profiler, limit=60):
+    """(text, pstats_bytes): top functions by cumulative time, and the raw stats in the
+    format written by cProfile's dump_stats (loadable by pstats, snakeviz, flameprof)."""
+    profiler.create_stats()
+    raw = marshal.dumps(profiler.stats)  # before pstats.Stats, which takes the stats out of the profiler
+    buf = io.StringIO()
+    if profiler.stats:
+        pstats.Stats(profiler, stream=buf).strip_dirs().sort_stats('cumulative').print_stats(limit)
+    else:
+        buf.write('no samples (profiling was skipped for this run)\n')
+    return buf.getvalue(), raw
+
+
+class TaskRunner:
+    def __init__(self, tasks, max_workers=None, on_finish=None):
+        self.tasks = tasks
+        self.on_finish = on_finish  # fn(job) after each run, outside the lock
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or 4, thread_name_prefix='task')
+        self.lock = threading.Lock()
+        self.jobs = {}      # job_id -> job dict
+        self.active = {}    # task -> job_id of queued/running job
+        self.done = threading.Condition(self.lock)
+        self.profiles = {}  # job_id -> (text, pstats_bytes)
+
+    def submit(self, task, profile=False):
+        """Queue `task` unless it is already queued/running. Returns (job, coalesced).
+        A coalesced submission joins the existing run, profiled or not."""
+        if task not in self.tasks:
+            raise KeyError(task)
+        with self.lock:
+            jid = self.active.get(task)
+            if jid:
+                return dict(self.jobs[jid]), True
+            jid = uuid.uuid4().hex[:12]
+            job = {
+                'job_id': jid, 'task': task, 'state': 'queued',
+                'submitted_at': _now(), 'started_at': None, 'finished_at': None,
+                'ok': None, 'returncode': None, 'stdout': '', 'stderr': '',
+                'duration_ms': None, 'profile': bool(profile),
+            }
+            self.jobs[jid] = job
+            self.active[task] = jid
+            self._trim()
+        self.pool.submit(self._run, jid)
+        return dict(job), False
+
+    def _run(self, jid):
+        with self.lock:
+            job = self.jobs[jid]
+            job['state'] = 'running'
+            job['started_at'] = _now()
+        prof = cProfile.Profile() if job['profile'] else None
+        t0 = time.perf_counter()
+        rc, out, err = call_task(self.tasks[job['task']], prof)
+        elapsed = time.perf_counter() - t0
+        report = profile_report(prof) if prof else None
+        with self.lock:
+            job.update({
+                'state': 'done' if rc == 0 else 'failed',
+                'ok': rc == 0, 'returncode': rc,
+                'stdout': out, 'stderr': err,
+                'finished_at': _now(),
+                'duration_ms': round(elapsed * 1000, 2),
+            })
+            if report:
+                self.profiles[jid] = report
+            if self.active.get(job['task']) == jid:
+                del self.active[job['task']]
+            self.done.notify_all()
+            snapshot = dict(job)
+        if self.on_finish:
+            try:
+                self.on_finish(snapshot)
+            except Exception:
+                traceback.print_exc()
+
+    def _trim(self):
+        finished = [j for j in self.jobs.values() if j['state'] in ('done', 'failed')]
+        for j in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[j['job_id']]
+            self.profiles.pop(j['job_id'], None)
+
+    def get(self, jid):
+        with self.lock:
+            job = self.jobs.get(jid)
+            return dict(job) if job else None
+
+    def profile(self, jid):
+        """(text, pstats_bytes) for a finished profiled job, else None."""
+        with self.lock:
+            return self.profiles.get(jid)
+
+    def wait(self, jid, timeout=None):
+        with self.lock:
+            self.done.wait_for(lambda: self.jobs[jid]['state'] in ('done', 'failed'), timeout)
+            return dict(self.jobs[jid])
+
+    def list(self):
+        with self.lock:
+            return [{k: j[k] for k in ('job_id', 'task', 'state', 'ok', 'submitted_at', 'finished_at')}
+                    for j in self.jobs.values()]
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Append-only history of metrics_tracking.key_metrics and health_heartbeat results,
+# kept in SQLite instead of inline `historical_tracking.snapshots` in the master
+# dashboard skeleton. Raw points are downsampled to hourly, then daily, rollups as
+# they age, and everything past `retention_days` is dropped, except history migrated
+# from the skeleton, which is kept from its oldest point on.
+#
+#   py timeseries.py --snapshot                 # record current values (also done by update_status --regen)
+#   py timeseries.py --series                   # list series
+#   py timeseries.py key_metrics.overall_completion [--since 7d] [--step 1h]
+import json, os, sqlite3, sys, time
+from contextlib import closing
+from datetime import datetime
+
+import skeleton_store
+
+DB_PATH = os.path.join(skeleton_store.ROOT, 'metrics_history.sqlite3')
+DASH_JSON = os.path.join(skeleton_store.ROOT, 'proposal_master_dashboard_skeleton.json')
+
+RAW_DAYS = 7          # raw points kept this long, then rolled up hourly
+HOURLY_DAYS = 30      # hourly rollups kept this long, then rolled up daily
+DEFAULT_RETENTION_DAYS = 90
+HEARTBEAT_EVERY = 3600  # an unchanged value is re-recorded at most this often
+COMPACT_EVERY = 3600
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS samples (
+    series TEXT NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL,
+    PRIMARY KEY (series, ts)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    series TEXT NOT NULL, resolution INTEGER NOT NULL, ts INTEGER NOT NULL,
+    n INTEGER NOT NULL, sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL, last REAL NOT NULL,
+    PRIMARY KEY (series, resolution, ts)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+'''
+
+
+def connect(path=DB_PATH):
+    con = sqlite3.connect(path, timeout=10)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA synchronous=NORMAL')
+    con.executescript(SCHEMA)
+    return con
+
+
+def to_epoch(value):
+    """ISO-8601 (with or without 'Z'/offset; naive = local time) or epoch number -> int seconds."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        return None
+
+
+def append(con, series, ts, value, force=False):
+    """Insert a point unless it repeats the latest value of the series within HEARTBEAT_EVERY."""
+    if not force:
+        row = con.execute('SELECT ts, value FROM samples WHERE series = ? ORDER BY ts DESC LIMIT 1', (series,)).fetchone()
+        if row and (row[0] >= ts or (row[1] == value and ts - row[0] < HEARTBEAT_EVERY)):
+            return False
+    con.execute('INSERT OR REPLACE INTO samples VALUES (?, ?, ?)', (series, ts, float(value)))
+    return True
+
+
+def extract(doc, now=None):
+    """[(series, ts, value)] for the current key_metrics and heartbeat results of the dashboard skeleton."""
+    now = int(now or time.time())
+    out = []
+    km = ((doc.get('metrics_tracking') or {}).get('key_metrics') or {}) if isinstance(doc, dict) else {}
+    for name, m in km.items():
+        v = m.get('current_value') if isinstance(m, dict) else None
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out.append((f'key_metrics.{name}', to_epoch(m.get('last_updated')) or now, v))
+    hb = doc.get('health_heartbeat') or {} if isinstance(doc, dict) else {}
+    for name, h in hb.items():
+        if isinstance(h, dict) and isinstance(h.get('ok'), bool):
+            out.append((f'heartbeat.{name}.ok', to_epoch(h.get('last_run')) or now, int(h['ok'])))
+    return out
+
+
+def migrate_inline(con, doc):
+    """Copy historical_tracking.snapshots (the old inline history) into the store; returns [(series, ts)].
+    Retention never cuts below the oldest migrated point, so imported history is not expired on arrival."""
+    ht = ((doc.get('metrics_tracking') or {}).get('historical_tracking') or {}) if isinstance(doc, dict) else {}
+    out = []
+    for snap in ht.get('snapshots') or []:
+        ts = to_epoch(snap.get('timestamp'))
+        if ts is None:
+            continue
+        for k, v in snap.items():
+            if k != 'timestamp' and isinstance(v, (int, float)) and not isinstance(v, bool):
+                append(con, f'key_metrics.{k}', ts, v, force=True)
+                out.append((f'key_metrics.{k}', ts))
+    if out:
+        row = con.execute("SELECT value FROM meta WHERE key = 'retain_from'").fetchone()
+        oldest = min([ts for _, ts in out] + ([int(row[0])] if row else []))
+        con.execute("INSERT OR REPLACE INTO meta VALUES ('retain_from', ?)", (str(oldest),))
+    return out
+
+
+def stored(con, series, ts):
+    """Whether the point (series, ts) is queryable: as a raw sample or inside a rollup bucket."""
+    return con.execute('''SELECT 1 FROM samples WHERE series = ?1 AND ts = ?2
+                          UNION ALL
+                          SELECT 1 FROM rollups WHERE series = ?1 AND ts = ?2 / resolution * resolution
+                          LIMIT 1''', (series, ts)).fetchone() is not None
+
+
+def retention_days(doc):
+    ht = ((doc.get('metrics_tracking') or {}).get('historical_tracking') or {}) if isinstance(doc, dict) else {}
+    return int(ht.get('retention_days') or DEFAULT_RETENTION_DAYS)
+
+
+def _rollup(con, src_table, src_res, dst_res, before):
+    """Fold points older than `before` from src (raw samples or src_res rollups) into dst_res buckets."""
+    if src_table == 'samples':
+        rows = con.execute('''SELECT series, ts / ?1 * ?1, COUNT(*), SUM(value), MIN(value), MAX(value),
+                                     (SELECT value FROM samples s2 WHERE s2.series = s.series AND s2.ts / ?1 = s.ts / ?1
+                                      AND s2.ts < ?2 ORDER BY ts DESC LIMIT 1)
+                              FROM samples s WHERE ts < ?2 GROUP BY series, ts / ?1''', (dst_res, before)).fetchall()
+        con.execute('DELETE FROM samples WHERE ts < ?', (before,))
+    else:
+        rows = con.execute('''SELECT series, ts / ?1 * ?1, SUM(n), SUM(sum), MIN(min), MAX(max),
+                                     (SELECT last FROM rollups r2 WHERE r2.series = r.series AND r2.resolution = ?3
+                                      AND r2.ts / ?1 = r.ts / ?1 AND r2.ts < ?2 ORDER BY ts DESC LIMIT 1)
+                              FROM rollups r WHERE resolution = ?3 AND ts < ?2 GROUP BY series, ts / ?1''',
+                           (dst_res, before, src_res)).fetchall()
+        con.execute('DELETE FROM rollups WHERE resolution = ? AND ts < ?', (src_res, before))
+    for series, ts, n, s, lo, hi, last in rows:
+        # A bucket can straddle the cut-off: merge with what an earlier pass stored.
+        old = con.execute('SELECT n, sum, min, max FROM rollups WHERE series = ? AND resolution = ? AND ts = ?',
+                          (series, dst_res, ts)).fetchone()
+        if old:
+            n, s, lo, hi = n + old[0], s + old[1], min(lo, old[2]), max(hi, old[3])
+        con.execute('INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (series, dst_res, ts, n, s, lo, hi, last))
+    return len(rows)
+
+
+def compact(con, now=None, keep_days=DEFAULT_RETENTION_DAYS, force=False):
+    """Downsample aged data and enforce retention; at most once per COMPACT_EVERY unless forced."""
+    now = int(now or time.time())
+    row = con.execute("SELECT value FROM meta WHERE key = 'last_compact'").fetchone()
+    if not force and row and now - int(row[0]) < COMPACT_EVERY:
+        return None
+    stats = {
+        'hourly': _rollup(con, 'samples', 0, 3600, now - RAW_DAYS * 86400),
+        'daily': _rollup(con, 'rollups', 3600, 86400, now - HOURLY_DAYS * 86400),
+    }
+    cut = now - keep_days * 86400
+    row = con.execute("SELECT value FROM meta WHERE key = 'retain_from'").fetchone()
+    if row:
+        cut = min(cut, int(row[0]) // 86400 * 86400)  # rollup buckets start before their first point
+    stats['expired'] = con.execute('DELETE FROM samples WHERE ts < ?', (cut,)).rowcount \
+        + con.execute('DELETE FROM rollups WHERE ts < ?', (cut,)).rowcount
+    con.execute("INSERT OR REPLACE INTO meta VALUES ('last_compact', ?)", (str(now),))
+    return stats
+
+
+def snapshot(dash_json=DASH_JSON, db_path=DB_PATH, now=None):
+    """Record the dashboard's current values; moves any inline snapshots out of the skeleton."""
+    doc = skeleton_store.read_json(dash_json)
+    points = extract(doc, now)
+    inline = bool(((doc.get('metrics_tracking') or {}).get('historical_tracking') or {}).get('snapshots'))
+    with closing(connect(db_path)) as con:
+        with con:
+            migrated = migrate_inline(con, doc) if inline else []
+            added = sum(append(con, s, ts, v) for s, ts, v in points)
+            compacted = compact(con, now, retention_days(doc))
+        # Committed: the inline copy goes only once every migrated point reads back from the store.
+        verified = all(stored(con, s, ts) for s, ts in migrated)
+    if inline and verified:
+        # Only latest values stay in the dashboard JSON; history lives in the store.
+        latest = {s.split('.', 1)[1]: v for s, _, v in points if s.startswith('key_metrics.')}
+
+        def strip(d):
+            ht = d.setdefault('metrics_tracking', {}).setdefault('historical_tracking', {})
+            ht.pop('snapshots', None)
+            ht['store'] = os.path.basename(db_path)
+            ht['latest'] = dict(latest, timestamp=datetime.now().isoformat(timespec='seconds'))
+        with skeleton_store.batch() as b:
+            b.mutate(dash_json, strip)
+    return {'points': len(points), 'added': added, 'migrated': len(migrated), 'compacted': compacted,
+            'inline_kept': inline and not verified}
+
+
+def list_series(db_path=DB_PATH):
+    with closing(connect(db_path)) as con:
+        return [r[0] for r in con.execute('SELECT series FROM samples UNION SELECT series FROM rollups ORDER BY 1')]
+
+
+def query(series, start=None, end=None, step=None, db_path=DB_PATH):
+    """[(ts, value)] in [start, end], oldest first. Rollup buckets contribute their mean.
+    With `step` (seconds), points are averaged into step-sized buckets."""
+    start, end = int(start or 0), int(end or time.time())
+    sql = '''SELECT ts, value, 1 AS w FROM samples WHERE series = ?1 AND ts BETWEEN ?2 AND ?3
+             UNION ALL
+             SELECT ts, sum / n, n FROM rollups WHERE series = ?1 AND ts BETWEEN ?2 AND ?3'''
+    with closing(connect(db_path)) as con:
+        if step:
+            rows = con.execute(f'SELECT ts / ?4 * ?4 AS b, SUM(value * w) / SUM(w) FROM ({sql}) GROUP BY b ORDER BY b',
+                               (series, start, end, int(step))).fetchall()
+        else:
+            rows = con.execute(sql + ' ORDER BY ts', (series, start, end)).fetchall()
+    return [(r[0], r[1]) for r in rows]
+
+
+def parse_duration(text):
+    """'90s' / '15m' / '6h' / '7d' -> seconds."""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    text = str(text).strip().lower()
+    return int(float(text[:-1]) * units[text[-1]]) if text and text[-1] in units else int(text)
+
+
+def main(argv=None):
+    argv = list(argv or [])
+
+    def opt(name):
+        return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else None
+    if '--snapshot' in argv:
+        print(json.dumps(snapshot()))
+        return 0
+    names = [a for i, a in enumerate(argv) if not a.startswith('--') and (i == 0 or argv[i - 1] not in ('--since', '--step'))]
+    if '--series' in argv or not names:
+        print('\n'.join(list_series()))
+        return 0
+    start = time.time() - parse_duration(opt('--since')) if opt('--since') else None
+    step = parse_duration(opt('--step')) if opt('--step') else None
+    out = {n: [{'t': datetime.fromtimestamp(ts).isoformat(timespec='seconds'), 'v': v} for ts, v in query(n, start, None, step)]
+           for n in names}
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
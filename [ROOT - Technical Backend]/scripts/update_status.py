@@ -1,32 +1,76 @@
 #!/usr/bin/env python3
-import json, os, sys, webbrowser
+import hashlib, json, os, sys, webbrowser
 from datetime import datetime
 
+import dashboard_summary, skeleton_store, timeseries
+
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 DASHBOARD_HTML = os.path.join(ROOT_DIR, 'dashboard.html')
 VOLUMES_HTML = os.path.join(ROOT_DIR, 'volumes_status.html')
 
-JSON_FILENAMES = [
-    'qa_responses_skeleton_v2.json',
-    'requirements_skeleton_v2.json',
-    'movius_dependencies_skeleton_v2.json',
-    'compliance_verification_skeleton_v2.json',
-    'volumes_completion_skeleton_v2.json',
-    'deliverables_schedule_skeleton_v2.json',
-    'rfp_document_skeleton_v2.json',
-    'document_output_compliance_skeleton.json',
-    'development_timeline_user_stories_skeleton.json',
-    'proposal_master_dashboard_skeleton.json',
-]
+JSON_FILENAMES = skeleton_store.SKELETON_FILENAMES
+MANIFEST_NAME = 'dashboard_manifest.json'
+
+# Shared by both pages: /run returns a job id right away; poll /jobs/<id> until it finishes.
+RUN_TASK_JS = '''
+const base = (window.location.origin && window.location.origin.startsWith('http')) ? window.location.origin : 'http://127.0.0.1:8765';
+async function runTask(task){
+  const s = document.getElementById("runStatus");
+  s.textContent = `Running ${task}...`;
+  try{
+    const res = await fetch(`${base}/run?task=${task}`);
+    let j = await res.json();
+    if(!j.job_id){ s.textContent = `${task}: FAILED (${j.error ?? 'n/a'})`; return; }
+    s.textContent = `Running ${task}...${j.coalesced ? ' (already running)' : ''}`;
+    while(j.state === 'queued' || j.state === 'running'){
+      await new Promise(r => setTimeout(r, 500));
+      j = await (await fetch(`${base}/jobs/${j.job_id}`)).json();
+    }
+    s.textContent = `${task}: ${j.ok? 'OK' : 'FAILED'} (code ${j.returncode ?? 'n/a'})`;
+  }catch(e){ s.textContent = `${task}: error ${e}`; }
+}
+'''
+
+# Shared by both pages: render(summary) runs with GET /api/summary (a few hundred bytes, see
+# dashboard_summary.py). /events?keys=summary pushes only its ETag, so the summary is refetched
+# when it actually changed; the no-cache fetch revalidates with If-None-Match (304, no body).
+LIVE_JS = '''
+function subscribeSummary(render){
+  const s = document.getElementById('liveStatus');
+  let etag = null, busy = false, again = false, last = null;
+  async function refresh(){
+    if(busy){ again = true; return; }
+    busy = true;
+    try{
+      const res = await fetch(`${base}/api/summary`, {cache: 'no-cache'});
+      const tag = res.headers.get('ETag');
+      if(res.ok && tag !== etag){ etag = tag; last = await res.json(); render(last); }
+    }catch(e){ if(s) s.textContent = 'summary unavailable (is dev_server.py running?)'; }
+    busy = false;
+    if(again){ again = false; refresh(); }
+  }
+  // The deadline arrives as a timestamp; re-render once a minute so the countdown moves.
+  setInterval(() => { if(last) render(last); }, 60000);
+  if(!window.EventSource){ if(s) s.textContent = 'live updates unsupported by this browser'; refresh(); return; }
+  const es = new EventSource(`${base}/events?keys=summary`);
+  es.addEventListener('fragment', e => { if(JSON.parse(e.data).value !== etag) refresh(); });
+  es.onopen = () => { if(s) s.textContent = 'live'; refresh(); };
+  es.onerror = () => { if(s) s.textContent = 'live updates disconnected (is dev_server.py running?) - retrying'; };
+}
+function countdown(epoch){
+  if(!epoch) return '—';
+  const m = Math.floor((epoch*1000 - Date.now())/60000);
+  if(m <= 0) return 'deadline passed';
+  return `${Math.floor(m/1440)}d ${Math.floor(m%1440/60)}h ${m%60}m left`;
+}
+'''
 
 def json_paths():
     return [os.path.join(ROOT_DIR, n) for n in JSON_FILENAMES]
 
 def read_json(path):
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            t = f.read().strip() or '{}'
-            return json.loads(t)
+        return skeleton_store.load(path)
     except Exception as e:
         return {'__error__': str(e)}
 
@@ -35,119 +79,166 @@ def summarize(v):
     if isinstance(v, list): return f'array · {len(v)} items'
     return type(v).__name__
 
-def generate_dashboard():
-    rows = []
+def scan_skeletons(full=False):
+    """Rows of (name, mtime, size, ok, summary). Unchanged files reuse the manifest summary:
+    same mtime/size -> no read; same content hash -> no parse."""
+    manifest = {} if full else (skeleton_store.read_cache(MANIFEST_NAME, {}) or {})
+    rows, entries, parsed = [], {}, 0
     for p in json_paths():
         n = os.path.basename(p)
-        ex = os.path.exists(p)
-        mt = datetime.fromtimestamp(os.path.getmtime(p)).strftime('%Y-%m-%d %H:%M:%S') if ex else '—'
-        sz = os.path.getsize(p) if ex else 0
-        d = read_json(p)
-        ok = not (isinstance(d, dict) and '__error__' in d)
-        sm = d['__error__'] if not ok else summarize(d)
-        rows.append((n, mt, sz, ok, sm))
+        try:
+            st = os.stat(p)
+        except OSError as e:
+            rows.append((n, '—', 0, False, str(e), 0))
+            continue
+        e = manifest.get(n) or {}
+        if e.get('mtime_ns') != st.st_mtime_ns or e.get('size') != st.st_size:
+            with open(p, 'rb') as f:
+                data = f.read()
+            h = hashlib.sha1(data).hexdigest()
+            if e.get('sha1') != h:
+                try:
+                    d = json.loads(data.decode('utf-8').strip() or '{}')
+                    e = {'ok': True, 'summary': summarize(d)}
+                except Exception as ex:
+                    e = {'ok': False, 'summary': str(ex)}
+                parsed += 1
+            e = dict(e, mtime_ns=st.st_mtime_ns, size=st.st_size, sha1=h)
+        entries[n] = e
+        mt = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        rows.append((n, mt, st.st_size, e['ok'], e['summary'], st.st_mtime))
+    if entries != manifest:
+        skeleton_store.write_cache(MANIFEST_NAME, entries)
+    return rows, parsed
+
+def write_if_changed(path, text):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    skeleton_store.write_text(path, text)  # temp file + os.replace: the server never serves half a page
+    return True
+
+def generate_dashboard(full=False):
+    rows, parsed = scan_skeletons(full)
     html = [
         '<!doctype html>','<meta charset="utf-8">','<title>Proposal Dashboard</title>',
         '<style>body{font-family:Segoe UI,Roboto,Arial;margin:24px} table{border-collapse:collapse;width:100%} th,td{border:1px solid #ccc;padding:8px 10px;text-align:left} th{background:#f5f7fb} .ok{color:#2e7d32}.bad{color:#c62828}.muted{color:#667} .nav a{margin-right:12px} .btn{display:inline-block;margin:4px 6px;padding:6px 10px;border:1px solid #ccc;border-radius:6px;background:#f7f9fc;cursor:pointer} .btn:disabled{opacity:.5;cursor:not-allowed} .toolbar{margin:12px 0 18px}</style>',
         '<div class="nav"><a href="dashboard.html">Dashboard</a><a href="volumes_status.html">Volumes Status</a></div>',
         '<h1>RPRTech · Proposal Status Dashboard</h1>',
+        '<div id="overview" class="muted"></div>',
         '<div class="toolbar">',
         '<button class="btn" onclick="runTask(\'validate_filenames\')">Validate Filenames</button>',
         '<button class="btn" onclick="runTask(\'check_page_counts\')">Check Page Counts</button>',
         '<button class="btn" onclick="runTask(\'compute_work_split\')">Compute Work Split</button>',
         '<button class="btn" onclick="runTask(\'check_fedramp_evidence\')">Check FedRAMP Evidence</button>',
+        '<button class="btn" onclick="runTask(\'run_all\')">Run All (stale only)</button>',
         '<button class="btn" onclick="runTask(\'regen_dashboards\')">Regenerate Dashboards</button>',
         '<span id="runStatus" class="muted"></span>',
         '</div>',
-        '''<script>
-const base = (window.location.origin && window.location.origin.startsWith('http')) ? window.location.origin : 'http://127.0.0.1:8765';
-async function runTask(task){
-  const s = document.getElementById("runStatus");
-  s.textContent = `Running ${task}...`;
-  try{
-    const res = await fetch(`${base}/run?task=${task}`);
-    const j = await res.json();
-    s.textContent = `${task}: ${j.ok? 'OK' : 'FAILED'} (code ${j.returncode ?? 'n/a'})`;
-  }catch(e){ s.textContent = `${task}: error ${e}`; }
-}
+        '<script>' + RUN_TASK_JS + LIVE_JS + '''
 
-async function loadChecks(){
+function renderChecks(sum){
   const el = document.getElementById('checks');
   if(!el) return;
-  try{
-    const [pm, cv] = await Promise.all([
-      fetch(`${base}/proposal_master_dashboard_skeleton.json`).then(r=>r.json()),
-      fetch(`${base}/compliance_verification_skeleton_v2.json`).then(r=>r.json()),
-    ]);
-    const items = [];
-    const hb = ((pm||{}).health_heartbeat)||{};
-    const work = hb.work_split||{};
-    const fed = hb.fedramp_evidence||{};
-    items.push({name:'Work Split >50%', ok:!!work.ok});
-    items.push({name:'FedRAMP Evidence Chain', ok:!!fed.ok});
-    const fv = (cv||{}).work_split_verification||{};
-    if(fv.verification_status){ items.push({name:'Work Split Verification', ok: fv.verification_status==='pass'}); }
-    const fe = (cv||{}).fedramp_evidence_verification||{};
-    if(fe.verification_status){ items.push({name:'FedRAMP Evidence Verification', ok: fe.verification_status==='pass'}); }
-    el.innerHTML = items.map(i=>{
-      const color = i.ok ? '#2e7d32' : '#c62828';
-      return `<div style="margin:6px 0;display:flex;align-items:center;"><span style="display:inline-block;width:10px;height:10px;border-radius:50%;background:${color};margin-right:8px;"></span>${i.name}</div>`;
-    }).join('');
-  }catch(e){
-    el.textContent = 'Failed to load checks: '+e;
+  const items = [];
+  const hb = sum.heartbeats||{}, v = sum.verification||{};
+  items.push({name:'Work Split >50%', ok:!!(hb.work_split||{}).ok});
+  items.push({name:'FedRAMP Evidence Chain', ok:!!(hb.fedramp_evidence||{}).ok});
+  if(v.work_split){ items.push({name:'Work Split Verification', ok: v.work_split==='pass'}); }
+  if(v.fedramp_evidence){ items.push({name:'FedRAMP Evidence Verification', ok: v.fedramp_evidence==='pass'}); }
+  if(v.filenames){ items.push({name:'Filename Validation', ok: v.filenames==='pass'}); }
+  if(v.page_counts){ items.push({name:'Page Counts', ok: v.page_counts==='pass'}); }
+  el.innerHTML = items.map(i=>{
+    const color = i.ok ? '#2e7d32' : '#c62828';
+    return `<div style="margin:6px 0;display:flex;align-items:center;"><span style="display:inline-block;width:10px;height:10px;border-radius:50%;background:${color};margin-right:8px;"></span>${i.name}</div>`;
+  }).join('');
+  const al = document.getElementById('alerts');
+  const alerts = sum.alerts||{active:0, top:[]};
+  if(al){
+    al.innerHTML = alerts.top.length ? alerts.top.map(([id, sev, msg])=>{
+      const color = sev==='critical' ? '#c62828' : (sev==='high' ? '#ef6c00' : '#607d8b');
+      return `<div style="margin:6px 0;"><strong style="color:${color}">${(sev||'').toUpperCase()}</strong> ${id}: ${msg}</div>`;
+    }).join('') + (alerts.active > alerts.top.length ? `<div class="muted">+${alerts.active - alerts.top.length} more</div>` : '') : 'No active alerts';
+  }
+  const b = sum.blockers||{}, c = sum.checks||{}, vol = sum.volumes||{};
+  const ov = document.getElementById('overview');
+  if(ov){
+    ov.innerHTML = `<strong>Deadline:</strong> ${countdown((sum.deadline||{}).epoch)}`
+      + ` · <strong>Critical blockers:</strong> ${b.critical ?? '—'} (${b.active ?? 0} active)`
+      + ` · <strong>Compliance checks:</strong> ${c.passed ?? 0}/${c.total_checks ?? 0} passed`
+      + ` · <strong>Volumes:</strong> ${vol.overall ?? '—'}% complete`;
   }
 }
-window.addEventListener('DOMContentLoaded', loadChecks);
+window.addEventListener('DOMContentLoaded', () => subscribeSummary(renderChecks));
 </script>''',
         '<table><tr><th>File</th><th>Updated</th><th>Size</th><th>Summary</th></tr>'
     ]
-    for n,mt,sz,ok,sm in rows:
+    for n,mt,sz,ok,sm,_ in rows:
         cls = 'ok' if ok else 'bad'
         html.append(f'<tr><td>{n}</td><td class="muted">{mt}</td><td class="muted">{sz} B</td><td class="{cls}">{sm}</td></tr>')
     html.append('</table>')
-    html.append('<h2>Key Checks</h2><div id="checks" class="muted">Loading…</div>')
-    html.append(f'<p class="muted">Last generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>')
-    with open(DASHBOARD_HTML,'w',encoding='utf-8') as f:
-        f.write('\n'.join(html))
+    html.append('<h2>Key Checks <span id="liveStatus" class="muted" style="font-size:12px;font-weight:normal"></span></h2><div id="checks" class="muted">Loading…</div>')
+    html.append('<h2>Active Alerts</h2><div id="alerts" class="muted">Loading…</div>')
+    # Stamp with the newest source mtime (not "now") so unchanged inputs render byte-identical HTML.
+    newest = max((r[5] for r in rows), default=0)
+    html.append(f'<p class="muted">Data as of: {datetime.fromtimestamp(newest).strftime("%Y-%m-%d %H:%M:%S") if newest else "—"}</p>')
+    return write_if_changed(DASHBOARD_HTML, '\n'.join(html)), parsed
 
 def generate_volumes_status():
-    path = os.path.join(ROOT_DIR,'proposal_master_dashboard_skeleton.json')
-    d = read_json(path)
-    st = d.get('status',{}) if isinstance(d, dict) else {}
+    # Baked from the same summary the page fetches, so the file also reads correctly offline.
+    summ = dashboard_summary.SUMMARY.data()
+    st = summ.get('status') or {}
     overall = st.get('overall','Unknown')
     vol1 = st.get('vol1','Unknown')
     vol2 = st.get('vol2','Unknown')
+    vols = summ.get('volumes') or {}
+    rows = ''.join(f'<tr><td>{v}</td><td>{pct if pct is not None else "—"}%</td><td>{state or "—"}</td></tr>'
+                   for v, pct, state in vols.get('by_volume') or [])
     html = [
         '<!doctype html>','<meta charset="utf-8">','<title>Volumes Status</title>',
-        '<style>body{font-family:Segoe UI,Roboto,Arial;margin:24px} .card{border:1px solid #ccc;border-radius:10px;padding:16px;margin-bottom:12px} .nav a{margin-right:12px} .btn{display:inline-block;margin:4px 6px;padding:6px 10px;border:1px solid #ccc;border-radius:6px;background:#f7f9fc;cursor:pointer}</style>',
+        '<style>body{font-family:Segoe UI,Roboto,Arial;margin:24px} .card{border:1px solid #ccc;border-radius:10px;padding:16px;margin-bottom:12px} .nav a{margin-right:12px} .btn{display:inline-block;margin:4px 6px;padding:6px 10px;border:1px solid #ccc;border-radius:6px;background:#f7f9fc;cursor:pointer} table{border-collapse:collapse} th,td{border:1px solid #ccc;padding:6px 10px;text-align:left} th{background:#f5f7fb}</style>',
         '<div class="nav"><a href="dashboard.html">Dashboard</a><a href="volumes_status.html">Volumes Status</a></div>',
         '<h1>Volumes Status</h1>',
         '<div class="card">'
-        '<div style="margin-bottom:8px;"><button class="btn" onclick="runTask(\'validate_filenames\')">Validate Filenames</button> <button class="btn" onclick="runTask(\'check_page_counts\')">Check Page Counts</button> <button class="btn" onclick="runTask(\'regen_dashboards\')">Regenerate Dashboards</button> <span id="runStatus" class="muted"></span></div>'
-        f'<div><strong>Overall:</strong> {overall}</div>'
-        f'<div><strong>Volume 1 (Technical):</strong> {vol1}</div>'
-        f'<div><strong>Volume 2 (Past Performance):</strong> {vol2}</div>'
+        '<div style="margin-bottom:8px;"><button class="btn" onclick="runTask(\'validate_filenames\')">Validate Filenames</button> <button class="btn" onclick="runTask(\'check_page_counts\')">Check Page Counts</button> <button class="btn" onclick="runTask(\'run_all\')">Run All (stale only)</button> <button class="btn" onclick="runTask(\'regen_dashboards\')">Regenerate Dashboards</button> <span id="runStatus" class="muted"></span></div>'
+        f'<div><strong>Overall:</strong> <span id="st_overall">{overall}</span></div>'
+        f'<div><strong>Volume 1 (Technical):</strong> <span id="st_vol1">{vol1}</span></div>'
+        f'<div><strong>Volume 2 (Past Performance):</strong> <span id="st_vol2">{vol2}</span></div>'
+        '<div id="liveStatus" class="muted" style="margin-top:8px;font-size:12px"></div>'
         '</div>',
-        '''<script>
-async function runTask(task){
-  const s = document.getElementById("runStatus");
-  s.textContent = `Running ${task}...`;
-  try{
-    const res = await fetch(`http://127.0.0.1:8765/run?task=${task}`);
-    const j = await res.json();
-    s.textContent = `${task}: ${j.ok? 'OK' : 'FAILED'} (code ${j.returncode ?? 'n/a'})`;
-  }catch(e){ s.textContent = `${task}: error ${e}`; }
+        f'<div class="card"><strong>Completion:</strong> <span id="vol_overall">{vols.get("overall") if vols.get("overall") is not None else "—"}</span>%'
+        f'<table style="margin-top:8px"><thead><tr><th>Volume</th><th>Completion</th><th>Status</th></tr></thead><tbody id="vol_rows">{rows}</tbody></table></div>',
+        '<script>' + RUN_TASK_JS + LIVE_JS + '''
+function renderStatus(sum){
+  const st = sum.status||{};
+  for(const k of ['overall','vol1','vol2']){ if(st[k] !== undefined) document.getElementById('st_'+k).textContent = st[k]; }
+  const vols = sum.volumes||{};
+  document.getElementById('vol_overall').textContent = vols.overall ?? '—';
+  document.getElementById('vol_rows').innerHTML = (vols.by_volume||[]).map(([v, pct, state]) =>
+    `<tr><td>${v}</td><td>${pct ?? '—'}%</td><td>${state || '—'}</td></tr>`).join('');
 }
+window.addEventListener('DOMContentLoaded', () => subscribeSummary(renderStatus));
 </script>'''
     ]
-    with open(VOLUMES_HTML,'w',encoding='utf-8') as f:
-        f.write('\n'.join(html))
+    return write_if_changed(VOLUMES_HTML, '\n'.join(html))
 
 def cli(argv):
     if '--regen' in argv:
-        generate_dashboard(); generate_volumes_status(); print('Dashboards regenerated.'); return 0
+        full = '--full' in argv
+        try:
+            timeseries.snapshot()  # metrics history lives in the SQLite store, not the skeleton
+        except Exception as e:
+            print(f'metrics snapshot skipped: {e}', file=sys.stderr)
+        wrote_dash, parsed = generate_dashboard(full)
+        wrote_vol = generate_volumes_status()
+        written = [os.path.basename(p) for p, w in ((DASHBOARD_HTML, wrote_dash), (VOLUMES_HTML, wrote_vol)) if w]
+        print(f"Dashboards regenerated. ({parsed} skeleton(s) parsed; wrote: {', '.join(written) or 'nothing, output unchanged'})")
+        return 0
     if '--open' in argv:
         webbrowser.open('file://'+DASHBOARD_HTML); return 0
-    print('Usage: update_status.py --regen | --open'); return 0
+    print('Usage: update_status.py --regen [--full] | --open'); return 0
 
 if __name__=='__main__': sys.exit(cli(sys.argv[1:]))
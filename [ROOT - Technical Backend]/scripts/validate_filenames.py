@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Filename conventions for working_drafts (recursive). All patterns plus the
+# required deliverable names are compiled into one anchored, case-insensitive
+# alternation. Directory listings are cached by directory mtime, so only
+# directories whose entries changed are listed again.
+import json, os, re, sys, time
+from datetime import datetime
+
+import skeleton_store
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+DRAFTS_DIR = os.path.join(ROOT, 'working_drafts')
+DOCS_JSON = os.path.join(ROOT, 'document_output_compliance_skeleton.json')
+OUTPUT_JSON = os.path.join(ROOT, 'proposal_master_dashboard_skeleton.json')
+CACHE_NAME = 'filenames.json'
+
+PATTERNS = [
+    r'vol1_technical_.*\.(md|docx|pdf)',
+    r'vol2_pastperf_.*\.(md|docx|pdf)',
+    r'RPRTech_Phase I-.*\.(pdf|xlsx)',
+    # final deliverables
+    r'RPRTech_Past Perf\.pdf',
+    r'RPRTech_Schedule B\.xlsx',
+    r'RPRTech_Ofr\.pdf',
+]
+
+# A directory modified this close to its last listing may have changed within
+# the same mtime tick, so its cache entry is not trusted.
+RACY_NS = 2_000_000_000
+
+
+def required_filenames():
+    names = skeleton_store.read_json(DOCS_JSON).get('required_filenames') or []
+    return [n for n in names if isinstance(n, str) and n.strip()]
+
+
+def compile_patterns(required=()):
+    alts = [f'(?:{p})' for p in PATTERNS] + [re.escape(n) for n in required]
+    return re.compile('^(?:%s)$' % '|'.join(alts), re.IGNORECASE)
+
+
+def walk(top, cache, new_cache, stats):
+    """Yield (relpath, size) for every non-hidden file under `top`, reusing cached
+    listings of directories whose mtime is unchanged."""
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        path = os.path.join(top, rel)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        c = cache.get(rel)
+        if c and c['mtime_ns'] == mtime and c['listed_at_ns'] - mtime > RACY_NS:
+            stats['dirs_cached'] += 1
+        else:
+            files, dirs = [], []
+            with os.scandir(path) as it:
+                for e in it:
+                    if e.name.startswith('.'):
+                        continue
+                    if e.is_dir(follow_symlinks=False):
+                        dirs.append(e.name)
+                    elif e.is_file():
+                        files.append([e.name, e.stat().st_size])
+            c = {'mtime_ns': mtime, 'listed_at_ns': time.time_ns(), 'files': sorted(files), 'dirs': sorted(dirs)}
+            stats['dirs_scanned'] += 1
+        new_cache[rel] = c
+        for name, size in c['files']:
+            yield (f'{rel}/{name}' if rel else name), size
+        stack.extend(f'{rel}/{d}' if rel else d for d in reversed(c['dirs']))
+
+
+def validate(drafts_dir=DRAFTS_DIR, cache_name=CACHE_NAME):
+    t0 = time.perf_counter()
+    required = required_filenames()
+    report = {'drafts_dir': drafts_dir, 'checked_at': datetime.now().isoformat(timespec='seconds')}
+    if not os.path.isdir(drafts_dir):
+        return dict(report, ok=False, error=f'Missing drafts dir: {drafts_dir}', files_seen=[], issues=[],
+                    missing_required=required)
+    rx = compile_patterns(required)
+    cache = skeleton_store.read_cache(cache_name, {}) or {}
+    new_cache, stats = {}, {'dirs_scanned': 0, 'dirs_cached': 0}
+    files_seen, issues, seen_names = [], [], set()
+    for rel, size in walk(drafts_dir, cache, new_cache, stats):
+        name = rel.rsplit('/', 1)[-1]
+        files_seen.append({'file': rel, 'size': size})
+        seen_names.add(name.casefold())
+        if not rx.match(name):
+            issues.append({'file': rel, 'issue': 'pattern_mismatch'})
+    if new_cache != cache:
+        skeleton_store.write_cache(cache_name, new_cache)
+    missing = [n for n in required if n.casefold() not in seen_names]
+    report.update({
+        'files_seen': files_seen,
+        'issues': issues,
+        'missing_required': missing,
+        'ok': not issues and not missing,
+        **stats,
+        'elapsed_ms': round((time.perf_counter() - t0) * 1000, 2),
+    })
+    return report
+
+
+def merge_into_dashboard(report):
+    with skeleton_store.batch() as b:
+        b.set(OUTPUT_JSON, 'filename_validation', report)
+
+
+def main():
+    rep = validate()
+    print(json.dumps(rep, indent=2))
+    merge_into_dashboard(rep)
+    return 0 if rep.get('ok') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
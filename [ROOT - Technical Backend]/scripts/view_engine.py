@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# Materializes `cross_skeleton_views` from proposal_master_dashboard_skeleton.json.
+#
+#   JOIN a WITH b ON field     hash join of the items of a and b on `field`
+#                              (left outer join; one row per join key)
+#   AGGREGATE term FROM a, b   one row per matching item + a consistency check
+#
+# Each view keeps, per source file, the join keys and summary of every item it
+# contributed. When a source file changes only its items are re-extracted, and
+# only the rows whose join keys gained or lost items are recomputed. Results are
+# persisted in .cache/views.json so later processes start warm.
+#
+#   py view_engine.py --list
+#   py view_engine.py view_001_requirements_to_volumes   (or view_001)
+import json, os, re, sys, threading, time
+from datetime import datetime
+
+import skeleton_store
+from query_engine import item_summary, iter_items, skeleton_name
+
+DASH_JSON = os.path.join(skeleton_store.ROOT, 'proposal_master_dashboard_skeleton.json')
+CACHE_NAME = 'views.json'
+
+JOIN_RE = re.compile(r'^\s*JOIN\s+(\w+)\s+WITH\s+(\w+)\s+ON\s+(\w+)\s*$', re.I)
+AGG_RE = re.compile(r'^\s*AGGREGATE\s+(\w+)\s+FROM\s+(.+?)\s*$', re.I)
+
+# Fields consulted for a join key. Items missing all of them may inherit an
+# INHERITED field from the nearest enclosing object (a deliverable takes
+# `contract_day` from its timeline period).
+JOIN_FIELDS = {
+    'day': ('day', 'contract_day'),
+    'dependency_id': ('dependency_id', 'source_id', 'links_to'),
+    'volume_id': ('volume_id', 'links_to'),
+}
+INHERITED = ('contract_day',)
+COMPLETION_KEYS = ('completion', 'overall_completion', 'completion_percentage', 'percentage')
+
+
+def _names():
+    return {skeleton_name(f) for f in skeleton_store.SKELETON_FILENAMES}
+
+
+def _filename(name):
+    return name if name.endswith('.json') else name + '.json'
+
+
+def _resolve(doc, ptr):
+    """Objects from the root down to (excluding) the item at JSON Pointer `ptr`."""
+    chain, node = [], doc
+    for part in ptr.split('/')[1:-1]:
+        part = part.replace('~1', '/').replace('~0', '~')
+        chain.append(node)
+        node = node[int(part)] if isinstance(node, list) else node.get(part)
+    chain.append(node)
+    return chain
+
+
+def _join_keys(skel, item_id, node, ancestors, field, names):
+    keys = {f'@{skel}:{item_id}'}
+    fields = JOIN_FIELDS.get(field, (field,))
+    vals = [node[f] for f in fields if node.get(f) not in (None, '', [])]
+    for a in reversed(ancestors):
+        if vals:
+            break
+        if isinstance(a, dict):
+            vals = [a[f] for f in fields if f in INHERITED and a.get(f) not in (None, '', [])]
+    for v in vals:
+        for x in (v if isinstance(v, list) else [v]):
+            if isinstance(x, (dict, list)) or x is None:
+                continue
+            x = str(x)
+            q, sep, rest = x.partition(':')
+            if sep and q in names:
+                keys.add(f'@{q}:{rest}')
+                keys.add(rest)
+            else:
+                keys.add(x)
+    return keys
+
+
+def _summary(skel, item_id, ptr, node):
+    s = item_summary(skel, item_id, ptr, node)
+    for k in COMPLETION_KEYS:
+        v = node.get(k)
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            s['completion'] = v
+            break
+    return s
+
+
+def _extract_join(path, field, names):
+    skel = skeleton_name(os.path.basename(path))
+    doc = skeleton_store.read_json(path)
+    out = {}
+    for item_id, ptr, node in iter_items(doc):
+        fields = JOIN_FIELDS.get(field, (field,))
+        inherit = not any(f in node for f in fields) and any(f in INHERITED for f in fields)
+        ancestors = _resolve(doc, ptr) if inherit else []
+        out[ptr] = [sorted(_join_keys(skel, item_id, node, ancestors, field, names)),
+                    _summary(skel, item_id, ptr, node)]
+    return out
+
+
+def _scalars(node):
+    out = {}
+    for k, v in node.items():
+        if isinstance(v, dict):
+            for k2, v2 in v.items():
+                if not isinstance(v2, (dict, list)):
+                    out[f'{k}.{k2}'] = v2
+        elif not isinstance(v, list):
+            out[k] = v
+    return out
+
+
+def _extract_agg(path, term, item_ids):
+    skel = skeleton_name(os.path.basename(path))
+    out = {}
+    for item_id, ptr, node in iter_items(skeleton_store.read_json(path)):
+        if (item_id in item_ids) if item_ids else (term.lower() in item_id.lower()):
+            out[ptr] = [[], dict(_scalars(node), skeleton=skel, id=item_id, path=ptr)]
+    return out
+
+
+class View:
+    def __init__(self, key, spec, state=None):
+        self.key = key
+        self.spec = spec
+        self.kind, self.sides, self.field, self.term, self.item_ids = self._plan(spec)
+        state = state if state and state.get('query') == spec.get('query') else {}
+        self.sources = state.get('sources', {'left': {}, 'right': {}})
+        self.rows = state.get('rows', {})
+        self.refreshed_at = state.get('refreshed_at')
+        self.last_refresh = state.get('last_refresh', {})
+        # In-memory hash tables: side -> join key -> {uid}
+        self.tables = {'left': {}, 'right': {}}
+        for side, files in self.sources.items():
+            for fn, src in files.items():
+                for ptr, (keys, _) in src.get('items', {}).items():
+                    for k in keys:
+                        self.tables[side].setdefault(k, set()).add((fn, ptr))
+
+    @staticmethod
+    def _plan(spec):
+        q = spec.get('query', '') or ''
+        names = _names()
+        m = JOIN_RE.match(q)
+        if m:
+            left, right, field = m.groups()
+            rights = [n for n in sorted(names) if n != left] if right == 'all_skeletons' else [right]
+            return 'join', {'left': [_filename(left)], 'right': [_filename(r) for r in rights]}, field, None, {}
+        m = AGG_RE.match(q)
+        if m:
+            term = m.group(1)
+            files, ids = [], {}
+            for src in spec.get('data_sources') or [s.strip() for s in m.group(2).split(',')]:
+                name, _, item = src.partition(':')
+                fn = _filename(name.strip())
+                if fn not in files:
+                    files.append(fn)
+                if item:
+                    ids.setdefault(fn, set()).add(item.strip())
+            return 'aggregate', {'left': files, 'right': []}, None, term, ids
+        return 'unsupported', {'left': [], 'right': []}, None, None, {}
+
+    def refresh(self, root):
+        if self.kind == 'unsupported':
+            return 0
+        names = _names()
+        affected, changed_files = set(), []
+        for side, files in self.sides.items():
+            srcs = self.sources.setdefault(side, {})
+            for fn in files:
+                path = os.path.join(root, fn)
+                stat = skeleton_store._stat_key(path)
+                src = srcs.get(fn)
+                if src and src.get('stat') == (list(stat) if stat else None):
+                    continue
+                if self.kind == 'join':
+                    new = _extract_join(path, self.field, names) if stat else {}
+                else:
+                    new = _extract_agg(path, self.term, self.item_ids.get(fn)) if stat else {}
+                old = (src or {}).get('items', {})
+                for ptr in set(old) | set(new):
+                    o, n = old.get(ptr), new.get(ptr)
+                    if o == n:
+                        continue
+                    if self.kind == 'aggregate':
+                        affected.add(f'{fn}#{ptr}')
+                        continue
+                    for k in (o[0] if o else ()):
+                        self.tables[side].get(k, set()).discard((fn, ptr))
+                        affected.add(k)
+                    for k in (n[0] if n else ()):
+                        self.tables[side].setdefault(k, set()).add((fn, ptr))
+                        affected.add(k)
+                srcs[fn] = {'stat': list(stat) if stat else None, 'items': new}
+                changed_files.append(fn)
+        if not changed_files:
+            return 0
+        if self.kind == 'join':
+            for k in affected:
+                self._join_row(k)
+        else:
+            self._aggregate_rows(affected)
+        self.refreshed_at = datetime.now().isoformat(timespec='seconds')
+        self.last_refresh = {'files': changed_files, 'rows_recomputed': len(affected)}
+        return len(affected)
+
+    def _items(self, side, uids):
+        srcs = self.sources[side]
+        return [srcs[fn]['items'][ptr][1] for fn, ptr in sorted(uids)]
+
+    def _join_row(self, k):
+        left = self.tables['left'].get(k) or set()
+        right = self.tables['right'].get(k) or set()
+        # Item-reference keys (@skeleton:id) only produce a row when both sides meet.
+        if not left or (k.startswith('@') and not right):
+            self.rows.pop(k, None)
+            return
+        self.rows[k] = {
+            'key': k,
+            'matched': bool(right),
+            'left': self._items('left', left),
+            'right': self._items('right', right),
+        }
+
+    def _aggregate_rows(self, affected):
+        for uid in affected:
+            fn, _, ptr = uid.partition('#')
+            item = self.sources['left'].get(fn, {}).get('items', {}).get(ptr)
+            if item:
+                self.rows[uid] = item[1]
+            else:
+                self.rows.pop(uid, None)
+        # Consistency across sources: numeric fields present in 2+ rows must agree (±0.1).
+        fields = {}
+        for uid, row in self.rows.items():
+            if uid == '__consistency__':
+                continue
+            for f, v in row.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    fields.setdefault(f, []).append(v)
+        shared = {f: vs for f, vs in fields.items() if len(vs) > 1}
+        self.rows['__consistency__'] = {
+            'fields': {f: {'values': vs, 'all_match': max(vs) - min(vs) <= 0.1} for f, vs in shared.items()},
+            'all_match': all(max(vs) - min(vs) <= 0.1 for vs in shared.values()) if shared else None,
+        }
+
+    def result(self):
+        rows = self.rows
+        if self.kind == 'join':
+            rows = [r for _, r in sorted(rows.items())]
+        return {
+            'ok': self.kind != 'unsupported',
+            'view': self.key,
+            'view_id': self.spec.get('view_id'),
+            'view_name': self.spec.get('view_name'),
+            'query': self.spec.get('query'),
+            'kind': self.kind,
+            'refreshed_at': self.refreshed_at,
+            'last_refresh': self.last_refresh,
+            'row_count': len(rows),
+            'rows': rows,
+        }
+
+    def state(self):
+        return {'query': self.spec.get('query'), 'sources': self.sources, 'rows': self.rows,
+                'refreshed_at': self.refreshed_at, 'last_refresh': self.last_refresh}
+
+
+class ViewEngine:
+    def __init__(self, root=None):
+        self.root = root or skeleton_store.ROOT
+        self.views = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def definitions(self):
+        try:
+            return skeleton_store.load(os.path.join(self.root, os.path.basename(DASH_JSON))).get('cross_skeleton_views', {}) or {}
+        except Exception:
+            return {}
+
+    def find(self, view_id):
+        defs = self.definitions()
+        if view_id in defs:
+            return view_id, defs[view_id]
+        for k, v in defs.items():
+            if isinstance(v, dict) and v.get('view_id') == view_id:
+                return k, v
+        return None, None
+
+    def _view(self, key, spec):
+        if not self.loaded:
+            persisted = skeleton_store.read_cache(CACHE_NAME, {}) or {}
+            for k, st in persisted.items():
+                self.views[k] = (st, None)
+            self.loaded = True
+        cur = self.views.get(key)
+        if isinstance(cur, tuple):
+            cur = View(key, spec, cur[0])
+        elif cur is None or cur.spec.get('query') != spec.get('query'):
+            cur = View(key, spec)
+        self.views[key] = cur
+        return cur
+
+    def get(self, view_id):
+        with self.lock:
+            key, spec = self.find(view_id)
+            if not spec:
+                raise KeyError(view_id)
+            t0 = time.perf_counter()
+            view = self._view(key, spec)
+            if view.refresh(self.root):
+                self._persist()
+            res = view.result()
+            res['elapsed_ms'] = round((time.perf_counter() - t0) * 1000, 2)
+            return res
+
+    def refresh_all(self):
+        with self.lock:
+            n = 0
+            for key, spec in self.definitions().items():
+                if isinstance(spec, dict):
+                    n += self._view(key, spec).refresh(self.root)
+            if n:
+                self._persist()
+            return n
+
+    def _persist(self):
+        out = {}
+        for k, v in self.views.items():
+            out[k] = v[0] if isinstance(v, tuple) else v.state()
+        skeleton_store.write_cache(CACHE_NAME, out)
+
+
+ENGINE = ViewEngine()
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] == '--list':
+        for k, v in ENGINE.definitions().items():
+            print(f"{k}\t{v.get('view_id', '')}\t{v.get('query', '')}")
+        return 0
+    if argv[0] == '--refresh':
+        print(json.dumps({'ok': True, 'rows_recomputed': ENGINE.refresh_all()}))
+        return 0
+    try:
+        print(json.dumps(ENGINE.get(argv[0]), indent=2, ensure_ascii=False))
+    except KeyError:
+        print(json.dumps({'ok': False, 'error': 'unknown_view', 'view': argv[0]}))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# Scratch copies of the backend for tests: the real skeletons and .cache are never touched.
+import os, shutil, sys, tempfile
+from contextlib import contextmanager
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+SCRIPTS = os.path.join(BACKEND, 'scripts')
+if SCRIPTS not in sys.path:
+    sys.path.insert(0, SCRIPTS)
+
+import skeleton_store
+
+
+def copy_backend(testcase):
+    """Copy scripts, schemas and skeletons to a temp dir removed after the test; returns its path."""
+    root = tempfile.mkdtemp(prefix='backend_')
+    testcase.addCleanup(shutil.rmtree, root, ignore_errors=True)
+    for d in ('scripts', 'schemas'):
+        shutil.copytree(os.path.join(BACKEND, d), os.path.join(root, d), ignore=shutil.ignore_patterns('__pycache__'))
+    for fn in os.listdir(BACKEND):
+        if fn.endswith('.json'):
+            shutil.copy2(os.path.join(BACKEND, fn), root)
+    return root
+
+
+@contextmanager
+def use_root(root):
+    """Point skeleton_store (and so every in-process reader/writer) at a scratch copy."""
+    old = skeleton_store.ROOT, skeleton_store.CACHE_DIR
+    skeleton_store.ROOT, skeleton_store.CACHE_DIR = root, os.path.join(root, '.cache')
+    skeleton_store.invalidate()
+    try:
+        yield root
+    finally:
+        skeleton_store.ROOT, skeleton_store.CACHE_DIR = old
+        skeleton_store.invalidate()
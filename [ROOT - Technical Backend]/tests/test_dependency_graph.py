@@ -0,0 +1,86 @@
+# Edges from the real skeletons, cycle detection and the status-only refresh of dependency_graph.
+import json, os, unittest
+
+from scratch import copy_backend, use_root
+
+import dependency_graph as dg
+import skeleton_store
+
+# dependencies_map chains in the deliverables skeleton, as resolved edges (a -> b: b waits on a).
+CHAIN_EDGES = [
+    ('ext:award', 'day3_001'), ('ext:award', 'day3_002'),
+    ('day3_001', 'day30_001'), ('day3_002', 'day30_004'),
+    ('day30_001', 'day90_001'), ('day30_004', 'day90_001'),
+    ('day90_001', 'ext:ongoing_operations'),
+    ('day5_003', 'day10_001'), ('day10_001', 'day90_002'), ('day90_002', 'ext:ato_grant'),
+    ('day10_003', 'ext:pilot'), ('ext:pilot', 'ext:phased_rollout'), ('ext:phased_rollout', 'day90_001'),
+    ('day5_002', 'ext:support_hiring_training'), ('ext:support_hiring_training', 'day90_004'),
+    ('day30_003', 'ext:materials_development'), ('ext:materials_development', 'ext:training_delivery'),
+    ('ext:training_delivery', 'day90_001'), ('ext:training_delivery', 'day90_004'),
+]
+
+
+class RealSkeletons(unittest.TestCase):
+    def setUp(self):
+        ctx = use_root(copy_backend(self))
+        self.root = ctx.__enter__()
+        self.addCleanup(ctx.__exit__, None, None, None)
+        self.graph = dg.DependencyGraph(root=self.root)
+
+    def test_chain_edges(self):
+        s = self.graph.summary()
+        succ = self.graph.graph['succ']
+        for a, b in CHAIN_EDGES:
+            self.assertIn(b, succ[a], f'{a} -> {b}')
+        # "Day 30 Plans" stands for the four day-30 deliverables; "Day 90 Complete" for the four day-90 ones.
+        self.assertLessEqual({'day30_001', 'day30_002', 'day30_003', 'day30_004'}, set(succ['day3_001']))
+        self.assertEqual(sorted(succ['ext:training_delivery']), ['day90_001', 'day90_002', 'day90_003', 'day90_004'])
+        self.assertEqual(s['cycles'], [])
+        self.assertEqual(len(s['topological_order']), s['nodes'])
+        self.assertEqual(s['critical_path'][0]['id'], 'ext:va_schedules_meeting')
+        self.assertIn('VA schedules meeting', s['unresolved_dependencies'])
+
+    def test_status_only_rewrite(self):
+        before = self.graph.summary()
+        edges = json.dumps(self.graph.graph['succ'], sort_keys=True)
+        path = os.path.join(self.root, dg.DELIV)
+        ptr = self.graph.graph['nodes']['day90_001']['path']
+        doc = json.loads(json.dumps(skeleton_store.load(path)))
+        node = doc
+        for t in ptr[1:].split('/'):
+            node = node[int(t)] if isinstance(node, list) else node[t]
+        node['status'] = 'delivered'
+        st = os.stat(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.graph.refresh(), {'rebuilt': ['deliverables_schedule_skeleton_v2'], 'mode': 'status'})
+        after = self.graph.summary()
+        self.assertEqual(after['topological_order'], before['topological_order'])
+        self.assertEqual(json.dumps(self.graph.graph['succ'], sort_keys=True), edges)
+        self.assertEqual(self.graph.graph['nodes']['day90_001']['status'], 'delivered')
+        self.assertLess(after['critical_path_hours'], before['critical_path_hours'])
+        self.assertEqual(self.graph.refresh(), {'rebuilt': [], 'mode': 'none'})
+
+
+class Cycles(unittest.TestCase):
+    def test_cycle_left_out_of_order(self):
+        doc = {'dependencies': [
+            {'dependency_id': 'm1', 'item': 'Alpha', 'estimated_effort_hours': 5, 'dependencies': ['m2']},
+            {'dependency_id': 'm2', 'item': 'Beta', 'estimated_effort_hours': 5, 'dependencies': ['m1']},
+            {'dependency_id': 'm3', 'item': 'Gamma', 'estimated_effort_hours': 1, 'dependencies': ['m2']},
+            {'dependency_id': 'm4', 'item': 'Delta', 'estimated_effort_hours': 2},
+            {'dependency_id': 'm5', 'item': 'Epsilon', 'estimated_effort_hours': 3, 'dependencies': ['m4']},
+        ]}
+        g = dg.assemble({dg.MOVIUS: dg.build_segment(dg.MOVIUS, (0, 0), doc)})
+        self.assertEqual(g['succ']['m1'], ['m2'])
+        self.assertEqual(sorted(g['succ']['m2']), ['m1', 'm3'])
+        # Kahn's algorithm never frees the cycle, nor anything downstream of it.
+        self.assertEqual(g['cycles'], ['m1', 'm2', 'm3'])
+        self.assertEqual(g['order'], ['m4', 'm5'])
+        a = dg.analyze(g)
+        self.assertEqual((a['critical_path'], a['critical_path_hours']), (['m4', 'm5'], 5.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
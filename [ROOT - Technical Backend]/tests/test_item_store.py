@@ -0,0 +1,107 @@
+# RFC 6902 semantics, If-Match handling and write coalescing of item_store.
+import copy, threading, unittest
+
+from scratch import copy_backend, use_root
+
+import item_store
+from item_store import PatchError, apply_patch
+
+MOVIUS = 'movius_dependencies_skeleton_v2'
+
+
+class ApplyPatch(unittest.TestCase):
+    def setUp(self):
+        self.doc = {'a': {'b': 1}, 'list': [1, 2, 3]}
+
+    def patched(self, ops):
+        doc = copy.deepcopy(self.doc)
+        apply_patch(doc, ops)
+        return doc
+
+    def error(self, ops):
+        with self.assertRaises(PatchError) as cm:
+            apply_patch(copy.deepcopy(self.doc), ops)
+        return cm.exception.status, cm.exception.error
+
+    def test_add(self):
+        self.assertEqual(self.patched([{'op': 'add', 'path': '/a/c', 'value': 2}])['a'], {'b': 1, 'c': 2})
+        self.assertEqual(self.patched([{'op': 'add', 'path': '/list/1', 'value': 9}])['list'], [1, 9, 2, 3])
+        self.assertEqual(self.patched([{'op': 'add', 'path': '/list/-', 'value': 4}])['list'], [1, 2, 3, 4])
+
+    def test_remove(self):
+        self.assertEqual(self.patched([{'op': 'remove', 'path': '/a/b'}])['a'], {})
+        self.assertEqual(self.patched([{'op': 'remove', 'path': '/list/0'}])['list'], [2, 3])
+        self.assertEqual(self.error([{'op': 'remove', 'path': '/a/missing'}]), (409, 'path_not_found'))
+
+    def test_replace(self):
+        self.assertEqual(self.patched([{'op': 'replace', 'path': '/a/b', 'value': 5}])['a'], {'b': 5})
+        self.assertEqual(self.error([{'op': 'replace', 'path': '/a/missing', 'value': 5}]), (409, 'path_not_found'))
+        self.assertEqual(self.error([{'op': 'replace', 'path': '/list/3', 'value': 5}]), (409, 'path_not_found'))
+
+    def test_move_and_copy(self):
+        self.assertEqual(self.patched([{'op': 'move', 'from': '/a/b', 'path': '/c'}]), {'a': {}, 'list': [1, 2, 3], 'c': 1})
+        self.assertEqual(self.patched([{'op': 'copy', 'from': '/list', 'path': '/a/l'}])['a']['l'], [1, 2, 3])
+        self.assertEqual(self.error([{'op': 'move', 'from': '/a', 'path': '/a/b/c'}]), (400, 'move_into_child'))
+
+    def test_test(self):
+        self.assertEqual(self.patched([{'op': 'test', 'path': '/a', 'value': {'b': 1}}]), self.doc)
+        self.assertEqual(self.error([{'op': 'test', 'path': '/a/b', 'value': 2}]), (409, 'test_failed'))
+
+    def test_malformed_operations(self):
+        for ops in ([{'op': 'move', 'path': '/a', 'from': 1}], [{'op': 'add', 'path': 7, 'value': 1}],
+                    [{'op': 'frobnicate', 'path': '/a'}], [{'path': '/a'}], ['add']):
+            self.assertEqual(self.error(ops), (400, 'bad_operation'), ops)
+        self.assertEqual(self.error([{'op': 'add', 'path': '/a/c'}]), (400, 'missing_value'))
+        self.assertEqual(self.error([{'op': 'copy', 'path': '/a/c'}]), (400, 'missing_from'))
+        self.assertEqual(self.error({'op': 'add'}), (400, 'patch_must_be_array'))
+        self.assertEqual(self.error([{'op': 'add', 'path': 'a', 'value': 1}]), (400, 'bad_pointer'))
+
+
+class PatchQueue(unittest.TestCase):
+    def setUp(self):
+        ctx = use_root(copy_backend(self))
+        ctx.__enter__()
+        self.addCleanup(ctx.__exit__, None, None, None)
+        self.queue = item_store.PatchQueue(window=0.2)
+
+    def test_if_match(self):
+        _, _, tag = item_store.get_item(MOVIUS, 'movius_004')
+        ops = [{'op': 'replace', 'path': '/status/state', 'value': 'received'}]
+        res = self.queue.submit(MOVIUS, 'movius_004', ops, if_match=tag)
+        self.assertNotEqual(res['etag'], tag)
+        self.assertEqual(item_store.get_item(MOVIUS, 'movius_004')[2], res['etag'])
+        with self.assertRaises(PatchError) as cm:
+            self.queue.submit(MOVIUS, 'movius_004', ops, if_match=tag)  # stale
+        self.assertEqual((cm.exception.status, cm.exception.error), (412, 'etag_mismatch'))
+
+    def test_unknown_state_rejected(self):
+        ops = [{'op': 'replace', 'path': '/status/state', 'value': 'bogus'}]
+        with self.assertRaises(PatchError) as cm:
+            self.queue.submit(MOVIUS, 'movius_004', ops)
+        self.assertEqual((cm.exception.status, cm.exception.error), (422, 'schema_violation'))
+        self.assertIn("'bogus' not one of", cm.exception.detail['errors'][0])
+        self.assertNotEqual(item_store.get_item(MOVIUS, 'movius_004')[0]['status']['state'], 'bogus')
+
+    def test_coalesced_batch_isolates_a_bad_patch(self):
+        good = [{'op': 'replace', 'path': '/status/state', 'value': 'received'}]
+        bad = [{'op': 'move', 'path': '/a', 'from': 1}]
+        out = {}
+
+        def submit(item_id, ops):
+            try:
+                out[item_id] = self.queue.submit(MOVIUS, item_id, ops)
+            except Exception as e:
+                out[item_id] = e
+        threads = [threading.Thread(target=submit, args=a) for a in (('movius_004', good), ('movius_005', bad))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(out['movius_004']['coalesced'], 2)
+        self.assertEqual(item_store.get_item(MOVIUS, 'movius_004')[0]['status']['state'], 'received')
+        self.assertIsInstance(out['movius_005'], PatchError)
+        self.assertEqual(out['movius_005'].status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
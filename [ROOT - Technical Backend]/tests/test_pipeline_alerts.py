@@ -0,0 +1,70 @@
+# run_all end to end in a scratch copy of the backend: a failing check must not
+# block evaluate_alerts, and its failure must surface as an alert.
+#
+#   py -m unittest discover -s "[ROOT - Technical Backend]/tests"
+import json, os, subprocess, sys, unittest
+
+from scratch import copy_backend, use_root
+
+import alert_engine, skeleton_store
+
+DASH = 'proposal_master_dashboard_skeleton.json'
+COMP = 'compliance_verification_skeleton_v2.json'
+
+
+class RunAllAlerts(unittest.TestCase):
+    def setUp(self):
+        # No Schedule B workbook in the copy: compute_work_split reports a failed work split.
+        self.root = copy_backend(self)
+
+    def run_all(self):
+        p = subprocess.run([sys.executable, os.path.join(self.root, 'scripts', 'pipeline.py')],
+                           capture_output=True, text=True, timeout=300)
+        return json.loads(p.stdout)
+
+    def active_alerts(self):
+        with open(os.path.join(self.root, DASH), encoding='utf-8') as f:
+            return json.load(f)['alerts']['active_alerts']
+
+    def test_failing_check_raises_alert(self):
+        rep = self.run_all()
+        self.assertEqual(rep['stages']['compute_work_split']['verdict'], 'fail')
+        self.assertEqual(rep['stages']['evaluate_alerts']['state'], 'done')
+        self.assertIn('compute_work_split', rep['checks_failed'])
+        self.assertFalse(rep['crashed'])
+        failed = [a for a in self.active_alerts() if a.get('alert_type') == 'check_failed']
+        self.assertTrue(any('work_split' in a.get('message', '') for a in failed), failed)
+        # Inputs unchanged: the failing check is up to date and is not rerun.
+        again = self.run_all()['stages']['compute_work_split']
+        self.assertEqual((again['state'], again['verdict']), ('skipped', 'fail'))
+
+    def test_crashed_producer_does_not_block_alerts(self):
+        with open(os.path.join(self.root, 'scripts', 'check_fedramp_evidence.py'), 'w') as f:
+            f.write("def main(argv=None):\n    raise RuntimeError('boom')\n")
+        rep = self.run_all()
+        self.assertEqual(rep['stages']['check_fedramp_evidence']['reason'], 'crashed')
+        self.assertEqual(rep['stages']['evaluate_alerts']['state'], 'done')
+
+
+
+class InterleavedNotifications(unittest.TestCase):
+    def test_rule_skipped_for_other_file_still_sees_its_change(self):
+        root = copy_backend(self)
+        with use_root(root):
+            engine = alert_engine.AlertEngine(root=root)
+            engine.evaluate(force=True)
+            with skeleton_store.batch() as b:
+                b.mutate(os.path.join(root, DASH), lambda doc: doc['executive_dashboard']['blocker_analysis']
+                         ['active_blockers'].append({'blocker_id': 'BLOCK-T1', 'description': 'Test blocker',
+                                                     'severity': 'critical', 'status': 'open'}))
+            # The COMP notification arrives first (parallel stages): RULE-002 is not checked yet ...
+            self.assertNotIn('RULE-002', engine.evaluate(changed=[COMP])['evaluated'])
+            # ... and must still fire on the DASH notification.
+            rep = engine.evaluate(changed=[DASH])
+            self.assertIn('RULE-002', rep['evaluated'])
+            alerts = skeleton_store.read_json(os.path.join(root, DASH))['alerts']['active_alerts']
+            self.assertTrue(any(a.get('dedupe_key') == 'RULE-002:BLOCK-T1' for a in alerts))
+
+
+if __name__ == '__main__':
+    unittest.main()
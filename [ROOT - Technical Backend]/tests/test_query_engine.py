@@ -0,0 +1,95 @@
+# Filter grammar, index candidates and stat-based invalidation of query_engine.
+import json, os, shutil, tempfile, threading, unittest
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import scratch  # noqa: F401  (puts scripts/ on sys.path)
+
+import query_engine
+from query_engine import QueryError, compile_filter
+
+ITEMS = [
+    {'req_id': 'R1', 'status': 'open', 'priority': 1, 'risk': 'critical', 'title': 'FedRAMP ATO letter'},
+    {'req_id': 'R2', 'status': {'state': 'done'}, 'priority': 1.0, 'risk': 'low', 'title': 'Pricing sheet'},
+    {'req_id': 'R3', 'status': 'open', 'priority': 2, 'risk': 'high', 'title': 'SSP summary', 'owner': 'Ana'},
+    {'req_id': 'R4', 'status': 'blocked', 'priority': 2.5, 'risk': 'critical', 'title': 'OEM letter'},
+]
+
+
+class QueryEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='query_')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.path = os.path.join(self.root, 'tiny.json')
+        self.write(ITEMS)
+        self.engine = query_engine.QueryEngine(['tiny.json'], root=self.root)
+
+    def write(self, items):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'requirements': items}, f)
+
+    def ids(self, text):
+        return sorted(i['id'] for i in self.engine.run_filter(text))
+
+    def test_equality_and_contains(self):
+        self.assertEqual(self.ids("risk == 'critical'"), ['R1', 'R4'])
+        self.assertEqual(self.ids("risk == 'CRITICAL'"), ['R1', 'R4'])  # strings compare case-insensitively
+        self.assertEqual(self.ids("status.state == 'done'"), ['R2'])
+        self.assertEqual(self.ids("status != 'open'"), ['R2', 'R4'])
+        self.assertEqual(self.ids("title contains 'letter'"), ['R1', 'R4'])
+        self.assertEqual(self.ids("owner contains 'an'"), ['R3'])
+        self.assertEqual(self.ids('priority >= 2'), ['R3', 'R4'])
+
+    def test_precedence(self):
+        # AND binds tighter than OR; NOT tighter than AND; parentheses override.
+        self.assertEqual(self.ids("risk == 'low' or risk == 'critical' and status == 'open'"), ['R1', 'R2'])
+        self.assertEqual(self.ids("(risk == 'low' or risk == 'critical') and status == 'open'"), ['R1'])
+        self.assertEqual(self.ids("not status == 'open' and risk == 'critical'"), ['R4'])
+
+    def test_index_agrees_with_scan(self):
+        for text in ('priority == 1', 'priority == 1.0', "id == 'r3'", "status == 'done'", 'priority == 2.5'):
+            pred = compile_filter(text)
+            self.engine.refresh()
+            ix = self.engine.skeletons['tiny.json']
+            scanned = {n for n, (i, _, node) in enumerate(ix.items) if pred.match(i, node)}
+            self.assertIsNotNone(pred.candidates(ix), text)
+            self.assertTrue(scanned <= pred.candidates(ix), text)
+        self.assertEqual(self.ids('priority == 1.0'), ['R1', 'R2'])
+        self.assertEqual(self.ids('priority == 1'), ['R1', 'R2'])
+
+    def test_malformed_filters(self):
+        for text in ("risk = 'x'", "risk == 'x' and", "(risk == 'x'", "risk ~ 'x'", "risk == 'x' 'y'"):
+            with self.assertRaises(QueryError, msg=text):
+                compile_filter(text)
+
+    def test_rebuilds_only_changed_files(self):
+        self.assertEqual(self.engine.refresh(), ['tiny'])
+        self.assertEqual(self.engine.refresh(), [])
+        self.write(ITEMS + [{'req_id': 'R5', 'status': 'open', 'risk': 'critical'}])
+        self.assertEqual(self.engine.refresh(), ['tiny'])
+        self.assertEqual(self.ids("risk == 'critical'"), ['R1', 'R4', 'R5'])
+        os.remove(self.path)
+        self.assertEqual(self.ids("risk == 'critical'"), [])
+
+    def test_dev_server_answers_400(self):
+        import dev_server
+        old, query_engine.ENGINE = query_engine.ENGINE, self.engine
+        self.addCleanup(setattr, query_engine, 'ENGINE', old)
+        quiet = type('QuietHandler', (dev_server.Handler,), {'log_message': lambda self, *a: None})
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), quiet)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(httpd.shutdown)
+        base = f'http://127.0.0.1:{httpd.server_address[1]}/query?filter='
+        with urlopen(base + quote("risk == 'critical'")) as r:
+            self.assertEqual(json.load(r)['count'], 2)
+        with self.assertRaises(HTTPError) as cm:
+            urlopen(base + quote("risk = 'critical'"))
+        self.assertEqual(cm.exception.code, 400)
+        self.assertFalse(json.load(cm.exception)['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
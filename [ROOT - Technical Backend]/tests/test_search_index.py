@@ -0,0 +1,87 @@
+# BM25 ranking, tokenization and per-skeleton re-indexing of search_index.
+import json, os, shutil, tempfile, unittest
+
+from scratch import use_root
+
+import search_index
+from search_index import tokenize
+
+ITEMS = [
+    {'req_id': 'R1', 'title': 'FedRAMP ATO letter'},
+    {'req_id': 'R2', 'title': 'FedRAMP evidence: FedRAMP package'},
+    {'req_id': 'R3', 'title': 'FedRAMP moderate baseline, inherited controls and the narrative for each family'},
+    {'req_id': 'R4', 'title': 'Pricing sheet', 'notes': 'OEM quote attached'},
+]
+OTHER = [{'qa_number': 'Q1', 'question': 'Is a signed FedRAMP letter required?'}]
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='search_')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        ctx = use_root(self.root)
+        ctx.__enter__()
+        self.addCleanup(ctx.__exit__, None, None, None)
+        self.write('tiny.json', {'requirements': ITEMS})
+        self.write('other.json', {'questions': OTHER})
+        self.index = search_index.SearchIndex(['tiny.json', 'other.json'], root=self.root)
+
+    def write(self, fn, doc):
+        path = os.path.join(self.root, fn)
+        st = os.stat(path) if os.path.exists(path) else None
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f)
+        if st:  # a later mtime even on filesystems with coarse timestamps
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    def ids(self, q, **kw):
+        return [h['id'] for h in self.index.search(q, **kw)['hits']]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('The FedRAMP ATO-letter, for VA 852'), ['fedramp', 'ato', 'letter', 'va', '852'])
+        self.assertEqual(tokenize('of the and'), [])
+
+    def test_bm25_order(self):
+        # Term frequency first (R2), then the shorter document (R1 before Q1 before the long R3).
+        self.assertEqual(self.ids('fedramp'), ['R2', 'R1', 'Q1', 'R3'])
+        # A document matching both terms outranks one matching only the rarer term.
+        self.assertEqual(self.ids('fedramp letter')[:2], ['R1', 'Q1'])
+        self.assertEqual(self.ids('oem'), ['R4'])
+        self.assertEqual(self.ids('the'), [])
+        self.assertEqual(self.ids('fedramp', skeletons=['other']), ['Q1'])
+        self.assertEqual(self.ids('fedramp', limit=2), ['R2', 'R1'])
+
+    def test_hit_fields_and_snippet(self):
+        hit = self.index.search('oem')['hits'][0]
+        self.assertEqual((hit['skeleton'], hit['path'], hit['fields']), ('tiny', '/requirements/3', ['/requirements/3/notes']))
+        self.assertEqual(hit['snippet'], 'OEM quote attached')
+
+    def test_updated_item_is_reindexed(self):
+        self.assertEqual(sorted(self.index.refresh()), ['other', 'tiny'])
+        self.assertEqual(self.index.refresh(), [])
+        items = [dict(i) for i in ITEMS]
+        items[3]['notes'] = 'FedRAMP FedRAMP FedRAMP'
+        self.write('tiny.json', {'requirements': items})
+        self.assertEqual(self.ids('oem'), [])
+        self.assertEqual(self.ids('fedramp')[0], 'R4')
+        self.assertEqual(self.index.refresh(), [])
+
+    def test_only_changed_skeleton_rebuilt(self):
+        self.index.refresh()
+        self.write('other.json', {'questions': OTHER + [{'qa_number': 'Q2', 'question': 'Pricing format?'}]})
+        self.assertEqual(self.index.refresh(), ['other'])
+        self.assertEqual(self.ids('pricing'), ['Q2', 'R4'])
+        # A fresh instance loads unchanged segments from .cache instead of re-indexing.
+        fresh = search_index.SearchIndex(['tiny.json', 'other.json'], root=self.root)
+        self.assertEqual(fresh.refresh(), [])
+        self.assertEqual([h['id'] for h in fresh.search('pricing')['hits']], ['Q2', 'R4'])
+
+    def test_removed_skeleton_dropped(self):
+        self.index.refresh()
+        os.remove(os.path.join(self.root, 'other.json'))
+        self.assertEqual(self.index.refresh(), ['other'])
+        self.assertEqual(self.ids('fedramp'), ['R2', 'R1', 'R3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# Missing vs unreadable skeletons: read_json, batch() and the readers that used to treat a corrupt file as empty.
+import json, os, threading, unittest
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from scratch import copy_backend, use_root
+
+import dashboard_summary, dependency_graph, dev_server, live_events, skeleton_store
+from skeleton_store import SkeletonUnreadable, WriteRejected
+
+DASH = 'proposal_master_dashboard_skeleton.json'
+
+
+class Unreadable(unittest.TestCase):
+    def setUp(self):
+        ctx = use_root(copy_backend(self))
+        self.root = ctx.__enter__()
+        self.addCleanup(ctx.__exit__, None, None, None)
+        self.dash = os.path.join(self.root, DASH)
+        with open(self.dash, encoding='utf-8') as f:
+            self.good = f.read()
+
+    def corrupt(self):
+        st = os.stat(self.dash)
+        with open(self.dash, 'w', encoding='utf-8') as f:
+            f.write(self.good[:len(self.good) // 2])  # a half-written file
+        os.utime(self.dash, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    def test_read_json(self):
+        self.assertEqual(skeleton_store.read_json(os.path.join(self.root, 'missing.json')), {})
+        doc = skeleton_store.read_json(self.dash)
+        self.assertIs(skeleton_store.load(self.dash), doc)  # shared cached document
+        self.corrupt()
+        with self.assertRaises(SkeletonUnreadable) as cm:
+            skeleton_store.read_json(self.dash)
+        self.assertEqual(cm.exception.path, self.dash)
+        self.assertIsInstance(cm.exception, ValueError)
+
+    def test_batch_leaves_file_alone(self):
+        self.corrupt()
+        with self.assertRaises(WriteRejected):
+            with skeleton_store.batch() as b:
+                b.set(self.dash, ('status',), {'ok': True})
+        with open(self.dash, encoding='utf-8') as f:
+            self.assertEqual(f.read(), self.good[:len(self.good) // 2])
+
+    def test_summary_and_graph_raise(self):
+        summary = dashboard_summary.Summary(root=self.root)
+        before = summary.data()
+        self.assertGreater(before['blockers']['active'], 0)
+        self.corrupt()
+        with self.assertRaises(SkeletonUnreadable):
+            summary.get()
+        with self.assertRaises(SkeletonUnreadable):
+            dependency_graph.DependencyGraph(root=self.root).publish()
+        with open(self.dash, 'w', encoding='utf-8') as f:
+            f.write(self.good)
+        self.assertEqual(summary.data(), before)
+
+    def test_events_keep_last_good_fragments(self):
+        bus = live_events.EventBus()
+        bus._scan(DASH, publish=False)
+        values = dict(bus.values)
+        self.assertTrue(values)
+        self.corrupt()
+        bus._scan(DASH)
+        self.assertEqual(bus.values, values)
+
+    def test_dev_server_503(self):
+        class Quiet(dev_server.Handler):
+            def log_message(self, *args):
+                pass
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Quiet)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        old = dashboard_summary.SUMMARY
+        dashboard_summary.SUMMARY = dashboard_summary.Summary(root=self.root)
+        self.addCleanup(setattr, dashboard_summary, 'SUMMARY', old)
+        self.corrupt()
+        with self.assertRaises(HTTPError) as cm:
+            urlopen(f'http://127.0.0.1:{server.server_port}/api/summary', timeout=5)
+        self.assertEqual(cm.exception.code, 503)
+        body = json.loads(cm.exception.read())
+        self.assertEqual((body['error'], body['skeleton']), ('skeleton_unreadable', DASH))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# Migration of the inline historical_tracking.snapshots into the SQLite store.
+import json, os, time, unittest
+from contextlib import closing
+
+from scratch import copy_backend, use_root
+
+import skeleton_store, timeseries
+
+DASH = 'proposal_master_dashboard_skeleton.json'
+
+
+class MigrateInline(unittest.TestCase):
+    def setUp(self):
+        self.root = copy_backend(self)
+        self.dash, self.db = os.path.join(self.root, DASH), os.path.join(self.root, 'history.sqlite3')
+        ctx = use_root(self.root)
+        ctx.__enter__()
+        self.addCleanup(ctx.__exit__, None, None, None)
+        with skeleton_store.batch() as b:
+            b.set(self.dash, ('metrics_tracking', 'historical_tracking'), {
+                'enabled': True, 'retention_days': 30,
+                'snapshots': [{'timestamp': '2020-01-01T10:00:00Z', 'overall_completion': 10},
+                              {'timestamp': '2020-01-02T10:00:00Z', 'overall_completion': 20}]})
+
+    def test_history_older_than_retention_survives_migration(self):
+        rep = timeseries.snapshot(self.dash, self.db)
+        self.assertEqual(rep['migrated'], 2)
+        self.assertFalse(rep['inline_kept'])
+        with closing(timeseries.connect(self.db)) as con, con:
+            timeseries.compact(con, time.time() + 86400, 30, force=True)  # a later compaction too
+        points = timeseries.query('key_metrics.overall_completion', db_path=self.db)
+        self.assertEqual([v for _, v in points][:2], [10.0, 20.0])
+        with open(self.dash, encoding='utf-8') as f:
+            ht = json.load(f)['metrics_tracking']['historical_tracking']
+        self.assertNotIn('snapshots', ht)
+
+    def test_snapshots_stay_inline_when_not_stored(self):
+        real = timeseries.stored
+        timeseries.stored = lambda con, series, ts: False
+        self.addCleanup(setattr, timeseries, 'stored', real)
+        self.assertTrue(timeseries.snapshot(self.dash, self.db)['inline_kept'])
+        with open(self.dash, encoding='utf-8') as f:
+            self.assertIn('snapshots', json.load(f)['metrics_tracking']['historical_tracking'])
+
+
+if __name__ == '__main__':
+    unittest.main()